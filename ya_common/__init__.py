@@ -0,0 +1 @@
+"""Код, общий для проектов ya_news и ya_note."""
@@ -0,0 +1,83 @@
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.core.cache import caches
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import SimpleLazyObject
+
+
+class UserCache:
+    """
+    Кеш пользователей сессий.
+
+    Алиас кеша и время жизни записей берутся из настроек проекта
+    с именами cache_setting и timeout_setting.
+    """
+
+    def __init__(self, cache_setting, timeout_setting, key_prefix):
+        self.cache_setting = cache_setting
+        self.timeout_setting = timeout_setting
+        self.key_prefix = key_prefix
+
+    def get_cache(self):
+        return caches[getattr(settings, self.cache_setting)]
+
+    def key(self, user_id):
+        return f'{self.key_prefix}:{user_id}'
+
+    def invalidate(self, user_id):
+        self.get_cache().delete(self.key(user_id))
+
+    def is_valid(self, request, user):
+        """
+        Проверяет закешированного пользователя как auth.get_user.
+
+        Бэкенд сессии должен быть разрешён и пускать пользователя,
+        а хеш сессии — совпадать с хешем пароля.
+        """
+        backend_path = request.session.get(auth.BACKEND_SESSION_KEY)
+        if backend_path not in settings.AUTHENTICATION_BACKENDS:
+            return False
+        backend = auth.load_backend(backend_path)
+        can_authenticate = getattr(backend, 'user_can_authenticate', None)
+        if can_authenticate is not None and not can_authenticate(user):
+            return False
+        session_hash = request.session.get(auth.HASH_SESSION_KEY)
+        return bool(session_hash) and constant_time_compare(
+            session_hash, user.get_session_auth_hash()
+        )
+
+    def get_user(self, request):
+        """Пользователь сессии из кеша, а при промахе — из auth.get_user."""
+        user_id = request.session.get(auth.SESSION_KEY)
+        if user_id is None:
+            return auth.get_user(request)
+        cache = self.get_cache()
+        key = self.key(user_id)
+        user = cache.get(key)
+        if user is not None and self.is_valid(request, user):
+            return user
+        user = auth.get_user(request)
+        if user.is_authenticated:
+            cache.set(key, user, getattr(settings, self.timeout_setting))
+        else:
+            cache.delete(key)
+        return user
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """
+    AuthenticationMiddleware, берущий пользователя из кеша user_cache.
+
+    Кеш сбрасывается при сохранении и удалении пользователя через
+    модель и при выходе. Изменения через QuerySet.update его не
+    сбрасывают и вступают в силу, когда запись устареет.
+    """
+
+    user_cache = None
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(
+            lambda: self.user_cache.get_user(request)
+        )
@@ -0,0 +1,464 @@
+import asyncio
+import io
+import json
+import logging
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from http import HTTPStatus
+from itertools import count
+from pathlib import Path
+
+from django.core.asgi import get_asgi_application
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.db import (
+    OperationalError, close_old_connections, connection, connections
+)
+from django.test.utils import override_settings
+
+# Насколько медленнее базового замера должно стать представление,
+# чтобы это считалось регрессией.
+DEFAULT_THRESHOLD = 0.2
+# Число одновременных клиентов в сравнении WSGI и ASGI.
+CONCURRENCY_LEVELS = (100, 1000)
+
+
+class QueryTimer:
+    """Обёртка execute_wrapper, считающая запросы и время в SQL."""
+
+    def __init__(self):
+        self.count = 0
+        self.elapsed = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.elapsed += time.perf_counter() - started
+            self.count += 1
+
+
+@contextmanager
+def use_database(path):
+    """Временно переключает основное соединение на файл с набором данных."""
+    name = connection.settings_dict['NAME']
+    connection.close()
+    connection.settings_dict['NAME'] = str(path)
+    try:
+        yield
+    finally:
+        connection.close()
+        connection.settings_dict['NAME'] = name
+
+
+def run_request(request):
+    """Выполняет запрос и дочитывает ответ, в том числе потоковый."""
+    response = request()
+    if response.streaming:
+        b''.join(response.streaming_content)
+    response.close()
+    return response
+
+
+def measure(request, repeat, prepare=None):
+    """
+    Замеряет представление: первый запрос отдельно, остальные медианой.
+
+    Пиковая память снимается отдельным прогоном под tracemalloc,
+    чтобы он не искажал время. prepare вызывается перед каждым
+    запросом и в замер не входит.
+    """
+    runs = []
+    for _ in range(repeat + 1):
+        if prepare:
+            prepare()
+        timer = QueryTimer()
+        with connection.execute_wrapper(timer):
+            started = time.perf_counter()
+            response = run_request(request)
+            elapsed = time.perf_counter() - started
+        runs.append((elapsed, timer.count, timer.elapsed))
+    if prepare:
+        prepare()
+    tracemalloc.start()
+    run_request(request)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    first, *rest = runs
+    return {
+        'status': response.status_code,
+        'first_ms': round(first[0] * 1000, 3),
+        'wall_ms': round(statistics.median(run[0] for run in rest) * 1000, 3),
+        'queries': statistics.median_high(run[1] for run in rest),
+        'sql_ms': round(statistics.median(run[2] for run in rest) * 1000, 3),
+        'peak_kb': round(peak / 1024, 1),
+    }
+
+
+def save_results(path, results):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(results, file, ensure_ascii=False, indent=2)
+
+
+def find_regressions(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Сравнивает замеры с базовыми и возвращает список регрессий.
+
+    Регрессия — рост медианного времени больше чем на threshold
+    или любой рост числа запросов.
+    """
+    regressions = []
+    for size, views in results.items():
+        for name, current in views.items():
+            previous = baseline.get(size, {}).get(name)
+            if previous is None:
+                continue
+            if current['wall_ms'] > previous['wall_ms'] * (1 + threshold):
+                regressions.append(
+                    f'{size} {name}: время {previous["wall_ms"]} -> '
+                    f'{current["wall_ms"]} мс'
+                )
+            if current['queries'] > previous['queries']:
+                regressions.append(
+                    f'{size} {name}: запросов {previous["queries"]} -> '
+                    f'{current["queries"]}'
+                )
+    return regressions
+
+
+def wsgi_request(application, path, cookie=None):
+    """Выполняет GET через WSGI-приложение и возвращает код ответа."""
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': '',
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': 'localhost',
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(),
+        'wsgi.errors': sys.stderr,
+    }
+    if cookie:
+        environ['HTTP_COOKIE'] = cookie
+    statuses = []
+    response = application(
+        environ, lambda status, headers: statuses.append(status)
+    )
+    b''.join(response)
+    response.close()
+    return int(statuses[0].split()[0])
+
+
+async def asgi_request(application, path, cookie=None):
+    """Выполняет GET через ASGI-приложение и возвращает код ответа."""
+    headers = [(b'host', b'localhost')]
+    if cookie:
+        headers.append((b'cookie', cookie.encode()))
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': headers,
+        'client': ('127.0.0.1', 0),
+        'server': ('localhost', 80),
+    }
+    messages = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+    statuses = []
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            statuses.append(message['status'])
+
+    await application(scope, receive, send)
+    return statuses[0]
+
+
+async def run_clients(request, paths, concurrency, total):
+    """Запускает concurrency клиентов, делящих total запросов."""
+    latencies = []
+    counter = iter(range(total))
+
+    async def client():
+        for number in counter:
+            started = time.perf_counter()
+            status = await request(paths[number % len(paths)])
+            latencies.append(time.perf_counter() - started)
+            if status != HTTPStatus.OK:
+                raise CommandError(f'Ответ {status} на запрос.')
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return time.perf_counter() - started, latencies
+
+
+async def run_wsgi(
+        application, paths, concurrency, total, workers, cookie=None
+):
+    """Подаёт запросы WSGI-приложению из пула workers потоков."""
+    loop = asyncio.get_running_loop()
+    with ThreadPoolExecutor(workers) as server:
+        return await run_clients(
+            lambda path: loop.run_in_executor(
+                server, wsgi_request, application, path, cookie
+            ),
+            paths, concurrency, total,
+        )
+
+
+async def run_asgi(application, paths, concurrency, total, cookie=None):
+    return await run_clients(
+        lambda path: asgi_request(application, path, cookie),
+        paths, concurrency, total,
+    )
+
+
+class ServerBenchmarkCommand(BaseCommand):
+    """
+    Основа команд bench_asgi: сравнение WSGI и ASGI на страницах проекта.
+
+    Проект задаёт get_requests, возвращающий пути страниц и cookie
+    запросов или None.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests', type=int, default=5_000,
+            help='Количество запросов на каждый уровень конкурентности.',
+        )
+        parser.add_argument(
+            '--wsgi-workers', type=int, default=8,
+            help='Число потоков WSGI-сервера.',
+        )
+
+    def get_requests(self):
+        raise NotImplementedError
+
+    def handle(self, *args, **options):
+        paths, cookie = self.get_requests()
+        wsgi_application = get_wsgi_application()
+        asgi_application = get_asgi_application()
+        total = options['requests']
+        for concurrency in CONCURRENCY_LEVELS:
+            elapsed, latencies = asyncio.run(run_wsgi(
+                wsgi_application, paths, concurrency, total,
+                options['wsgi_workers'], cookie,
+            ))
+            self.report('WSGI', concurrency, elapsed, latencies)
+            elapsed, latencies = asyncio.run(run_asgi(
+                asgi_application, paths, concurrency, total, cookie
+            ))
+            self.report('ASGI', concurrency, elapsed, latencies)
+
+    def report(self, name, concurrency, elapsed, latencies):
+        p99 = statistics.quantiles(latencies, n=100)[-1]
+        self.stdout.write(
+            f'{name} x{concurrency:<5} '
+            f'{len(latencies) / elapsed:8.0f} запр/с, '
+            f'p50 {statistics.median(latencies) * 1000:7.1f} мс, '
+            f'p99 {p99 * 1000:7.1f} мс'
+        )
+
+
+def in_thread(target, *args):
+    """Закрывает соединения потока пула, когда работа в нём закончена."""
+    try:
+        return target(*args)
+    finally:
+        connections.close_all()
+
+
+class SqliteBenchmarkCommand(BaseCommand):
+    """
+    Основа команд bench_sqlite: SQLite по умолчанию и с боевыми настройками.
+
+    Чтение идёт из нескольких потоков через WSGI, запись — из одного
+    через ORM. Проект задаёт имя параметра размера набора, префикс
+    файла набора, настройку прагм и модуль боевых настроек, а также
+    seed_data, get_readers и get_writer.
+    """
+    size_option = None
+    dataset_prefix = None
+    pragmas_setting = None
+    production_settings = None
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            f'--{self.size_option}', type=int, default=100_000
+        )
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--seconds', type=float, default=10)
+        parser.add_argument(
+            '--datasets',
+            default=tempfile.gettempdir(),
+            help='Каталог с базой набора данных, она переиспользуется.',
+        )
+
+    def get_profiles(self):
+        # Режим журнала SQLite сохраняется в файле базы, поэтому профиль
+        # по умолчанию явно возвращает исходный режим.
+        production = self.production_settings
+        return {
+            'default': {
+                'CONN_MAX_AGE': 0, 'pragmas': {'journal_mode': 'delete'}
+            },
+            'production': {
+                'CONN_MAX_AGE': production.DATABASES['default'][
+                    'CONN_MAX_AGE'
+                ],
+                'pragmas': getattr(production, self.pragmas_setting),
+            },
+        }
+
+    def seed_data(self, size):
+        raise NotImplementedError
+
+    def get_readers(self, readers_count):
+        """Пары cookie и функции, выбирающей путь по генератору random."""
+        raise NotImplementedError
+
+    def get_writer(self):
+        """Функция записи по генератору random и номеру записи."""
+        raise NotImplementedError
+
+    def handle(self, *args, **options):
+        size = options[self.size_option]
+        dataset = (
+            Path(options['datasets'])
+            / f'{self.dataset_prefix}_{size}.sqlite3'
+        )
+        if not dataset.exists():
+            self.seed(dataset, size)
+        application = get_wsgi_application()
+        work = dataset.with_name(dataset.stem + '_work.sqlite3')
+        # Ошибки «database is locked» считаются, а не печатаются.
+        request_logger = logging.getLogger('django.request')
+        level = request_logger.level
+        request_logger.setLevel(logging.CRITICAL)
+        try:
+            for name, profile in self.get_profiles().items():
+                for path in (work, Path(f'{work}-wal'), Path(f'{work}-shm')):
+                    path.unlink(missing_ok=True)
+                shutil.copyfile(dataset, work)
+                with use_database(work), override_settings(
+                    DEBUG=False, **{self.pragmas_setting: profile['pragmas']}
+                ):
+                    connection.settings_dict['CONN_MAX_AGE'] = (
+                        profile['CONN_MAX_AGE']
+                    )
+                    try:
+                        self.report(name, self.run(application, options))
+                    finally:
+                        connection.settings_dict['CONN_MAX_AGE'] = 0
+        finally:
+            request_logger.setLevel(level)
+
+    def seed(self, path, size):
+        started = time.perf_counter()
+        with use_database(path), override_settings(DEBUG=False):
+            call_command('migrate', verbosity=0)
+            self.seed_data(size)
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+        self.stdout.write(
+            f'Набор {size} заполнен за '
+            f'{time.perf_counter() - started:.1f} с.'
+        )
+
+    def run(self, application, options):
+        readers = self.get_readers(options['readers'])
+        write = self.get_writer()
+        connection.close()
+        deadline = time.perf_counter() + options['seconds']
+        with ThreadPoolExecutor(len(readers) + 1) as pool:
+            started = time.perf_counter()
+            writer = pool.submit(in_thread, self.write, write, deadline)
+            futures = [
+                pool.submit(
+                    in_thread, self.read, application, cookie, choose_path,
+                    deadline,
+                )
+                for cookie, choose_path in readers
+            ]
+            writes, write_errors = writer.result()
+            reads, read_errors = [], 0
+            for future in futures:
+                latencies, failed = future.result()
+                reads += latencies
+                read_errors += failed
+            elapsed = time.perf_counter() - started
+        return {
+            'reads': len(reads) / elapsed,
+            'read_p50': statistics.median(reads),
+            'read_p99': statistics.quantiles(reads, n=100)[-1],
+            'writes': len(writes) / elapsed,
+            'write_p50': statistics.median(writes),
+            'errors': {'reads': read_errors, 'writes': write_errors},
+        }
+
+    def read(self, application, cookie, choose_path, deadline):
+        """Запрашивает страницы через WSGI до истечения времени."""
+        rng = random.Random()
+        latencies, failed = [], 0
+        while time.perf_counter() < deadline:
+            path = choose_path(rng)
+            started = time.perf_counter()
+            status = wsgi_request(application, path, cookie)
+            latencies.append(time.perf_counter() - started)
+            failed += status != HTTPStatus.OK
+        return latencies, failed
+
+    def write(self, write, deadline):
+        """
+        Пишет через ORM до истечения времени.
+
+        Тестовый клиент не закрывает соединения между запросами,
+        поэтому запись идёт через ORM, а конец запроса к сайту
+        изображает close_old_connections.
+        """
+        rng = random.Random()
+        latencies, failed = [], 0
+        for number in count():
+            if time.perf_counter() >= deadline:
+                break
+            started = time.perf_counter()
+            try:
+                write(rng, number)
+            except OperationalError:
+                failed += 1
+            finally:
+                close_old_connections()
+            latencies.append(time.perf_counter() - started)
+        return latencies, failed
+
+    def report(self, name, result):
+        self.stdout.write(
+            f'{name:<11} чтение {result["reads"]:7.0f} запр/с, '
+            f'p50 {result["read_p50"] * 1000:6.1f} мс, '
+            f'p99 {result["read_p99"] * 1000:7.1f} мс; '
+            f'запись {result["writes"]:5.0f} запр/с, '
+            f'p50 {result["write_p50"] * 1000:6.1f} мс; '
+            f'ошибок {result["errors"]["reads"]} при чтении, '
+            f'{result["errors"]["writes"]} при записи'
+        )
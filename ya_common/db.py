@@ -0,0 +1,35 @@
+from django.db import connections
+
+
+def is_alive(connection):
+    """Проверяет открытое соединение запросом SELECT 1 мимо учёта Django."""
+    try:
+        cursor = connection.connection.cursor()
+        try:
+            cursor.execute('SELECT 1')
+        finally:
+            cursor.close()
+    except connection.Database.Error:
+        return False
+    return True
+
+
+def close_broken_connections():
+    """
+    Закрывает сломанные постоянные соединения в начале запроса.
+
+    Django 3.2 проверяет соединение перед повторным использованием
+    только после ошибки в нём, а ключ CONN_HEALTH_CHECKS появился
+    лишь в Django 4.1. Здесь он проверяется так же: соединение
+    базы с CONN_HEALTH_CHECKS, уже открытое и не занятое
+    транзакцией, закрывается, если не отвечает, и следующий запрос
+    к базе откроет новое.
+    """
+    for connection in connections.all():
+        if (
+            connection.settings_dict.get('CONN_HEALTH_CHECKS')
+            and connection.connection is not None
+            and not connection.in_atomic_block
+            and not is_alive(connection)
+        ):
+            connection.close()
@@ -0,0 +1,196 @@
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+UNRESOLVED_VIEW = 'unresolved'
+# Границы корзин гистограммы времени ответа в секундах,
+# как по умолчанию в клиентах Prometheus.
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1, 2.5, 5, 7.5, 10
+)
+
+
+class QueryRecorder:
+    """
+    Обёртка execute_wrapper, считающая запросы запроса к сайту.
+
+    Работает и без DEBUG: запросы не копятся в connection.queries,
+    запоминается только число повторов каждого текста SQL.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.elapsed = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.elapsed += time.perf_counter() - started
+            self.count += 1
+            self.statements[sql] += 1
+
+    def duplicates(self, threshold):
+        """Тексты SQL, выполненные не меньше threshold раз."""
+        return [
+            (sql, total) for sql, total in self.statements.most_common()
+            if total >= threshold
+        ]
+
+
+class Registry:
+    """
+    Метрики запросов по именам представлений.
+
+    Хранятся в памяти процесса: как и в клиентах Prometheus,
+    каждый рабочий процесс отдаёт свои значения. Имена метрик
+    начинаются с prefix проекта.
+    """
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self.requests = Counter()
+        self.buckets = defaultdict(lambda: [0] * len(DURATION_BUCKETS))
+        self.durations = Counter()
+        self.queries = Counter()
+        self.sql_durations = Counter()
+
+    def observe(self, view, duration, recorder):
+        with self.lock:
+            self.requests[view] += 1
+            buckets = self.buckets[view]
+            for index, bound in enumerate(DURATION_BUCKETS):
+                if duration <= bound:
+                    buckets[index] += 1
+            self.durations[view] += duration
+            self.queries[view] += recorder.count
+            self.sql_durations[view] += recorder.elapsed
+
+    def render(self):
+        """Текст метрик в формате экспозиции Prometheus."""
+        prefix = self.prefix
+        with self.lock:
+            views = sorted(self.requests)
+            lines = [
+                f'# HELP {prefix}_requests_total Обработано запросов.',
+                f'# TYPE {prefix}_requests_total counter',
+            ]
+            lines += [
+                f'{prefix}_requests_total{{view="{view}"}} '
+                f'{self.requests[view]}'
+                for view in views
+            ]
+            name = f'{prefix}_request_duration_seconds'
+            lines += [
+                f'# HELP {name} Время ответа.',
+                f'# TYPE {name} histogram',
+            ]
+            for view in views:
+                for bound, total in zip(DURATION_BUCKETS, self.buckets[view]):
+                    lines.append(
+                        f'{name}_bucket{{view="{view}",le="{bound}"}} {total}'
+                    )
+                lines += [
+                    f'{name}_bucket{{view="{view}",le="+Inf"}} '
+                    f'{self.requests[view]}',
+                    f'{name}_sum{{view="{view}"}} {self.durations[view]}',
+                    f'{name}_count{{view="{view}"}} {self.requests[view]}',
+                ]
+            for name, description, values in (
+                ('sql_queries_total', 'Выполнено запросов SQL.',
+                 self.queries),
+                ('sql_duration_seconds_total', 'Время в запросах SQL.',
+                 self.sql_durations),
+            ):
+                lines += [
+                    f'# HELP {prefix}_{name} {description}',
+                    f'# TYPE {prefix}_{name} counter',
+                ]
+                lines += [
+                    f'{prefix}_{name}{{view="{view}"}} {values[view]}'
+                    for view in views
+                ]
+        return '\n'.join(lines) + '\n'
+
+
+def get_view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else UNRESOLVED_VIEW
+
+
+def watch_queries(request):
+    """
+    Подключает счётчик запроса к соединению текущего потока.
+
+    Потоковый ответ может выдаваться не в том потоке, где работало
+    представление, а соединения с базой у потоков свои.
+    """
+    recorder = getattr(request, 'query_recorder', None)
+    if recorder is None:
+        return nullcontext()
+    return connection.execute_wrapper(recorder)
+
+
+class MetricsMiddleware:
+    """
+    Считает время ответа и запросы SQL каждого представления
+    и пишет в журнал повторяющиеся запросы — признак N+1.
+
+    Потоковые ответы учитываются, когда тело отдано целиком:
+    запросы к базе делаются как раз при его выдаче. Проект задаёт
+    registry, журнал и имя настройки с порогом повторов запроса.
+    """
+    registry = None
+    logger = logger
+    duplicate_queries_setting = None
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        request.query_recorder = recorder
+        started = time.perf_counter()
+        with connection.execute_wrapper(recorder):
+            response = self.get_response(request)
+        if response.streaming:
+            response.streaming_content = self.stream(
+                response.streaming_content, request, started
+            )
+        else:
+            self.observe(request, started)
+        return response
+
+    def stream(self, content, request, started):
+        try:
+            with watch_queries(request):
+                yield from content
+        finally:
+            self.observe(request, started)
+
+    def observe(self, request, started):
+        view = get_view_name(request)
+        recorder = request.query_recorder
+        self.registry.observe(
+            view, time.perf_counter() - started, recorder
+        )
+        for sql, total in recorder.duplicates(
+            getattr(settings, self.duplicate_queries_setting)
+        ):
+            self.logger.warning(
+                'Возможный N+1 в %s: запрос выполнен %d раз: %s',
+                view, total, sql,
+            )
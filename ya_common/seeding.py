@@ -0,0 +1,99 @@
+from contextlib import contextmanager
+from itertools import accumulate, islice
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Max
+from django.utils import timezone
+
+BATCH_SIZE = 10_000
+USER_FIELDS = (
+    'id', 'username', 'password', 'is_superuser', 'first_name',
+    'last_name', 'email', 'is_staff', 'is_active', 'date_joined',
+)
+
+
+def zipf_cum_weights(count, skew):
+    """
+    Накопленные веса распределения Ципфа для random.choices.
+
+    При skew=0 все значения равновероятны, с ростом skew
+    всё больше выборок приходится на первые значения.
+    """
+    return list(accumulate(1 / rank ** skew for rank in range(1, count + 1)))
+
+
+def batched(rows, batch_size):
+    rows = iter(rows)
+    while batch := list(islice(rows, batch_size)):
+        yield batch
+
+
+def next_id(model):
+    return (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+
+
+def insert_rows(model, fields, rows, batch_size=BATCH_SIZE):
+    """
+    Вставляет кортежи уже подготовленных для базы значений пачками.
+
+    bulk_create готовит каждое значение каждого поля через ORM
+    и не даёт задать поля с auto_now_add, поэтому здесь строки
+    уходят в executemany как есть.
+    """
+    columns = ', '.join(
+        connection.ops.quote_name(model._meta.get_field(field).column)
+        for field in fields
+    )
+    placeholders = ', '.join(['%s'] * len(fields))
+    sql = (
+        f'INSERT INTO {connection.ops.quote_name(model._meta.db_table)} '
+        f'({columns}) VALUES ({placeholders})'
+    )
+    with connection.cursor() as cursor:
+        for batch in batched(rows, batch_size):
+            cursor.executemany(sql, batch)
+
+
+@contextmanager
+def deferred_indexes(tables):
+    """
+    Снимает индексы и триггеры таблиц SQLite на время вставки.
+
+    Построить индекс по готовой таблице быстрее, чем обновлять его
+    на каждой строке. Снятые триггеры на вставленных строках не
+    срабатывают, поэтому то, что они поддерживают, например индекс
+    поиска, затем нужно перестроить. Индексы и триггеры
+    возвращаются и при ошибке вставки.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT type, name, sql FROM sqlite_master '
+            f'WHERE tbl_name IN ({", ".join(["%s"] * len(tables))}) '
+            "AND type IN ('index', 'trigger') AND sql IS NOT NULL",
+            tables,
+        )
+        objects = cursor.fetchall()
+        for kind, name, _ in objects:
+            cursor.execute(f'DROP {kind} {connection.ops.quote_name(name)}')
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            for _, _, sql in objects:
+                cursor.execute(sql)
+
+
+def generate_users(start, count, password):
+    joined = str(timezone.now().replace(tzinfo=None))
+    for pk in range(start, start + count):
+        yield (
+            pk, f'user{pk}', password, False, '', '', '', False, True, joined
+        )
+
+
+def insert_users(start, count, password):
+    """Пользователи user<id> с уже захешированным паролем."""
+    insert_rows(
+        get_user_model(), USER_FIELDS, generate_users(start, count, password)
+    )
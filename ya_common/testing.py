@@ -0,0 +1,62 @@
+import sqlite3
+
+from django.db import connection
+
+from ya_common.seeding import insert_rows, next_id
+
+
+def save_all(objects):
+    """
+    Сохраняет объекты одной модели пачками и проставляет им pk.
+
+    Подходит и для фикстур pytest, и для setUpTestData. В отличие
+    от bulk_create значения полей с auto_now и auto_now_add не
+    подменяются текущим временем, а pk известны сразу: бэкенд SQLite
+    в Django 3.2 не возвращает их после вставки. Сигналы post_save
+    не отправляются.
+    """
+    if not objects:
+        return objects
+    model = type(objects[0])
+    fields = model._meta.concrete_fields
+    for pk, obj in enumerate(objects, next_id(model)):
+        obj.pk = pk
+    insert_rows(
+        model,
+        [field.name for field in fields],
+        (
+            [
+                field.get_db_prep_save(getattr(obj, field.attname), connection)
+                for field in fields
+            ]
+            for obj in objects
+        ),
+    )
+    for obj in objects:
+        obj._state.adding = False
+        obj._state.db = connection.alias
+    return objects
+
+
+def backup_database():
+    """
+    Копирует тестовую базу в новую базу в памяти.
+
+    Backup API SQLite копирует страницы целиком, без разбора
+    и повторной вставки строк.
+    """
+    connection.ensure_connection()
+    snapshot = sqlite3.connect(':memory:', check_same_thread=False)
+    connection.connection.backup(snapshot)
+    return snapshot
+
+
+def restore_database(snapshot):
+    """
+    Заменяет содержимое тестовой базы снимком.
+
+    Соединение не должно быть внутри транзакции, поэтому
+    восстанавливать можно только в транзакционных тестах.
+    """
+    connection.ensure_connection()
+    snapshot.backup(connection.connection)
@@ -1,11 +1,29 @@
+import random
+
 import pytest
 
-from datetime import datetime, timedelta
+from datetime import timedelta
 
 from django.conf import settings
-from django.utils import timezone
 
+from news.auth import get_user_cache
+from news.cache import get_page_cache
 from news.models import Comment, News
+from news.pytest_tests.factories import make_comments, make_news
+from news.seeding import seed_news
+from ya_common.testing import backup_database, restore_database
+
+COMMENTS_COUNT_FOR_NEWS = 15
+# Общий набор данных для тестов на объёме.
+REFERENCE_USERS_COUNT = 50
+REFERENCE_NEWS_COUNT = 100
+REFERENCE_COMMENTS_COUNT = 5000
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    get_page_cache().clear()
+    get_user_cache().clear()
 
 
 @pytest.fixture
@@ -57,26 +75,54 @@ def form_data():
 
 @pytest.fixture
 def news_page_and_sorting_by_data():
-    today = datetime.today()
-    all_news = [
-        News(
-            title=f'Новость {index}',
-            text='Просто текст.',
-            date=today - timedelta(days=index)
-        )
-        for index in range(settings.NEWS_COUNT_ON_HOME_PAGE + 1)
-    ]
-    News.objects.bulk_create(all_news)
+    make_news(settings.NEWS_COUNT_ON_HOME_PAGE + 1)
+
+
+@pytest.fixture
+def news_with_comments(author, news):
+    make_comments(news, author, COMMENTS_COUNT_FOR_NEWS)
+    return news
+
+
+@pytest.fixture
+def news_with_tied_comments(author, news):
+    """Новость, у всех комментариев которой одинаковое время создания."""
+    make_comments(
+        news, author, COMMENTS_COUNT_FOR_NEWS, interval=timedelta(0)
+    )
+    return news
 
 
 @pytest.fixture
 def sorting_comments_by_data(author, news):
-    now = timezone.now()
-    for index in range(2):
-        comment = Comment.objects.create(
-            news=news,
-            author=author,
-            text=f'Tекст {index}',
+    make_comments(news, author, 2, interval=timedelta(days=1))
+
+
+@pytest.fixture(scope='session')
+def reference_snapshot(django_db_setup, django_db_blocker):
+    """
+    Снимок базы с общим набором данных, строится раз за сессию.
+
+    После снимка база возвращается к пустому состоянию, чтобы
+    остальные тесты набора не видели.
+    """
+    with django_db_blocker.unblock():
+        empty = backup_database()
+        random.seed(REFERENCE_COMMENTS_COUNT)
+        seed_news(
+            REFERENCE_USERS_COUNT, REFERENCE_NEWS_COUNT,
+            REFERENCE_COMMENTS_COUNT, skew=1,
         )
-        comment.created = now + timedelta(days=index)
-        comment.save()
+        snapshot = backup_database()
+        restore_database(empty)
+    return snapshot
+
+
+@pytest.fixture
+def reference_db(transactional_db, reference_snapshot):
+    """
+    База с общим набором данных, восстановленная из снимка.
+
+    После теста транзакционная база очищается, как обычно.
+    """
+    restore_database(reference_snapshot)
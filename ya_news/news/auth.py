@@ -0,0 +1,12 @@
+from ya_common import auth
+
+user_cache = auth.UserCache(
+    'NEWS_USER_CACHE', 'NEWS_USER_CACHE_TIMEOUT', 'news-user'
+)
+get_user_cache = user_cache.get_cache
+user_cache_key = user_cache.key
+invalidate_user = user_cache.invalidate
+
+
+class CachedAuthenticationMiddleware(auth.CachedAuthenticationMiddleware):
+    user_cache = user_cache
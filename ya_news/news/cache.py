@@ -0,0 +1,67 @@
+import re
+
+from django.conf import settings
+from django.core.cache import caches
+from django.template.loader import render_to_string
+
+COMMENT_ACTIONS_MARKER = re.compile(r'<!--comment-actions:(\d+):(\d+)-->')
+
+
+def get_page_cache():
+    return caches[settings.NEWS_PAGE_CACHE]
+
+
+def home_cache_key(is_authenticated):
+    return f'news-page:home:{int(is_authenticated)}'
+
+
+def detail_cache_key(news_id, is_authenticated):
+    return f'news-page:detail:{news_id}:{int(is_authenticated)}'
+
+
+def home_validators_key():
+    return 'news-page:home:validators'
+
+
+def detail_validators_key(news_id):
+    return f'news-page:detail:{news_id}:validators'
+
+
+def invalidate_home():
+    get_page_cache().delete_many(
+        [home_cache_key(is_authenticated) for is_authenticated in (0, 1)]
+        + [home_validators_key()]
+    )
+
+
+def invalidate_detail(news_id):
+    get_page_cache().delete_many(
+        [detail_cache_key(news_id, is_authenticated)
+         for is_authenticated in (0, 1)]
+        + [detail_validators_key(news_id)]
+    )
+
+
+def invalidate_pages():
+    """Сбрасывает все закешированные страницы вместе с валидаторами."""
+    get_page_cache().clear()
+
+
+def fill_comment_actions(html, user):
+    """
+    Подставляет ссылки редактирования и удаления в комментарии,
+    автором которых является текущий пользователь.
+
+    В общем для всех HTML вместо ссылок стоят метки
+    <!--comment-actions:id комментария:id автора-->.
+    """
+    def replace(match):
+        comment_id, author_id = map(int, match.groups())
+        if user.is_authenticated and author_id == user.pk:
+            return render_to_string(
+                'news/includes/comment_actions.html',
+                {'comment_id': comment_id}
+            )
+        return ''
+
+    return COMMENT_ACTIONS_MARKER.sub(replace, html)
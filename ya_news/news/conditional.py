@@ -0,0 +1,109 @@
+import hashlib
+from datetime import datetime
+from itertools import chain
+
+from django.conf import settings
+from django.db.models import OuterRef, Subquery
+
+from .cache import (
+    detail_validators_key, get_page_cache, home_validators_key
+)
+from .models import Comment, News
+
+
+def last_comment_subquery():
+    """Время последнего комментария новости по индексу (news, created)."""
+    return Subquery(
+        Comment.objects.filter(
+            news=OuterRef('pk')
+        ).order_by('-created').values('created')[:1]
+    )
+
+
+def get_home_validators():
+    """
+    Валидаторы главной одним запросом по показанным новостям.
+
+    В них входят и id новостей: список меняется, когда новость уходит
+    с главной или появляется на ней.
+    """
+    rows = News.objects.annotate(
+        last_comment=last_comment_subquery()
+    ).values_list(
+        'pk', 'date', 'modified', 'comment_count', 'last_comment'
+    )[:settings.NEWS_COUNT_ON_HOME_PAGE]
+    return tuple(chain.from_iterable(rows))
+
+
+def get_detail_validators(news_id):
+    """Валидаторы страницы новости одним запросом по первичному ключу."""
+    return News.objects.filter(pk=news_id).values_list(
+        'date', 'modified', 'comment_count'
+    ).annotate(last_comment=last_comment_subquery()).first()
+
+
+def get_validators(request, key, compute):
+    """
+    Валидаторы страницы из памяти запроса, из кеша страниц или из БД.
+
+    Кеш сбрасывается теми же сигналами, что и кеш самих страниц.
+    """
+    memo = request.__dict__.setdefault('_news_validators', {})
+    if key not in memo:
+        cache = get_page_cache()
+        validators = cache.get(key)
+        if validators is None:
+            validators = compute()
+            if validators is not None:
+                cache.set(key, validators, settings.NEWS_PAGE_CACHE_TIMEOUT)
+        memo[key] = validators
+    return memo[key]
+
+
+def make_etag(request, validators):
+    """ETag зависит ещё и от пользователя: в странице есть его данные."""
+    if validators is None:
+        return None
+    return hashlib.md5(
+        repr((validators, request.user.pk)).encode()
+    ).hexdigest()
+
+
+def make_last_modified(request, validators):
+    """
+    Last-Modified отдаётся только анонимам: при входе пользователя
+    время изменения страницы не меняется, а сама страница меняется.
+
+    Для главной его нет вовсе: удаление новости не оставляет
+    времени изменения, на которое можно было бы сослаться.
+    """
+    if validators is None or request.user.is_authenticated:
+        return None
+    return max(
+        (value for value in validators if isinstance(value, datetime)),
+        default=None,
+    )
+
+
+def get_request_home_validators(request):
+    return get_validators(request, home_validators_key(), get_home_validators)
+
+
+def get_request_detail_validators(request, pk):
+    return get_validators(
+        request, detail_validators_key(pk), lambda: get_detail_validators(pk)
+    )
+
+
+def home_etag(request, *args, **kwargs):
+    return make_etag(request, get_request_home_validators(request))
+
+
+def detail_etag(request, pk, *args, **kwargs):
+    return make_etag(request, get_request_detail_validators(request, pk))
+
+
+def detail_last_modified(request, pk, *args, **kwargs):
+    return make_last_modified(
+        request, get_request_detail_validators(request, pk)
+    )
@@ -0,0 +1,51 @@
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Comment, News
+
+
+def get_export_rows(date_from=None, date_to=None):
+    """
+    Новости с комментариями по одной, без загрузки всей выборки.
+
+    Новости и комментарии читаются двумя курсорами, упорядоченными по id
+    новости, и сливаются на лету. Комментарии идут в порядке индекса
+    (news, created), поэтому сортировки в базе не требуется.
+    """
+    chunk_size = settings.NEWS_EXPORT_CHUNK_SIZE
+    news_filter = {}
+    if date_from:
+        news_filter['date__gte'] = date_from
+    if date_to:
+        news_filter['date__lte'] = date_to
+    all_news = News.objects.filter(**news_filter).order_by('pk').values(
+        'id', 'title', 'text', 'date'
+    ).iterator(chunk_size=chunk_size)
+    comments = Comment.objects.filter(
+        **{f'news__{key}': value for key, value in news_filter.items()}
+    ).order_by('news_id', 'created', 'pk').values(
+        'id', 'news_id', 'author__username', 'text', 'created'
+    ).iterator(chunk_size=chunk_size)
+    comment = next(comments, None)
+    for news in all_news:
+        news['comments'] = []
+        while comment is not None and comment['news_id'] <= news['id']:
+            if comment['news_id'] == news['id']:
+                news['comments'].append({
+                    'id': comment['id'],
+                    'author': comment['author__username'],
+                    'text': comment['text'],
+                    'created': comment['created'],
+                })
+            comment = next(comments, None)
+        yield news
+
+
+def get_export_lines(date_from=None, date_to=None):
+    """Строки JSONL для выгрузки новостей."""
+    for row in get_export_rows(date_from, date_to):
+        yield json.dumps(
+            row, cls=DjangoJSONEncoder, ensure_ascii=False
+        ) + '\n'
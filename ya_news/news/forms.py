@@ -1,7 +1,9 @@
+from django import forms
 from django.forms import ModelForm
 from django.core.exceptions import ValidationError
 
 from .models import Comment
+from .moderation import BadWordsFilter
 
 BAD_WORDS = (
     'редиска',
@@ -9,6 +11,11 @@ BAD_WORDS = (
     # Дополните список на своё усмотрение.
 )
 WARNING = 'Не ругайтесь!'
+# Дальше этой страницы поиск не листается: смещение в SQL
+# должно оставаться небольшим целым.
+SEARCH_MAX_PAGE = 1000
+
+bad_words_filter = BadWordsFilter(BAD_WORDS)
 
 
 class CommentForm(ModelForm):
@@ -20,8 +27,23 @@ class CommentForm(ModelForm):
     def clean_text(self):
         """Не позволяем ругаться в комментариях."""
         text = self.cleaned_data['text']
-        lowered_text = text.lower()
-        for word in BAD_WORDS:
-            if word in lowered_text:
-                raise ValidationError(WARNING)
+        found_words = bad_words_filter.find(text)
+        if found_words:
+            raise ValidationError(
+                WARNING, code='bad_words', params={'words': found_words}
+            )
         return text
+
+
+class ExportFilterForm(forms.Form):
+    """Диапазон дат новостей для выгрузки."""
+    date_from = forms.DateField(required=False)
+    date_to = forms.DateField(required=False)
+
+
+class SearchForm(forms.Form):
+    """Поиск по новостям."""
+    q = forms.CharField(label='Найти', max_length=100)
+    page = forms.IntegerField(
+        min_value=1, max_value=SEARCH_MAX_PAGE, required=False
+    )
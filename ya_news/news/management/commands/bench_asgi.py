@@ -0,0 +1,21 @@
+from django.core.management.base import CommandError
+from django.urls import reverse
+
+from news.models import News
+from ya_common.benchmark import ServerBenchmarkCommand
+
+
+class Command(ServerBenchmarkCommand):
+    help = (
+        'Нагрузочное сравнение страниц новостей под WSGI с пулом '
+        'синхронных воркеров и под ASGI, где Django 3.2 выполняет '
+        'синхронные представления в одном общем потоке. '
+        'Запросы подаются в приложения напрямую, без сети.'
+    )
+
+    def get_requests(self):
+        news = News.objects.first()
+        if news is None:
+            raise CommandError('В базе нет новостей, заполните её.')
+        paths = (reverse('news:home'), reverse('news:detail', args=(news.pk,)))
+        return paths, None
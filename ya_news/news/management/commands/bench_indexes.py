@@ -0,0 +1,172 @@
+import random
+import statistics
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+from django.db.migrations.loader import MigrationLoader
+from django.db.models import Count
+from django.utils import timezone
+
+from news.models import comments_total_subquery
+
+ALIAS = 'benchmark'
+MIGRATION_BEFORE = '0002'
+MIGRATION_AFTER = '0003'
+BATCH_SIZE = 10_000
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает планы и время горячих запросов новостей и комментариев '
+        'до и после миграции с индексами на отдельной базе SQLite.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=str(Path(tempfile.gettempdir()) / 'yanews_bench.sqlite3'),
+            help='Файл базы для замеров, будет перезаписан.',
+        )
+        parser.add_argument('--users', type=int, default=10_000)
+        parser.add_argument('--news', type=int, default=100_000)
+        parser.add_argument('--comments', type=int, default=1_000_000)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        path.unlink(missing_ok=True)
+        connections.databases[ALIAS] = {
+            **settings.DATABASES['default'], 'NAME': str(path)
+        }
+        try:
+            call_command('migrate', database=ALIAS, verbosity=0)
+            apps = self.migrate(MIGRATION_BEFORE)
+            self.seed(
+                apps, options['users'], options['news'], options['comments']
+            )
+            self.report(apps, 'До индексов', options['repeat'])
+            apps = self.migrate(MIGRATION_AFTER)
+            self.report(apps, 'После индексов', options['repeat'])
+        finally:
+            connections[ALIAS].close()
+            del connections[ALIAS]
+            del connections.databases[ALIAS]
+
+    def migrate(self, migration):
+        """
+        Переводит базу на миграцию и возвращает реестр моделей на ней.
+
+        Текущие модели могут опираться на более поздние столбцы,
+        поэтому база наполняется и опрашивается историческими.
+        """
+        call_command(
+            'migrate', 'news', migration, database=ALIAS, verbosity=0
+        )
+        loader = MigrationLoader(connections[ALIAS])
+        migration = loader.get_migration_by_prefix('news', migration)
+        return loader.project_state(
+            (migration.app_label, migration.name)
+        ).apps
+
+    def seed(self, apps, users_count, news_count, comments_count):
+        started = time.perf_counter()
+        today = timezone.now()
+        User = apps.get_model(settings.AUTH_USER_MODEL)
+        News = apps.get_model('news', 'News')
+        Comment = apps.get_model('news', 'Comment')
+        with transaction.atomic(using=ALIAS):
+            User.objects.using(ALIAS).bulk_create(
+                (User(username=f'user{index}')
+                 for index in range(users_count)),
+                batch_size=BATCH_SIZE,
+            )
+            News.objects.using(ALIAS).bulk_create(
+                (News(
+                    title=f'Новость {index}',
+                    text='Просто текст.',
+                    date=(today - timedelta(days=index % 3650)).date(),
+                ) for index in range(news_count)),
+                batch_size=BATCH_SIZE,
+            )
+            # auto_now_add не даёт задать created через bulk_create,
+            # поэтому комментарии вставляются напрямую.
+            sql = (
+                f'INSERT INTO {Comment._meta.db_table} '
+                '(news_id, author_id, text, created) VALUES (%s, %s, %s, %s)'
+            )
+            connection = connections[ALIAS]
+            with connection.cursor() as cursor:
+                for start in range(0, comments_count, BATCH_SIZE):
+                    size = min(BATCH_SIZE, comments_count - start)
+                    cursor.executemany(sql, [
+                        (
+                            # Обсуждения распределены неравномерно:
+                            # у небольшой части новостей почти все
+                            # комментарии.
+                            int(news_count * random.random() ** 4) + 1,
+                            random.randint(1, users_count),
+                            'Текст комментария',
+                            connection.ops.adapt_datetimefield_value(
+                                today - timedelta(
+                                    seconds=random.randint(0, 10 ** 8)
+                                )
+                            ),
+                        )
+                        for _ in range(size)
+                    ])
+        with connections[ALIAS].cursor() as cursor:
+            cursor.execute('ANALYZE')
+        self.stdout.write(
+            f'Заполнено за {time.perf_counter() - started:.1f} с: '
+            f'{users_count} пользователей, {news_count} новостей, '
+            f'{comments_count} комментариев.'
+        )
+
+    def get_queries(self, apps):
+        News = apps.get_model('news', 'News')
+        Comment = apps.get_model('news', 'Comment')
+        news_id = Comment.objects.using(ALIAS).order_by().values(
+            'news'
+        ).annotate(total=Count('pk')).order_by('-total')[0]['news']
+        author_id = Comment.objects.using(ALIAS).order_by().values(
+            'author'
+        ).annotate(total=Count('pk')).order_by('-total')[0]['author']
+        return {
+            'Последние новости': News.objects.using(ALIAS).annotate(
+                comments_total=comments_total_subquery(Comment)
+            )[:settings.NEWS_COUNT_ON_HOME_PAGE],
+            'Комментарии новости': Comment.objects.using(ALIAS).filter(
+                news_id=news_id
+            ).order_by(
+                'created', 'pk'
+            )[:settings.COMMENTS_COUNT_ON_NEWS_PAGE + 1],
+            'Комментарии автора': Comment.objects.using(ALIAS).filter(
+                author_id=author_id
+            ),
+        }
+
+    def report(self, apps, title, repeat):
+        self.stdout.write(self.style.MIGRATE_HEADING(title))
+        connection = connections[ALIAS]
+        for name, queryset in self.get_queries(apps).items():
+            sql, params = queryset.query.get_compiler(ALIAS).as_sql()
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+                plan = [row[-1] for row in cursor.fetchall()]
+                timings = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    cursor.execute(sql, params)
+                    cursor.fetchall()
+                    timings.append(time.perf_counter() - started)
+            self.stdout.write(
+                f'{name}: медиана {statistics.median(timings) * 1000:.2f} мс'
+            )
+            for step in plan:
+                self.stdout.write(f'    {step}')
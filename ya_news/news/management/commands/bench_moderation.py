@@ -0,0 +1,58 @@
+import random
+import timeit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from news.moderation import WordsMatcher
+
+ALPHABET = 'абвгдеёжзийклмнопрстуфхцчшщъыьэюя'
+DICTIONARY_SIZES = (10, 1_000, 50_000)
+
+
+def random_word(min_length=4, max_length=12):
+    return ''.join(random.choices(
+        ALPHABET, k=random.randint(min_length, max_length)
+    ))
+
+
+def loop_find(words, text):
+    """Прежняя проверка: поиск каждого слова подстрокой."""
+    lowered_text = text.lower()
+    return [word for word in words if word in lowered_text]
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает проверку комментария на запрещённые слова циклом '
+        'по словарю и автоматом Ахо — Корасик.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--text-length', type=int, default=1_000)
+        parser.add_argument('--number', type=int, default=20)
+
+    def handle(self, *args, **options):
+        number = options['number']
+        words = [random_word() for _ in range(max(DICTIONARY_SIZES))]
+        text = ' '.join(
+            random_word(2, 8) for _ in range(options['text_length'] // 6)
+        )
+        for size in DICTIONARY_SIZES:
+            dictionary = words[:size]
+            build = timeit.timeit(
+                lambda: WordsMatcher(dictionary), number=1
+            )
+            matcher = WordsMatcher(dictionary)
+            if matcher.find(text) != sorted(set(loop_find(dictionary, text))):
+                raise CommandError('Результаты проверок не совпадают.')
+            loop = timeit.timeit(
+                lambda: loop_find(dictionary, text), number=number
+            ) / number
+            automaton = timeit.timeit(
+                lambda: matcher.find(text), number=number
+            ) / number
+            self.stdout.write(
+                f'{size:>6} слов: цикл {loop * 1000:8.3f} мс, '
+                f'автомат {automaton * 1000:8.3f} мс '
+                f'(построение {build * 1000:.0f} мс)'
+            )
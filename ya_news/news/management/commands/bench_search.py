@@ -0,0 +1,110 @@
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+from django.test.utils import override_settings
+
+from news.models import News
+from news.search import SEARCH_SQL, build_match_query
+from ya_common.benchmark import use_database
+from ya_common.seeding import BATCH_SIZE, zipf_cum_weights
+
+VOCABULARY_SIZE = 50_000
+ALPHABET = 'абвгдеёжзийклмнопрстуфхцчшщэюя'
+
+
+def random_word():
+    return ''.join(random.choices(ALPHABET, k=random.randint(4, 10)))
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает поиск новостей через icontains и через индекс FTS5 '
+        'на отдельной базе SQLite.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=str(Path(tempfile.gettempdir()) / 'yanews_search.sqlite3'),
+            help='Файл базы для замеров, будет перезаписан.',
+        )
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=[100_000, 1_000_000]
+        )
+        parser.add_argument('--repeat', type=int, default=10)
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        path.unlink(missing_ok=True)
+        # Частые слова встречаются чаще: запросы проверяются и на редких,
+        # и на популярных словах.
+        vocabulary = [random_word() for _ in range(VOCABULARY_SIZE)]
+        weights = zipf_cum_weights(VOCABULARY_SIZE, 1.0)
+        with use_database(path), override_settings(DEBUG=False):
+            call_command('migrate', verbosity=0)
+            seeded = 0
+            for size in sorted(options['sizes']):
+                self.seed(vocabulary, weights, seeded, size)
+                seeded = size
+                self.report(size, vocabulary, options['repeat'])
+
+    def seed(self, vocabulary, weights, start, stop):
+        started = time.perf_counter()
+        with transaction.atomic():
+            for batch_start in range(start, stop, BATCH_SIZE):
+                News.objects.bulk_create(
+                    News(
+                        title=' '.join(random.choices(
+                            vocabulary, cum_weights=weights, k=5
+                        )),
+                        text=' '.join(random.choices(
+                            vocabulary, cum_weights=weights, k=60
+                        )),
+                    )
+                    for _ in range(min(BATCH_SIZE, stop - batch_start))
+                )
+        self.stdout.write(
+            f'Добавлено {stop - start} новостей '
+            f'за {time.perf_counter() - started:.1f} с.'
+        )
+
+    def measure(self, run, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - started)
+        return statistics.median(timings) * 1000
+
+    def report(self, size, vocabulary, repeat):
+        self.stdout.write(self.style.MIGRATE_HEADING(f'{size} новостей'))
+        per_page = settings.NEWS_SEARCH_RESULTS_ON_PAGE
+        for name, word in (
+            ('частое', vocabulary[0]), ('редкое', vocabulary[-1])
+        ):
+            contains = self.measure(lambda: list(
+                News.objects.filter(
+                    Q(title__icontains=word) | Q(text__icontains=word)
+                )[:per_page + 1]
+            ), repeat)
+
+            def full_text():
+                with connection.cursor() as cursor:
+                    cursor.execute(SEARCH_SQL, (
+                        '', '', build_match_query(word), per_page + 1, 0
+                    ))
+                    cursor.fetchall()
+
+            fts = self.measure(full_text, repeat)
+            self.stdout.write(
+                f'{name} слово: icontains {contains:9.2f} мс, '
+                f'FTS5 {fts:9.2f} мс'
+            )
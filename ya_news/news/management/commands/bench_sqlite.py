@@ -0,0 +1,56 @@
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from news.cache import get_page_cache
+from news.models import Comment, News
+from news.seeding import seed_news
+from ya_common.benchmark import SqliteBenchmarkCommand
+from yanews import settings_production
+
+User = get_user_model()
+
+
+class Command(SqliteBenchmarkCommand):
+    help = (
+        'Сравнивает пропускную способность SQLite с настройками по '
+        'умолчанию и с боевыми: несколько потоков читают страницы '
+        'новостей и комментариев, один поток отправляет комментарии. '
+        'Каждый профиль запускается на свежей копии набора данных.'
+    )
+    size_option = 'comments'
+    dataset_prefix = 'yanews_sqlite'
+    pragmas_setting = 'NEWS_SQLITE_PRAGMAS'
+    production_settings = settings_production
+
+    def seed_data(self, comments_count):
+        count = max(comments_count // 100, 10)
+        seed_news(count, count, comments_count, skew=1.0)
+
+    def get_readers(self, readers_count):
+        """Анонимные читатели главной, новостей и комментариев."""
+        get_page_cache().clear()
+        news_ids = list(News.objects.values_list('pk', flat=True))
+
+        def choose_path(rng):
+            pk = rng.choice(news_ids)
+            return rng.choice((
+                reverse('news:home'),
+                reverse('news:detail', args=(pk,)),
+                reverse('news:comments', args=(pk,)),
+            ))
+
+        return [(None, choose_path)] * readers_count
+
+    def get_writer(self):
+        """Комментарии к случайным новостям."""
+        news_ids = list(News.objects.values_list('pk', flat=True))
+        user = User.objects.first()
+
+        def write(rng, number):
+            Comment.objects.create(
+                news_id=rng.choice(news_ids),
+                author=user,
+                text='Комментарий замера',
+            )
+
+        return write
@@ -0,0 +1,148 @@
+import json
+import tempfile
+import time
+from functools import partial
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from news.cache import get_page_cache, invalidate_detail, invalidate_home
+from news.models import Comment, News
+from news.seeding import seed_news
+from ya_common.benchmark import (
+    DEFAULT_THRESHOLD, find_regressions, measure, save_results, use_database
+)
+
+DATASET_SIZES = (1_000, 100_000, 1_000_000)
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет главную, страницу новости и отправку комментария '
+        'тестовым клиентом на наборах данных разного размера: время, '
+        'число запросов, время в SQL и пиковую память. Страницы '
+        'замеряются с пустым кешем страниц (_cold) и с заполненным. '
+        'Размер набора — число комментариев, новостей и пользователей '
+        'в сто раз меньше.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=DATASET_SIZES,
+        )
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument(
+            '--datasets',
+            default=tempfile.gettempdir(),
+            help='Каталог с базами наборов данных, они переиспользуются.',
+        )
+        parser.add_argument(
+            '--reseed', action='store_true',
+            help='Заполнить базы наборов данных заново.',
+        )
+        parser.add_argument('--output', help='Файл для результатов в JSON.')
+        parser.add_argument(
+            '--baseline',
+            help='Результаты прошлого замера в JSON для сравнения.',
+        )
+        parser.add_argument(
+            '--threshold', type=float, default=DEFAULT_THRESHOLD,
+            help='Допустимый относительный рост медианного времени.',
+        )
+
+    def handle(self, *args, **options):
+        results = {}
+        for size in options['sizes']:
+            path = Path(options['datasets']) / f'yanews_views_{size}.sqlite3'
+            if options['reseed']:
+                path.unlink(missing_ok=True)
+            seeded = path.exists()
+            # Без DEBUG соединение не копит запросы в connection.queries,
+            # как и на боевом сервере.
+            with use_database(path), override_settings(DEBUG=False):
+                call_command('migrate', verbosity=0)
+                if not seeded:
+                    self.seed(size)
+                get_page_cache().clear()
+                results[str(size)] = self.run_views(options['repeat'])
+            self.report(size, results[str(size)])
+        if options['output']:
+            save_results(options['output'], results)
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as file:
+                baseline = json.load(file)
+            regressions = find_regressions(
+                results, baseline, options['threshold']
+            )
+            if regressions:
+                raise CommandError(
+                    'Регрессии относительно базового замера:\n'
+                    + '\n'.join(regressions)
+                )
+            self.stdout.write(self.style.SUCCESS('Регрессий нет.'))
+
+    def seed(self, comments_count):
+        started = time.perf_counter()
+        users_count = news_count = max(comments_count // 100, 10)
+        seed_news(users_count, news_count, comments_count, skew=1.0)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        self.stdout.write(
+            f'Набор {comments_count} заполнен за '
+            f'{time.perf_counter() - started:.1f} с.'
+        )
+
+    def run_views(self, repeat):
+        # Самая обсуждаемая новость: худший случай для её страницы.
+        news = News.objects.order_by('-comment_count').first()
+        user = User.objects.first()
+        home_url = reverse('news:home')
+        detail_url = reverse('news:detail', args=(news.pk,))
+        anonymous = Client(HTTP_HOST='localhost')
+        author = Client(HTTP_HOST='localhost')
+        author.force_login(user)
+        invalidate_news = partial(invalidate_detail, news.pk)
+        # Холодный замер сбрасывает кеш страницы перед каждым запросом.
+        pages = {
+            'home': (lambda: anonymous.get(home_url), invalidate_home),
+            'home_authenticated': (
+                lambda: author.get(home_url), invalidate_home
+            ),
+            'detail': (lambda: anonymous.get(detail_url), invalidate_news),
+            'detail_authenticated': (
+                lambda: author.get(detail_url), invalidate_news
+            ),
+        }
+        views = {}
+        for name, (request, invalidate) in pages.items():
+            views[f'{name}_cold'] = (request, invalidate)
+            views[name] = (request, None)
+        views['comment_post'] = (lambda: author.post(
+            detail_url, data={'text': 'Комментарий замера'}
+        ), None)
+        results = {
+            name: measure(request, repeat, prepare)
+            for name, (request, prepare) in views.items()
+        }
+        Comment.objects.filter(text='Комментарий замера').delete()
+        return results
+
+    def report(self, size, results):
+        self.stdout.write(self.style.MIGRATE_HEADING(f'Набор {size}'))
+        for name, result in results.items():
+            self.stdout.write(
+                f'{name:<27} {result["status"]} '
+                f'первый {result["first_ms"]:8.2f} мс, '
+                f'медиана {result["wall_ms"]:8.2f} мс, '
+                f'SQL {result["sql_ms"]:7.2f} мс '
+                f'в {result["queries"]} запр., '
+                f'память {result["peak_kb"]:8.1f} КБ'
+            )
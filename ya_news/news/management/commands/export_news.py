@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from news.export import get_export_lines
+from news.forms import ExportFilterForm
+
+
+class Command(BaseCommand):
+    help = 'Выгружает новости с комментариями в формате JSONL.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date-from', help='Дата в формате ГГГГ-ММ-ДД.')
+        parser.add_argument('--date-to', help='Дата в формате ГГГГ-ММ-ДД.')
+        parser.add_argument(
+            '--output', help='Файл для выгрузки, по умолчанию stdout.'
+        )
+
+    def handle(self, *args, **options):
+        form = ExportFilterForm({
+            'date_from': options['date_from'],
+            'date_to': options['date_to'],
+        })
+        if not form.is_valid():
+            raise CommandError(form.errors.as_text())
+        lines = get_export_lines(**form.cleaned_data)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                output.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
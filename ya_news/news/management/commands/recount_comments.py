@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from news.models import News, comments_total_subquery
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчик комментариев у всех новостей.'
+
+    def handle(self, *args, **options):
+        updated = News.objects.update(
+            comment_count=comments_total_subquery()
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитано новостей: {updated}')
+        )
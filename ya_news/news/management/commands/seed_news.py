@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from news.seeding import seed_news
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу синтетическими пользователями, новостями и '
+        'комментариями для воспроизведения нагрузки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10_000)
+        parser.add_argument('--news', type=int, default=100_000)
+        parser.add_argument('--comments', type=int, default=1_000_000)
+        parser.add_argument(
+            '--skew', type=float, default=1.0,
+            help=(
+                'Показатель распределения Ципфа комментариев по новостям: '
+                '0 — поровну, больше — сильнее перекос к первым новостям.'
+            ),
+        )
+        parser.add_argument(
+            '--password',
+            help='Пароль всех пользователей, по умолчанию вход запрещён.',
+        )
+
+    def handle(self, *args, **options):
+        if options['comments'] and not (options['users'] and options['news']):
+            raise CommandError(
+                'Для комментариев нужны пользователи и новости.'
+            )
+        started = time.perf_counter()
+        seed_news(
+            options['users'], options['news'], options['comments'],
+            options['skew'], options['password'],
+        )
+        elapsed = time.perf_counter() - started
+        total = options['users'] + options['news'] + options['comments']
+        self.stdout.write(self.style.SUCCESS(
+            f'Добавлено строк: {total} за {elapsed:.1f} с '
+            f'({total / elapsed:.0f} строк/с).'
+        ))
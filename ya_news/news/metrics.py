@@ -0,0 +1,11 @@
+import logging
+
+from ya_common import metrics
+
+registry = metrics.Registry('news')
+
+
+class MetricsMiddleware(metrics.MetricsMiddleware):
+    registry = registry
+    logger = logging.getLogger(__name__)
+    duplicate_queries_setting = 'NEWS_METRICS_DUPLICATE_QUERIES'
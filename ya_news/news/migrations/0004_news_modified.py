@@ -0,0 +1,18 @@
+# Generated by Django 3.2.15 on 2026-10-18 06:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0003_comment_and_news_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='news',
+            name='modified',
+            field=models.DateTimeField(auto_now=True, verbose_name='Время изменения'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+from django.db import migrations
+
+CREATE_SEARCH_INDEX = (
+    """
+    CREATE VIRTUAL TABLE news_news_fts USING fts5(
+        title, text, content='news_news', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER news_news_fts_insert AFTER INSERT ON news_news BEGIN
+        INSERT INTO news_news_fts(rowid, title, text)
+        VALUES (new.id, new.title, new.text);
+    END
+    """,
+    """
+    CREATE TRIGGER news_news_fts_delete AFTER DELETE ON news_news BEGIN
+        INSERT INTO news_news_fts(news_news_fts, rowid, title, text)
+        VALUES ('delete', old.id, old.title, old.text);
+    END
+    """,
+    """
+    CREATE TRIGGER news_news_fts_update AFTER UPDATE OF title, text
+    ON news_news BEGIN
+        INSERT INTO news_news_fts(news_news_fts, rowid, title, text)
+        VALUES ('delete', old.id, old.title, old.text);
+        INSERT INTO news_news_fts(rowid, title, text)
+        VALUES (new.id, new.title, new.text);
+    END
+    """,
+    "INSERT INTO news_news_fts(news_news_fts) VALUES ('rebuild')",
+)
+
+DROP_SEARCH_INDEX = (
+    'DROP TRIGGER IF EXISTS news_news_fts_insert',
+    'DROP TRIGGER IF EXISTS news_news_fts_delete',
+    'DROP TRIGGER IF EXISTS news_news_fts_update',
+    'DROP TABLE IF EXISTS news_news_fts',
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0004_news_modified'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_SEARCH_INDEX, DROP_SEARCH_INDEX),
+    ]
@@ -2,15 +2,29 @@ from datetime import datetime
 
 from django.conf import settings
 from django.db import models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 
 
 class News(models.Model):
     title = models.CharField(max_length=50)
     text = models.TextField()
     date = models.DateField(default=datetime.today)
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False,
+    )
+    modified = models.DateTimeField(
+        'Время изменения',
+        auto_now=True,
+    )
 
     class Meta:
         ordering = ('-date',)
+        indexes = (
+            models.Index(fields=('date',), name='news_date_idx'),
+        )
         verbose_name_plural = 'Новости'
         verbose_name = 'Новость'
 
@@ -32,6 +46,31 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ('created',)
+        indexes = (
+            models.Index(
+                fields=('news', 'created'), name='comment_news_created_idx'
+            ),
+            models.Index(
+                fields=('author', 'created'),
+                name='comment_author_created_idx'
+            ),
+        )
 
     def __str__(self):
         return self.text[:50]
+
+
+def comments_total_subquery(comment_model=Comment):
+    """
+    Число комментариев новости коррелированным подзапросом.
+
+    В отличие от JOIN с GROUP BY не мешает выбрать последние новости
+    по индексу и считается только для попавших в выборку строк.
+    comment_model позволяет подставить историческую модель миграций.
+    """
+    totals = comment_model.objects.filter(
+        news=OuterRef('pk')
+    ).order_by().values('news').annotate(
+        total=Count('pk')
+    ).values('total')
+    return Coalesce(Subquery(totals), 0)
@@ -0,0 +1,108 @@
+import os
+import threading
+from collections import deque
+
+from django.conf import settings
+
+
+class WordsMatcher:
+    """
+    Автомат Ахо — Корасик для поиска запрещённых слов.
+
+    Строится один раз по словарю и находит все вхождения всех слов
+    за один проход по тексту, независимо от размера словаря.
+    """
+
+    def __init__(self, words):
+        self.transitions = [{}]
+        self.fail = [0]
+        self.output = [()]
+        for word in words:
+            word = word.strip().lower()
+            if word:
+                self._add(word)
+        self._link()
+
+    def _add(self, word):
+        node = 0
+        for char in word:
+            next_node = self.transitions[node].get(char)
+            if next_node is None:
+                next_node = len(self.transitions)
+                self.transitions[node][char] = next_node
+                self.transitions.append({})
+                self.fail.append(0)
+                self.output.append(())
+            node = next_node
+        self.output[node] += (word,)
+
+    def _link(self):
+        """Проставляет суффиксные ссылки обходом в ширину."""
+        queue = deque(self.transitions[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.transitions[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and char not in self.transitions[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.transitions[fallback].get(char, 0)
+                self.output[child] += self.output[self.fail[child]]
+
+    def find(self, text):
+        """Возвращает отсортированный список найденных в тексте слов."""
+        transitions, fail, output = self.transitions, self.fail, self.output
+        found = set()
+        node = 0
+        for char in text.lower():
+            while node and char not in transitions[node]:
+                node = fail[node]
+            node = transitions[node].get(char, 0)
+            if output[node]:
+                found.update(output[node])
+        return sorted(found)
+
+
+class BadWordsFilter:
+    """
+    Словарь запрещённых слов со встроенными словами и файлом.
+
+    Файл NEWS_BAD_WORDS_FILE содержит по одной словоформе в строке
+    и перечитывается, как только меняется время его изменения.
+    """
+
+    def __init__(self, words):
+        self.words = tuple(words)
+        self.state = None
+        self.lock = threading.Lock()
+
+    def get_version(self):
+        path = settings.NEWS_BAD_WORDS_FILE
+        if path is None:
+            return None
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return path, None
+        return path, (stat.st_mtime_ns, stat.st_size)
+
+    def load_words(self, version):
+        if version is None or version[1] is None:
+            return self.words
+        with open(version[0], encoding='utf-8') as file:
+            return self.words + tuple(file)
+
+    def get_matcher(self):
+        """Возвращает автомат, пересобирая его при изменении словаря."""
+        version = self.get_version()
+        state = self.state
+        if state is None or state[0] != version:
+            with self.lock:
+                state = self.state
+                if state is None or state[0] != version:
+                    state = version, WordsMatcher(self.load_words(version))
+                    self.state = state
+        return state[1]
+
+    def find(self, text):
+        return self.get_matcher().find(text)
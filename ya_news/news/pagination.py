@@ -0,0 +1,54 @@
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Q
+from django.http import Http404
+
+from .models import Comment
+
+CURSOR_SEPARATOR = ','
+# Наибольшее значение BigAutoField и целого SQLite.
+MAX_ID = 2 ** 63 - 1
+
+
+def encode_cursor(comment):
+    """Курсор — пара (created, id) последнего показанного комментария."""
+    return f'{comment.created.isoformat()}{CURSOR_SEPARATOR}{comment.pk}'
+
+
+def decode_cursor(cursor):
+    try:
+        created, pk = cursor.rsplit(CURSOR_SEPARATOR, 1)
+        created, pk = datetime.fromisoformat(created), int(pk)
+    except ValueError:
+        raise Http404('Некорректный курсор комментариев.')
+    if not 0 < pk <= MAX_ID:
+        raise Http404('Некорректный курсор комментариев.')
+    return created, pk
+
+
+def get_comments_page(news_id, cursor=None):
+    """
+    Возвращает страницу комментариев новости и курсор следующей страницы.
+
+    Комментарии идут в порядке Comment.Meta.ordering, id нужен для
+    однозначности при совпадающем created. Страница выбирается по
+    ключу (created, id), поэтому стоимость запроса не зависит от того,
+    насколько далеко пролистано обсуждение.
+    """
+    per_page = settings.COMMENTS_COUNT_ON_NEWS_PAGE
+    comments = Comment.objects.filter(
+        news_id=news_id
+    ).select_related('author').only(
+        'news_id', 'text', 'created', 'author__username'
+    ).order_by('created', 'pk')
+    if cursor:
+        created, pk = decode_cursor(cursor)
+        comments = comments.filter(
+            Q(created__gt=created) | Q(created=created, pk__gt=pk)
+        )
+    page = list(comments[:per_page + 1])
+    if len(page) > per_page:
+        page = page[:per_page]
+        return page, encode_cursor(page[-1])
+    return page, None
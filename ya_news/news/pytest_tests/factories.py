@@ -0,0 +1,46 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from news.models import Comment, News, comments_total_subquery
+from ya_common.testing import save_all
+
+
+def make_news(count, **fields):
+    """Новости, каждая следующая на день старше предыдущей."""
+    today = timezone.localdate()
+    now = timezone.now()
+    return save_all([
+        News(**{
+            'title': f'Новость {index}',
+            'text': 'Просто текст.',
+            'date': today - timedelta(days=index),
+            'modified': now,
+            **fields,
+        })
+        for index in range(count)
+    ])
+
+
+def make_comments(news, author, count, interval=timedelta(minutes=1)):
+    """
+    Комментарии к новости, созданные с шагом interval.
+
+    При нулевом interval время у всех одинаковое: так проверяется
+    порядок комментариев с совпадающим временем создания. Счётчик
+    комментариев новости пересчитывается.
+    """
+    now = timezone.now()
+    comments = save_all([
+        Comment(
+            news=news,
+            author=author,
+            text=f'Текст {index}',
+            created=now + index * interval,
+        )
+        for index in range(count)
+    ])
+    News.objects.filter(pk=news.pk).update(
+        comment_count=comments_total_subquery()
+    )
+    return comments
@@ -1,7 +1,20 @@
+import json
+from http import HTTPStatus
+
 import pytest
 
 from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
 from django.urls import reverse
+from django.views.generic import TemplateView
+
+from news.models import Comment, News
+from news.views import CachedContentMixin
+
+# Валидаторы для условного GET и сам список новостей.
+HOME_PAGE_QUERIES_COUNT = 2
+CACHED_PAGE_QUERIES_COUNT = 0
 
 
 @pytest.mark.django_db
@@ -25,6 +38,103 @@ def test_news_order(client, news_page_and_sorting_by_data):
         assert all_dates[i] >= all_dates[i + 1]
 
 
+@pytest.mark.django_db
+@pytest.mark.parametrize('use_counter', (False, True))
+def test_home_page_comments_count(
+        client, settings, django_assert_num_queries,
+        news_with_comments, use_counter
+):
+    """
+    Проверка, что число комментариев на главной считается в SQL
+    за фиксированное количество запросов.
+    """
+    call_command('recount_comments')
+    settings.NEWS_USE_COMMENT_COUNTER = use_counter
+    with django_assert_num_queries(HOME_PAGE_QUERIES_COUNT):
+        response = client.get(reverse('news:home'))
+    news = response.context['object_list'][0]
+    assert news.comments_total == Comment.objects.count()
+
+
+@pytest.mark.django_db
+def test_home_page_cache_invalidation(
+        client, django_assert_num_queries, author, news
+):
+    """
+    Проверка, что главная отдаётся из кеша и сбрасывается
+    при появлении нового комментария.
+    """
+    url = reverse('news:home')
+    client.get(url)
+    with django_assert_num_queries(CACHED_PAGE_QUERIES_COUNT):
+        response = client.get(url)
+    assert 'Комментариев' not in response.content.decode()
+    Comment.objects.create(news=news, author=author, text='Текст')
+    response = client.get(url)
+    assert 'Комментариев: 1' in response.content.decode()
+
+
+def test_cached_detail_has_links_only_for_comment_author(
+        author_client, admin_client, comment
+):
+    """
+    Проверка, что ссылки на редактирование и удаление в закешированной
+    странице новости видит только автор комментария.
+    """
+    url = reverse('news:detail', args=(comment.news_id,))
+    edit_url = reverse('news:edit', args=(comment.id,))
+    assert edit_url in author_client.get(url).content.decode()
+    assert edit_url not in admin_client.get(url).content.decode()
+
+
+def test_cached_detail_keeps_news_in_context(client, news):
+    """Проверка, что страница новости из кеша отдаёт новость в контекст."""
+    url = reverse('news:detail', args=(news.id,))
+    client.get(url)
+    response = client.get(url)
+    assert response.context['news'] == news
+    assert response.context['object'] == news
+
+
+def test_cached_content_view_requires_template_and_key():
+    with pytest.raises(ImproperlyConfigured):
+        type('View', (CachedContentMixin, TemplateView), {}).as_view()
+
+
+def test_detail_conditional_get(author_client, comment, form_data):
+    """
+    Проверка ответа 304 на неизменённую страницу новости и нового
+    ETag после редактирования и удаления комментария.
+    """
+    url = reverse('news:detail', args=(comment.news_id,))
+    etag = author_client.get(url)['ETag']
+    response = author_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert not response.templates
+    author_client.post(reverse('news:edit', args=(comment.id,)), form_data)
+    response = author_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    etag = response['ETag']
+    author_client.post(reverse('news:delete', args=(comment.id,)))
+    response = author_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+
+
+@pytest.mark.django_db
+def test_home_conditional_get(client, news_page_and_sorting_by_data):
+    """
+    Проверка ответа 304 на неизменённую главную и полного ответа
+    после удаления новости.
+    """
+    url = reverse('news:home')
+    etag = client.get(url)['ETag']
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    News.objects.first().delete()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+
+
 @pytest.mark.django_db
 def test_comments_order(client, sorting_comments_by_data, news_id_for_args):
     """Проверка сортировки комментариев на странице новости."""
@@ -37,6 +147,37 @@ def test_comments_order(client, sorting_comments_by_data, news_id_for_args):
         assert all_comments[i].created <= all_comments[i + 1].created
 
 
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'commented_news',
+    (
+        pytest.lazy_fixture('news_with_comments'),
+        pytest.lazy_fixture('news_with_tied_comments'),
+    ),
+)
+def test_comments_keyset_pagination(client, settings, commented_news):
+    """
+    Проверка, что постраничная выдача комментариев возвращает каждый
+    комментарий ровно один раз и в порядке создания, в том числе
+    при совпадающем времени создания.
+    """
+    settings.COMMENTS_COUNT_ON_NEWS_PAGE = 4
+    news_id = commented_news.id
+    response = client.get(reverse('news:detail', args=(news_id,)))
+    shown = list(response.context['comments'])
+    cursor = response.context['next_cursor']
+    url = reverse('news:comments', args=(news_id,))
+    while cursor:
+        response = client.get(url, {'after': cursor})
+        assert len(response.context['comments']) <= 4
+        shown += response.context['comments']
+        cursor = response.context['next_cursor']
+    expected = list(
+        Comment.objects.filter(news_id=news_id).order_by('created', 'id')
+    )
+    assert shown == expected
+
+
 def test_authorized_client_has_form(author_client, news):
     """Проверка наличии формы у авторизованного пользователя."""
     url = reverse('news:detail', args=(news.id,))
@@ -49,3 +190,67 @@ def test_anonymous_client_has_no_form(client, news):
     url = reverse('news:detail', args=(news.id,))
     response = client.get(url)
     assert 'form' not in response.context
+
+
+@pytest.mark.django_db
+def test_export_streams_news_with_comments(
+        client, news_page_and_sorting_by_data, sorting_comments_by_data
+):
+    """Проверка потоковой выгрузки новостей с комментариями."""
+    response = client.get(reverse('news:export'))
+    assert response.streaming
+    rows = [
+        json.loads(line)
+        for line in b''.join(response.streaming_content).splitlines()
+    ]
+    assert len(rows) == News.objects.count()
+    exported_comments = [
+        comment['id'] for row in rows for comment in row['comments']
+    ]
+    assert exported_comments == list(
+        Comment.objects.order_by('news_id', 'created').values_list(
+            'id', flat=True
+        )
+    )
+    date_to = News.objects.order_by('date')[1].date
+    response = client.get(reverse('news:export'), {'date_to': date_to})
+    assert len(b''.join(response.streaming_content).splitlines()) == 2
+
+
+@pytest.mark.django_db
+def test_search_ranks_and_highlights(client):
+    """Проверка порядка и подсветки результатов поиска."""
+    in_text = News.objects.create(
+        title='Погода', text='Завтра ожидается <b>дождь</b> и ветер.'
+    )
+    in_title = News.objects.create(title='Дождь в городе', text='Текст.')
+    News.objects.create(title='Спорт', text='Матч перенесли.')
+    response = client.get(reverse('news:search'), {'q': 'дождь'})
+    results = response.context['results']
+    assert [news.pk for news in results] == [in_title.pk, in_text.pk]
+    assert '<mark>дождь</mark>' in results[1].snippet
+    assert '&lt;b&gt;' in results[1].snippet
+
+
+@pytest.mark.django_db
+def test_search_index_follows_news_changes(client, news):
+    """Проверка, что индекс обновляется при изменении новостей."""
+    url = reverse('news:search')
+    news.title = 'Новый заголовок'
+    news.save()
+    assert client.get(url, {'q': 'новый'}).context['results'] == [news]
+    call_command('rebuild_news_search')
+    news.delete()
+    assert client.get(url, {'q': 'новый'}).context['results'] == []
+
+
+@pytest.mark.django_db
+def test_search_page_out_of_range(client, news):
+    """Проверка, что слишком дальняя страница поиска не ломает запрос."""
+    response = client.get(
+        reverse('news:search'),
+        {'q': 'дождь', 'page': '10000000000000000000'},
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert 'page' in response.context['form'].errors
+    assert 'results' not in response.context
@@ -2,13 +2,19 @@ import pytest
 
 from pytest_django.asserts import assertRedirects, assertFormError
 
+from django.core.management import call_command
+from django.db import connection, connections
 from django.urls import reverse
 
 from news.forms import BAD_WORDS, WARNING
 
-from news.models import Comment
+from news.models import Comment, News
+from news.search import search_news
+from news.seeding import seed_news
+from ya_common.seeding import deferred_indexes
 
 from http import HTTPStatus
+from io import StringIO
 
 
 COMMENT_DELET = 0
@@ -87,3 +93,85 @@ def test_user_cant_use_bad_words(author_client, comment, form_data):
     response = author_client.post(url, bad_words_data)
     assertFormError(response, 'form', 'text', errors=WARNING)
     assert Comment.objects.count() == COMMENT_NOT_DELET
+
+
+def test_comment_counter_follows_create_and_delete(
+        author_client, form_data, news
+):
+    """Проверка счётчика комментариев при создании и удалении."""
+    author_client.post(reverse('news:detail', args=(news.id,)), form_data)
+    news.refresh_from_db()
+    assert news.comment_count == COMMENT_NOT_DELET
+    comment = Comment.objects.get()
+    author_client.post(reverse('news:delete', args=(comment.id,)))
+    news.refresh_from_db()
+    assert news.comment_count == COMMENT_DELET
+
+
+def test_bad_words_file_is_reloaded(author_client, news, settings, tmp_path):
+    """Проверка, что словарь запрещённых слов перечитывается из файла."""
+    url = reverse('news:detail', args=(news.id,))
+    bad_words_file = tmp_path / 'bad_words.txt'
+    bad_words_file.write_text('бяка\n', encoding='utf-8')
+    settings.NEWS_BAD_WORDS_FILE = bad_words_file
+    response = author_client.post(url, {'text': 'Ну ты и Бяка!'})
+    assertFormError(response, 'form', 'text', errors=WARNING)
+    bad_words_file.write_text('бука\nзлюка\n', encoding='utf-8')
+    response = author_client.post(url, {'text': 'Бука и злюка.'})
+    assert response.context['form'].errors.as_data()['text'][0].params == {
+        'words': ['бука', 'злюка']
+    }
+    response = author_client.post(url, {'text': 'Ну ты и бяка!'})
+    assertRedirects(response, f'{url}#comments')
+
+
+def test_seed_news(author, client):
+    """Проверка синтетических данных: счётчики, перекос и поиск."""
+    client.get(reverse('news:home'))
+    seed_news(
+        users_count=5, news_count=10, comments_count=500, skew=1
+    )
+    news = News.objects.order_by('pk')
+    assert news.count() == 10
+    assert sum(item.comment_count for item in news) == 500
+    assert all(
+        item.comment_count == item.comment_set.count() for item in news
+    )
+    assert news[0].comment_count > news[9].comment_count
+    results, _ = search_news(news[0].text.split()[0])
+    assert results
+    home = client.get(reverse('news:home')).content.decode()
+    assert News.objects.first().title in home
+
+
+@pytest.mark.django_db
+def test_deferred_indexes_are_restored_on_error():
+    """Индексы таблицы возвращаются, даже если вставка упала."""
+    table = Comment._meta.db_table
+
+    def get_indexes():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' "
+                'AND tbl_name = %s AND sql IS NOT NULL', (table,)
+            )
+            return sorted(cursor.fetchall())
+
+    indexes = get_indexes()
+    assert indexes
+    with pytest.raises(ValueError):
+        with deferred_indexes([table]):
+            raise ValueError
+    assert get_indexes() == indexes
+
+
+@pytest.mark.django_db
+def test_bench_indexes_runs_on_historical_schema(tmp_path):
+    """Замер индексов не должен ломаться от новых столбцов моделей."""
+    output = StringIO()
+    call_command(
+        'bench_indexes', path=str(tmp_path / 'bench.sqlite3'),
+        users=3, news=5, comments=20, repeat=1, stdout=output,
+    )
+    assert 'После индексов' in output.getvalue()
+    assert 'benchmark' not in connections.databases
@@ -0,0 +1,194 @@
+import logging
+from http import HTTPStatus
+
+import pytest
+
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from news.auth import get_user_cache, user_cache_key
+from news.cache import get_page_cache
+from news.forms import BAD_WORDS
+from news.metrics import registry
+from news.models import News
+
+# Загрузка пользователя в первом запросе после входа:
+# сессия уже лежит в кеше, дальше и пользователь берётся оттуда.
+AUTH_QUERIES_COUNT = 1
+# Новость, первая страница комментариев и валидаторы лежат в кеше.
+CACHED_DETAIL_QUERIES_COUNT = 0
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'name, args, queries_count',
+    (
+        # Валидаторы для условного GET и список новостей.
+        ('news:home', None, 2),
+        # Валидаторы, новость и первая страница комментариев.
+        ('news:detail', pytest.lazy_fixture('news_id_for_args'), 3),
+        ('news:comments', pytest.lazy_fixture('news_id_for_args'), 1),
+    ),
+)
+def test_anonymous_pages_queries_count(
+        client, django_assert_num_queries, comment, name, args, queries_count
+):
+    """Проверка числа запросов к базе на страницах для анонима."""
+    url = reverse(name, args=args)
+    with django_assert_num_queries(queries_count):
+        client.get(url)
+
+
+@pytest.mark.parametrize(
+    'name, method, args, data, queries_count',
+    (
+        # Новость, вставка комментария, счётчик и время изменения новости.
+        (
+            'news:detail', 'post', pytest.lazy_fixture('news_id_for_args'),
+            pytest.lazy_fixture('form_data'), 3
+        ),
+        # Новость и первая страница комментариев для повторного показа.
+        (
+            'news:detail', 'post', pytest.lazy_fixture('news_id_for_args'),
+            {'text': BAD_WORDS[0]}, 2
+        ),
+        # Комментарий вместе с новостью.
+        ('news:edit', 'get', pytest.lazy_fixture('id_for_args'), None, 1),
+        # Комментарий, его обновление и отметка об изменении новости.
+        (
+            'news:edit', 'post', pytest.lazy_fixture('id_for_args'),
+            pytest.lazy_fixture('form_data'), 3
+        ),
+        ('news:delete', 'get', pytest.lazy_fixture('id_for_args'), None, 1),
+        # Комментарий, удаление, счётчик и время изменения новости.
+        ('news:delete', 'post', pytest.lazy_fixture('id_for_args'), None, 3),
+    ),
+)
+def test_author_pages_queries_count(
+        author_client, django_assert_num_queries,
+        name, method, args, data, queries_count
+):
+    """Проверка числа запросов к базе при работе с комментариями."""
+    url = reverse(name, args=args)
+    with django_assert_num_queries(AUTH_QUERIES_COUNT + queries_count):
+        getattr(author_client, method)(url, data or {})
+
+
+@pytest.mark.django_db
+def test_author_detail_page_without_queries(
+        author_client, django_assert_num_queries, news_id_for_args
+):
+    """Проверка, что сессия и пользователь не стоят запросов к базе."""
+    url = reverse('news:detail', args=news_id_for_args)
+    author_client.get(url)
+    with django_assert_num_queries(CACHED_DETAIL_QUERIES_COUNT):
+        response = author_client.get(url)
+    assert 'form' in response.context
+
+
+@pytest.mark.django_db
+def test_cached_user_is_invalidated(
+        author_client, django_assert_num_queries, author, news_id_for_args
+):
+    """Проверка сброса кеша пользователя при сохранении и выходе."""
+    url = reverse('news:detail', args=news_id_for_args)
+    author_client.get(url)
+    author.first_name = 'Имя'
+    author.save()
+    with django_assert_num_queries(AUTH_QUERIES_COUNT):
+        response = author_client.get(url)
+    assert response.context['user'].first_name == 'Имя'
+    author_client.logout()
+    assert get_user_cache().get(user_cache_key(author.pk)) is None
+
+
+@pytest.mark.django_db
+def test_inactive_cached_user_is_anonymous(
+        author_client, django_user_model, author, news_id_for_args
+):
+    """Закешированный неактивный пользователь считается анонимным."""
+    url = reverse('news:detail', args=news_id_for_args)
+    author_client.get(url)
+    django_user_model.objects.filter(pk=author.pk).update(is_active=False)
+    author.is_active = False
+    get_user_cache().set(user_cache_key(author.pk), author)
+    response = author_client.get(url)
+    assert not response.context['user'].is_authenticated
+    assert get_user_cache().get(user_cache_key(author.pk)) is None
+
+
+@pytest.mark.django_db
+def test_page_cache_clear_keeps_users_logged_in(
+        author_client, django_assert_num_queries, author, news_id_for_args
+):
+    """Очистка кеша страниц не трогает сессии и пользователей."""
+    url = reverse('news:detail', args=news_id_for_args)
+    author_client.get(url)
+    get_page_cache().clear()
+    author_client.get(url)
+    with django_assert_num_queries(CACHED_DETAIL_QUERIES_COUNT):
+        response = author_client.get(url)
+    assert response.context['user'] == author
+
+
+@pytest.mark.parametrize(
+    'name, queries_count',
+    (('news:home', 2), ('news:detail', 3)),
+)
+def test_queries_count_does_not_grow_with_data(
+        client, django_assert_num_queries, reference_db, name, queries_count
+):
+    """Проверка числа запросов на общем наборе данных."""
+    news = News.objects.order_by('-comment_count').first()
+    assert news.comment_count > settings.COMMENTS_COUNT_ON_NEWS_PAGE
+    args = (news.pk,) if name == 'news:detail' else None
+    with django_assert_num_queries(queries_count):
+        client.get(reverse(name, args=args))
+
+
+@pytest.mark.django_db
+def test_metrics_count_view_queries(
+        client, admin_client, comment, news_id_for_args
+):
+    """Проверка метрик представления в формате Prometheus."""
+    registry.clear()
+    url = reverse('news:detail', args=news_id_for_args)
+    with CaptureQueriesContext(connection) as queries:
+        client.get(url)
+    queries_count = len(queries)
+    content = admin_client.get(reverse('news:metrics')).content.decode()
+    assert 'news_requests_total{view="news:detail"} 1' in content
+    assert (
+        f'news_sql_queries_total{{view="news:detail"}} {queries_count}'
+    ) in content
+    assert (
+        'news_request_duration_seconds_bucket'
+        '{view="news:detail",le="+Inf"} 1'
+    ) in content
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'parametrized_client, expected_status',
+    (
+        (pytest.lazy_fixture('client'), HTTPStatus.FOUND),
+        (pytest.lazy_fixture('author_client'), HTTPStatus.FORBIDDEN),
+    ),
+)
+def test_metrics_for_staff_only(parametrized_client, expected_status):
+    """Проверка, что метрики закрыты от анонимов и обычных пользователей."""
+    response = parametrized_client.get(reverse('news:metrics'))
+    assert response.status_code == expected_status
+
+
+@pytest.mark.django_db
+def test_metrics_log_duplicate_queries(
+        author_client, settings, caplog, id_for_args
+):
+    """Проверка записи в журнал повторяющихся запросов."""
+    settings.NEWS_METRICS_DUPLICATE_QUERIES = 1
+    with caplog.at_level(logging.WARNING, logger='news.metrics'):
+        author_client.get(reverse('news:edit', args=id_for_args))
+    assert 'news:edit' in caplog.text
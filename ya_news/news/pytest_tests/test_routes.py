@@ -11,6 +11,7 @@ from pytest_django.asserts import assertRedirects
     'name, args',
     (
         ('news:detail', pytest.lazy_fixture('id_for_args')),
+        ('news:comments', pytest.lazy_fixture('news_id_for_args')),
         ('news:home', None),
         ('users:login', None),
         ('users:logout', None),
@@ -67,3 +68,25 @@ def test_redirects(client, name, args):
     expected_url = f'{login_url}?next={url}'
     response = client.get(url)
     assertRedirects(response, expected_url)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'after',
+    (
+        'не курсор',
+        '2020-01-01T00:00:00,abc',
+        '2020-01-01T00:00:00,100000000000000000000',
+        '2020-01-01T00:00:00,-1',
+    ),
+)
+def test_bad_comments_cursor_is_not_found(client, news_id_for_args, after):
+    url = reverse('news:comments', args=news_id_for_args)
+    response = client.get(url, {'after': after})
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_comments_of_missing_news_are_not_found(client):
+    response = client.get(reverse('news:comments', args=(1,)))
+    assert response.status_code == HTTPStatus.NOT_FOUND
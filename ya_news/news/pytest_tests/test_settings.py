@@ -0,0 +1,90 @@
+import pytest
+
+from django.core.signals import request_started
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from importlib import import_module, reload
+
+HEALTH_ALIAS = 'health'
+
+
+@pytest.mark.django_db
+def test_sqlite_pragmas_apply_to_new_connections(settings):
+    settings.NEWS_SQLITE_PRAGMAS = {'cache_size': -1234, 'busy_timeout': 321}
+    new_connection = connections.create_connection(DEFAULT_DB_ALIAS)
+    try:
+        with new_connection.cursor() as cursor:
+            values = [
+                cursor.execute(f'PRAGMA {name}').fetchone()[0]
+                for name in settings.NEWS_SQLITE_PRAGMAS
+            ]
+    finally:
+        new_connection.close()
+    assert values == [-1234, 321]
+
+
+def test_production_settings_do_not_change_base_settings():
+    base = import_module('yanews.settings')
+    production = import_module('yanews.settings_production')
+    assert production.DATABASES['default']['CONN_MAX_AGE'] > 0
+    assert base.DATABASES['default'].get('CONN_MAX_AGE', 0) == 0
+    assert 'loaders' not in base.TEMPLATES[0]['OPTIONS']
+    assert production.NEWS_SQLITE_PRAGMAS['journal_mode'] == 'wal'
+
+
+def test_production_caches_are_shared_between_processes(monkeypatch):
+    """Кеш страниц и сессий боевого сервера общий для процессов."""
+    monkeypatch.setenv('DJANGO_CACHE_DIR', '/var/cache/yanews')
+    production = reload(import_module('yanews.settings_production'))
+    caches = {
+        alias: (cache['BACKEND'], str(cache['LOCATION']))
+        for alias, cache in production.CACHES.items()
+    }
+    monkeypatch.delenv('DJANGO_CACHE_DIR')
+    reload(production)
+    assert caches == {
+        alias: (
+            'django.core.cache.backends.filebased.FileBasedCache',
+            f'/var/cache/yanews/{alias}',
+        )
+        for alias in ('default', 'auth')
+    }
+
+
+def test_production_secrets_come_from_environment(monkeypatch):
+    """Ключ и хосты боевого сервера берутся из окружения."""
+    monkeypatch.setenv('DJANGO_SECRET_KEY', 'ключ из окружения')
+    monkeypatch.setenv('DJANGO_ALLOWED_HOSTS', 'news.example, www.example')
+    production = reload(import_module('yanews.settings_production'))
+    assert production.SECRET_KEY == 'ключ из окружения'
+    assert production.ALLOWED_HOSTS == ['news.example', 'www.example']
+    monkeypatch.delenv('DJANGO_SECRET_KEY')
+    monkeypatch.delenv('DJANGO_ALLOWED_HOSTS')
+    production = reload(production)
+    assert production.SECRET_KEY == ''
+    assert production.ALLOWED_HOSTS == []
+
+
+@pytest.mark.django_db
+def test_broken_persistent_connection_is_closed(settings, tmp_path):
+    """Сломанное постоянное соединение закрывается в начале запроса."""
+    connections.databases[HEALTH_ALIAS] = {
+        **settings.DATABASES['default'],
+        'NAME': str(tmp_path / 'health.sqlite3'),
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+    }
+    try:
+        persistent = connections[HEALTH_ALIAS]
+        persistent.ensure_connection()
+        request_started.send(sender=__name__)
+        assert persistent.connection is not None
+        persistent.connection.close()
+        request_started.send(sender=__name__)
+        assert persistent.connection is None
+        with persistent.cursor() as cursor:
+            cursor.execute('SELECT 1')
+    finally:
+        connections[HEALTH_ALIAS].close()
+        del connections[HEALTH_ALIAS]
+        del connections.databases[HEALTH_ALIAS]
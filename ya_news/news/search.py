@@ -0,0 +1,76 @@
+import re
+from importlib import import_module
+
+from django.conf import settings
+from django.db import connection
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import News
+
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_END = '\x03'
+
+# Индекс и его триггеры описаны один раз, в миграции.
+search_index_migration = import_module(
+    'news.migrations.0005_news_search_index'
+)
+
+SEARCH_SQL = """
+    SELECT news_news.id, news_news.title, news_news.date,
+           snippet(news_news_fts, -1, %s, %s, '…', 16) AS snippet
+    FROM news_news_fts
+    JOIN news_news ON news_news.id = news_news_fts.rowid
+    WHERE news_news_fts MATCH %s
+    ORDER BY bm25(news_news_fts, 10.0, 1.0)
+    LIMIT %s OFFSET %s
+"""
+
+
+def build_match_query(query):
+    """
+    Превращает ввод пользователя в запрос FTS5.
+
+    Каждое слово берётся в кавычки, чтобы операторы и спецсимволы
+    FTS5 не ломали запрос; слова объединяются через И.
+    """
+    return ' '.join(f'"{word}"' for word in re.findall(r'\w+', query))
+
+
+def highlight(snippet):
+    """Экранирует фрагмент текста и выделяет в нём найденные слова."""
+    return mark_safe(
+        escape(snippet)
+        .replace(HIGHLIGHT_START, '<mark>')
+        .replace(HIGHLIGHT_END, '</mark>')
+    )
+
+
+def search_news(query, page=1):
+    """
+    Возвращает новости, найденные по запросу, и признак следующей страницы.
+
+    Результаты упорядочены по релевантности, совпадения в заголовке
+    весят больше совпадений в тексте.
+    """
+    match_query = build_match_query(query)
+    if not match_query:
+        return [], False
+    per_page = settings.NEWS_SEARCH_RESULTS_ON_PAGE
+    results = list(News.objects.raw(SEARCH_SQL, (
+        HIGHLIGHT_START, HIGHLIGHT_END, match_query,
+        per_page + 1, (page - 1) * per_page,
+    )))
+    for news in results:
+        news.snippet = highlight(news.snippet)
+    return results[:per_page], len(results) > per_page
+
+
+def rebuild_search_index():
+    """Пересоздаёт поисковый индекс с триггерами и заполняет его заново."""
+    with connection.cursor() as cursor:
+        for sql in (
+            search_index_migration.DROP_SEARCH_INDEX
+            + search_index_migration.CREATE_SEARCH_INDEX
+        ):
+            cursor.execute(sql)
@@ -0,0 +1,102 @@
+import random
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from ya_common.seeding import (
+    BATCH_SIZE, deferred_indexes, insert_rows, insert_users, next_id,
+    zipf_cum_weights,
+)
+from .cache import invalidate_pages
+from .models import Comment, News, comments_total_subquery
+from .search import rebuild_search_index
+
+# Время комментариев и тексты новостей берутся из заранее
+# подготовленных наборов: собирать их на каждую строку дороже вставки.
+TIMESTAMPS_COUNT = 100_000
+TEXTS_COUNT = 1000
+COMMENTS_PERIOD = timedelta(days=3650)
+WORDS = (
+    'город', 'новость', 'погода', 'спорт', 'выборы', 'концерт', 'театр',
+    'дорога', 'школа', 'музей', 'парк', 'река', 'поезд', 'рынок', 'врач',
+    'футбол', 'выставка', 'фестиваль', 'ремонт', 'праздник', 'наука',
+    'компания', 'завод', 'урожай', 'мост', 'снег', 'дождь', 'жара',
+)
+
+User = get_user_model()
+
+
+def generate_news(start, count):
+    today = timezone.localdate()
+    dates = [str(today - timedelta(days=days)) for days in range(3650)]
+    texts = [' '.join(random.choices(WORDS, k=20)) for _ in range(TEXTS_COUNT)]
+    modified = str(timezone.now().replace(tzinfo=None))
+    for pk in range(start, start + count):
+        yield (
+            pk,
+            f'Новость {pk}',
+            texts[pk % len(texts)],
+            dates[pk % len(dates)],
+            modified,
+            0,
+        )
+
+
+def generate_comments(count, news_ids, news_weights, author_ids):
+    now = timezone.now().replace(tzinfo=None)
+    seconds = int(COMMENTS_PERIOD.total_seconds())
+    timestamps = [
+        str(now - timedelta(seconds=random.randrange(seconds)))
+        for _ in range(min(count, TIMESTAMPS_COUNT))
+    ]
+    for start in range(0, count, BATCH_SIZE):
+        size = min(BATCH_SIZE, count - start)
+        yield from zip(
+            random.choices(news_ids, cum_weights=news_weights, k=size),
+            random.choices(author_ids, k=size),
+            random.choices(WORDS, k=size),
+            random.choices(timestamps, k=size),
+        )
+
+
+def seed_news(users_count, news_count, comments_count, skew, password=None):
+    """
+    Добавляет пользователей, новости и комментарии к ним.
+
+    Комментарии распределяются по новостям по закону Ципфа с
+    показателем skew, авторы комментариев выбираются равномерно.
+    Счётчики комментариев и индекс поиска обновляются в конце,
+    закешированные страницы сбрасываются.
+    """
+    tables = [
+        User._meta.db_table, News._meta.db_table, Comment._meta.db_table
+    ]
+    with transaction.atomic():
+        users_start = next_id(User)
+        news_start = next_id(News)
+        with deferred_indexes(tables):
+            insert_users(users_start, users_count, make_password(password))
+            insert_rows(
+                News,
+                ('id', 'title', 'text', 'date', 'modified', 'comment_count'),
+                generate_news(news_start, news_count),
+            )
+            if comments_count:
+                insert_rows(
+                    Comment, ('news', 'author', 'text', 'created'),
+                    generate_comments(
+                        comments_count,
+                        range(news_start, news_start + news_count),
+                        zipf_cum_weights(news_count, skew),
+                        range(users_start, users_start + users_count),
+                    ),
+                )
+        News.objects.filter(pk__gte=news_start).update(
+            comment_count=comments_total_subquery()
+        )
+        rebuild_search_index()
+    invalidate_pages()
+    transaction.on_commit(invalidate_pages)
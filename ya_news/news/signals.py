@@ -0,0 +1,95 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_logged_out
+from django.core.signals import request_started
+from django.db.backends.signals import connection_created
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from ya_common.db import close_broken_connections
+from .auth import invalidate_user
+from .cache import invalidate_detail, invalidate_home
+from .models import Comment, News
+
+
+@receiver(post_save, sender=Comment)
+def update_news_on_comment_save(sender, instance, created, **kwargs):
+    """
+    Отмечаем изменение новости, а при создании комментария
+    увеличиваем счётчик её комментариев.
+    """
+    changes = {'modified': timezone.now()}
+    if created:
+        changes['comment_count'] = F('comment_count') + 1
+    News.objects.filter(pk=instance.news_id).update(**changes)
+
+
+@receiver(post_delete, sender=Comment)
+def update_news_on_comment_delete(sender, instance, **kwargs):
+    """
+    Отмечаем изменение новости и уменьшаем счётчик её комментариев.
+    """
+    News.objects.filter(pk=instance.news_id).update(
+        modified=timezone.now(),
+        comment_count=Greatest(F('comment_count') - 1, 0),
+    )
+
+
+@receiver(post_save, sender=News)
+@receiver(post_delete, sender=News)
+def invalidate_news_pages(sender, instance, **kwargs):
+    """Сбрасываем кеш главной и страницы изменённой новости."""
+    invalidate_home()
+    invalidate_detail(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def invalidate_saved_comment_pages(sender, instance, created, **kwargs):
+    """
+    Сбрасываем кеш страницы новости с комментарием, а для нового
+    комментария и главной, где выводится их число.
+    """
+    invalidate_detail(instance.news_id)
+    if created:
+        invalidate_home()
+
+
+@receiver(post_delete, sender=Comment)
+def invalidate_deleted_comment_pages(sender, instance, **kwargs):
+    """Сбрасываем кеш страницы новости с комментарием и главной."""
+    invalidate_detail(instance.news_id)
+    invalidate_home()
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def invalidate_saved_user(sender, instance, **kwargs):
+    """Сбрасываем закешированного для сессий пользователя."""
+    invalidate_user(instance.pk)
+
+
+@receiver(user_logged_out)
+def invalidate_logged_out_user(sender, request, user, **kwargs):
+    if user is not None:
+        invalidate_user(user.pk)
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """
+    Выполняет прагмы из NEWS_SQLITE_PRAGMAS на новом соединении.
+
+    Они идут мимо курсора Django, чтобы не попадать в учёт запросов.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    for name, value in settings.NEWS_SQLITE_PRAGMAS.items():
+        connection.connection.execute(f'PRAGMA {name} = {value}')
+
+
+@receiver(request_started)
+def check_persistent_connections(sender, **kwargs):
+    close_broken_connections()
@@ -7,10 +7,18 @@ app_name = 'news'
 urlpatterns = [
     path('', views.NewsList.as_view(), name='home'),
     path('news/<int:pk>/', views.NewsDetailView.as_view(), name='detail'),
+    path(
+        'news/<int:pk>/comments/',
+        views.NewsComments.as_view(),
+        name='comments'
+    ),
     path(
         'delete_comment/<int:pk>/',
         views.CommentDelete.as_view(),
         name='delete'
     ),
     path('edit_comment/<int:pk>/', views.CommentUpdate.as_view(), name='edit'),
+    path('search/', views.NewsSearch.as_view(), name='search'),
+    path('export/', views.NewsExport.as_view(), name='export'),
+    path('metrics/', views.Metrics.as_view(), name='metrics'),
 ]
@@ -1,49 +1,219 @@
+from http import HTTPStatus
+
 from django.conf import settings
-from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.auth.mixins import (
+    LoginRequiredMixin, UserPassesTestMixin
+)
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import F
+from django.http import (
+    Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+)
 from django.shortcuts import get_object_or_404
+from django.template.loader import render_to_string
 from django.urls import reverse
+from django.utils.decorators import method_decorator
+from django.utils.functional import SimpleLazyObject
+from django.utils.safestring import mark_safe
 from django.views import generic
+from django.views.decorators.http import condition
+
+from .cache import (
+    detail_cache_key, fill_comment_actions, get_page_cache, home_cache_key
+)
+from .conditional import (
+    detail_etag, detail_last_modified, home_etag
+)
+from .export import get_export_lines
+from .forms import CommentForm, ExportFilterForm, SearchForm
+from .metrics import registry
+from .models import Comment, News, comments_total_subquery
+from .pagination import get_comments_page
+from .search import search_news
+
+
+class CachedContentMixin:
+    """
+    Кеширует общую для всех пользователей часть страницы.
 
-from .forms import CommentForm
-from .models import Comment, News
+    Шапка, форма комментария и ссылки на свои комментарии
+    дорисовываются поверх неё при каждом запросе. Ключ кеша строит
+    функция content_cache_key из news.cache: ей передаются значения
+    аргументов URL из content_cache_kwargs и признак авторизации.
+    """
+    content_template_name = None
+    content_cache_key = None
+    content_cache_kwargs = ()
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        if cls.content_template_name is None or cls.content_cache_key is None:
+            raise ImproperlyConfigured(
+                f'{cls.__name__} должен задать content_template_name '
+                'и content_cache_key.'
+            )
+        return super().as_view(**initkwargs)
+
+    def get_content_cache_key(self):
+        return self.content_cache_key(
+            *(self.kwargs[name] for name in self.content_cache_kwargs),
+            self.request.user.is_authenticated,
+        )
 
+    def get_content_context(self, context):
+        """Контекст общей части, по умолчанию — контекст страницы."""
+        return context
+
+    def get_content(self, context):
+        cache = get_page_cache()
+        key = self.get_content_cache_key()
+        content = cache.get(key)
+        if content is None:
+            content = render_to_string(
+                self.content_template_name, self.get_content_context(context)
+            )
+            cache.set(key, content, settings.NEWS_PAGE_CACHE_TIMEOUT)
+        return mark_safe(fill_comment_actions(content, self.request.user))
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['content'] = self.get_content(context)
+        return context
 
-class NewsList(generic.ListView):
+
+@method_decorator(condition(etag_func=home_etag), name='get')
+class NewsList(CachedContentMixin, generic.ListView):
     """Список новостей."""
     model = News
     template_name = 'news/home.html'
+    content_template_name = 'news/includes/home_content.html'
+    content_cache_key = staticmethod(home_cache_key)
 
     def get_queryset(self):
         """
         Выводим только несколько последних новостей.
 
         Их количество определяется в настройках проекта.
+        Число комментариев считается в SQL: либо подзапросом, либо
+        берётся из счётчика News.comment_count.
         """
-        return self.model.objects.prefetch_related(
-            'comment_set'
+        if settings.NEWS_USE_COMMENT_COUNTER:
+            comments_total = F('comment_count')
+        else:
+            comments_total = comments_total_subquery()
+        return self.model.objects.annotate(
+            comments_total=comments_total
         )[:settings.NEWS_COUNT_ON_HOME_PAGE]
 
 
-class NewsDetail(generic.DetailView):
-    model = News
+class NewsContentMixin(CachedContentMixin):
+    """Новость с первой страницей комментариев."""
+    content_template_name = 'news/includes/detail_content.html'
+    content_cache_key = staticmethod(detail_cache_key)
+    content_cache_kwargs = ('pk',)
+
+    def get_news(self):
+        if not hasattr(self, 'news'):
+            self.news = get_object_or_404(News, pk=self.kwargs['pk'])
+        return self.news
+
+    def get_content_context(self, context):
+        news = self.get_news()
+        comments, next_cursor = get_comments_page(news.pk)
+        return {
+            'news': news,
+            'comments': comments,
+            'next_cursor': next_cursor,
+        }
+
+
+@method_decorator(
+    condition(etag_func=detail_etag, last_modified_func=detail_last_modified),
+    name='get'
+)
+class NewsDetail(NewsContentMixin, generic.TemplateView):
     template_name = 'news/detail.html'
 
-    def get_object(self, queryset=None):
-        obj = get_object_or_404(
-            self.model.objects.prefetch_related('comment_set__author'),
-            pk=self.kwargs['pk']
+    def get_context_data(self, **kwargs):
+        # Как в DetailView, но новость загружается, только если
+        # к ней обратятся мимо закешированной части страницы.
+        news = SimpleLazyObject(self.get_news)
+        context = super().get_context_data(object=news, news=news, **kwargs)
+        if self.request.user.is_authenticated:
+            context['form'] = CommentForm()
+        return context
+
+
+class NewsComments(generic.View):
+    """Следующая страница комментариев новости в виде HTML-фрагмента."""
+    template_name = 'news/includes/comments.html'
+
+    def get(self, request, *args, **kwargs):
+        comments, next_cursor = get_comments_page(
+            self.kwargs['pk'], request.GET.get('after')
         )
-        return obj
+        # Непустая страница уже доказывает, что новость есть.
+        if not comments and not News.objects.filter(
+            pk=self.kwargs['pk']
+        ).exists():
+            raise Http404('Новость не найдена.')
+        content = render_to_string(self.template_name, {
+            'comments': comments,
+            'next_cursor': next_cursor,
+            'news_id': self.kwargs['pk'],
+        })
+        return HttpResponse(fill_comment_actions(content, request.user))
+
+
+class NewsSearch(generic.TemplateView):
+    """Полнотекстовый поиск по новостям."""
+    template_name = 'news/search.html'
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        if self.request.user.is_authenticated:
-            context['form'] = CommentForm()
+        form = SearchForm(self.request.GET or None)
+        context['form'] = form
+        if form.is_valid():
+            page = form.cleaned_data['page'] or 1
+            context['results'], has_next = search_news(
+                form.cleaned_data['q'], page
+            )
+            context['page'] = page
+            context['has_next'] = has_next
         return context
 
 
+class NewsExport(generic.View):
+    """Выгрузка всех новостей с комментариями в формате JSONL."""
+
+    def get(self, request, *args, **kwargs):
+        form = ExportFilterForm(request.GET)
+        if not form.is_valid():
+            return JsonResponse(
+                form.errors, status=HTTPStatus.BAD_REQUEST
+            )
+        return StreamingHttpResponse(
+            get_export_lines(**form.cleaned_data),
+            content_type='application/x-ndjson; charset=utf-8',
+        )
+
+
+class Metrics(UserPassesTestMixin, generic.View):
+    """Метрики запросов для Prometheus, доступные только персоналу."""
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request, *args, **kwargs):
+        return HttpResponse(
+            registry.render(),
+            content_type='text/plain; version=0.0.4; charset=utf-8',
+        )
+
+
 class NewsComment(
         LoginRequiredMixin,
+        NewsContentMixin,
         generic.detail.SingleObjectMixin,
         generic.FormView
 ):
@@ -51,6 +221,9 @@ class NewsComment(
     form_class = CommentForm
     template_name = 'news/detail.html'
 
+    def get_news(self):
+        return self.object
+
     def post(self, request, *args, **kwargs):
         self.object = self.get_object()
         return super().post(request, *args, **kwargs)
@@ -63,19 +236,20 @@ class NewsComment(
         return super().form_valid(form)
 
     def get_success_url(self):
-        post = self.get_object()
-        return reverse('news:detail', kwargs={'pk': post.pk}) + '#comments'
+        return reverse(
+            'news:detail', kwargs={'pk': self.object.pk}
+        ) + '#comments'
 
 
 class NewsDetailView(generic.View):
+    detail_view = staticmethod(NewsDetail.as_view())
+    comment_view = staticmethod(NewsComment.as_view())
 
     def get(self, request, *args, **kwargs):
-        view = NewsDetail.as_view()
-        return view(request, *args, **kwargs)
+        return self.detail_view(request, *args, **kwargs)
 
     def post(self, request, *args, **kwargs):
-        view = NewsComment.as_view()
-        return view(request, *args, **kwargs)
+        return self.comment_view(request, *args, **kwargs)
 
 
 class CommentBase(LoginRequiredMixin):
@@ -83,14 +257,20 @@ class CommentBase(LoginRequiredMixin):
     model = Comment
 
     def get_success_url(self):
-        comment = self.get_object()
         return reverse(
-            'news:detail', kwargs={'pk': comment.news.pk}
+            'news:detail', kwargs={'pk': self.object.news_id}
         ) + '#comments'
 
     def get_queryset(self):
-        """Пользователь может работать только со своими комментариями."""
-        return self.model.objects.filter(author=self.request.user)
+        """
+        Пользователь может работать только со своими комментариями.
+
+        Заголовок новости выводится на странице, поэтому новость
+        загружается тем же запросом.
+        """
+        return self.model.objects.filter(
+            author=self.request.user
+        ).select_related('news')
 
 
 class CommentUpdate(CommentBase, generic.UpdateView):
@@ -1,9 +1,14 @@
+import sys
 from pathlib import Path
 
 from django.urls import reverse_lazy
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Общий код проектов лежит рядом с ними в пакете ya_common.
+if str(BASE_DIR.parent) not in sys.path:
+    sys.path.append(str(BASE_DIR.parent))
+
 SECRET_KEY = 'django-insecure-7)dgs++2!#==aye4rd=5)c)bw0eokiyqx0hts6#t80!$c&$s+('
 
 DEBUG = True
@@ -21,11 +26,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Первым, чтобы учесть время и запросы остальных middleware.
+    'news.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'news.auth.CachedAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -58,6 +65,30 @@ DATABASES = {
     }
 }
 
+# Сессии читаются из кеша и пишутся и в кеш, и в базу:
+# в отличие от подписанных cookie, их можно отозвать на сервере.
+# С несколькими процессами кеш должен быть общим для них,
+# иначе выход в одном процессе не виден остальным.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+# Сессии и пользователи лежат отдельно от страниц: очистка кеша
+# страниц не должна разлогинивать пользователей.
+SESSION_CACHE_ALIAS = 'auth'
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'auth': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'auth',
+    },
+    # Кеш, общий для нескольких процессов:
+    # 'default': {
+    #     'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+    #     'LOCATION': BASE_DIR / 'cache',
+    # },
+}
+
 
 AUTH_PASSWORD_VALIDATORS = []
 
@@ -80,3 +111,36 @@ LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('news:home')
 
 NEWS_COUNT_ON_HOME_PAGE = 10
+
+COMMENTS_COUNT_ON_NEWS_PAGE = 20
+
+NEWS_SEARCH_RESULTS_ON_PAGE = 10
+
+# Размер порции строк при потоковой выгрузке новостей.
+NEWS_EXPORT_CHUNK_SIZE = 2000
+
+# Дополнительный словарь запрещённых в комментариях слов:
+# по одной словоформе в строке, перечитывается при изменении файла.
+NEWS_BAD_WORDS_FILE = None
+
+# Брать число комментариев на главной из счётчика News.comment_count
+# вместо агрегации по таблице комментариев.
+NEWS_USE_COMMENT_COUNTER = False
+
+# Кеш общей части главной и страниц новостей.
+NEWS_PAGE_CACHE = 'default'
+NEWS_PAGE_CACHE_TIMEOUT = 60 * 10
+
+# Сколько одинаковых запросов SQL за один запрос к сайту
+# считать признаком N+1 и писать в журнал.
+NEWS_METRICS_DUPLICATE_QUERIES = 5
+
+# Прагмы SQLite, выполняемые на каждом новом соединении,
+# в порядке словаря. По умолчанию настройки SQLite не меняются.
+NEWS_SQLITE_PRAGMAS = {}
+
+# Кеш пользователей сессий для CachedAuthenticationMiddleware.
+# Изменения пользователей через QuerySet.update кеш не сбрасывают
+# и вступают в силу не позже чем через время жизни записи.
+NEWS_USER_CACHE = 'auth'
+NEWS_USER_CACHE_TIMEOUT = 60
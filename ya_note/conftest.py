@@ -0,0 +1,11 @@
+import pytest
+
+from notes.auth import get_user_cache
+from notes.cache import get_notes_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """id в SQLite переиспользуются между тестами, как и ключи кеша."""
+    get_notes_cache().clear()
+    get_user_cache().clear()
@@ -0,0 +1,77 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+HITS_KEY = 'notes:stats:hits'
+MISSES_KEY = 'notes:stats:misses'
+
+
+def get_notes_cache():
+    return caches[settings.NOTES_CACHE]
+
+
+def generation_key(author_id):
+    return f'notes:generation:{author_id}'
+
+
+def get_generation(author_id):
+    """
+    Возвращает поколение кеша автора.
+
+    Начальное значение берётся из часов, а не с единицы: если счётчик
+    вытеснен из кеша, новое поколение не совпадёт со старыми ключами.
+    """
+    cache = get_notes_cache()
+    key = generation_key(author_id)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, time.time_ns(), None)
+        generation = cache.get(key)
+    return generation
+
+
+def bump_generation(author_id):
+    """Делает устаревшими все закешированные данные заметок автора."""
+    cache = get_notes_cache()
+    key = generation_key(author_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), None)
+
+
+def count(key):
+    cache = get_notes_cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, None)
+        cache.incr(key)
+
+
+def get_or_compute(author_id, name, compute):
+    """
+    Берёт значение из кеша автора или вычисляет и сохраняет его.
+
+    Ключ включает поколение автора, поэтому после изменения заметок
+    старые значения просто перестают читаться и истекают сами.
+    """
+    cache = get_notes_cache()
+    key = f'notes:{author_id}:{get_generation(author_id)}:{name}'
+    value = cache.get(key)
+    if value is not None:
+        count(HITS_KEY)
+        return value
+    count(MISSES_KEY)
+    value = compute()
+    cache.set(key, value, settings.NOTES_CACHE_TIMEOUT)
+    return value
+
+
+def get_stats():
+    stats = get_notes_cache().get_many((HITS_KEY, MISSES_KEY))
+    return {
+        'hits': stats.get(HITS_KEY, 0),
+        'misses': stats.get(MISSES_KEY, 0),
+    }
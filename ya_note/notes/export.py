@@ -0,0 +1,102 @@
+import json
+import zipfile
+
+from django.conf import settings
+
+from .models import Note
+
+EXPORT_FORMATS = ('zip', 'jsonl')
+CONTENT_TYPES = {
+    'zip': 'application/zip',
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+}
+
+
+class StreamBuffer:
+    """
+    Файл только для записи, содержимое которого забирается по частям.
+
+    zipfile умеет писать в поток без seek: размеры файлов тогда
+    записываются после их данных.
+    """
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def get_author_notes(author, after=None):
+    notes = Note.objects.filter(author=author).order_by('id')
+    if after is not None:
+        notes = notes.filter(id__gt=after)
+    return notes
+
+
+def get_export_notes(author, after=None, limit=None):
+    """Заметки автора по одной, без загрузки всей выборки."""
+    notes = get_author_notes(author, after).values(
+        'id', 'title', 'text', 'slug'
+    )
+    if limit is not None:
+        notes = notes[:limit]
+    return notes.iterator(chunk_size=settings.NOTES_EXPORT_CHUNK_SIZE)
+
+
+def get_next_zip_cursor(author, after=None):
+    """
+    Id последней заметки архива, если за ним остаются заметки.
+
+    Архив вмещает NOTES_EXPORT_ZIP_MAX_NOTES заметок, следующий
+    запрашивается с этим курсором.
+    """
+    limit = settings.NOTES_EXPORT_ZIP_MAX_NOTES
+    ids = list(get_author_notes(author, after).values_list(
+        'id', flat=True
+    )[limit - 1:limit + 1])
+    if len(ids) < 2:
+        return None
+    return str(ids[0])
+
+
+def get_jsonl_chunks(author, after=None):
+    for note in get_export_notes(author, after):
+        yield (json.dumps(note, ensure_ascii=False) + '\n').encode()
+
+
+def get_zip_chunks(author, after=None):
+    """
+    Архив с заметкой в Markdown на каждый slug, порциями байтов.
+
+    В памяти держится одна заметка и оглавление архива, которое
+    zipfile дописывает в конец, поэтому заметок в архиве не больше
+    NOTES_EXPORT_ZIP_MAX_NOTES.
+    """
+    buffer = StreamBuffer()
+    notes = get_export_notes(
+        author, after, settings.NOTES_EXPORT_ZIP_MAX_NOTES
+    )
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for note in notes:
+            archive.writestr(
+                f'{note["slug"] or note["id"]}.md',
+                f'# {note["title"]}\n\n{note["text"]}\n',
+            )
+            yield buffer.pop()
+    yield buffer.pop()
+
+
+def get_export_chunks(author, format, after=None):
+    if format == 'jsonl':
+        return get_jsonl_chunks(author, after)
+    return get_zip_chunks(author, after)
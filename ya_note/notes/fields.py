@@ -0,0 +1,83 @@
+import zlib
+
+from django.conf import settings
+from django.db import models
+from django.db.models import lookups
+
+# Функция SQLite, которая возвращает текст заметки в исходном виде.
+# Регистрируется для каждого соединения в notes.signals.
+PLAIN_TEXT_FUNCTION = 'notes_plain_text'
+
+
+def compress_text(text):
+    """
+    Сжимает текст, если он не короче порога и сжатие выгодно.
+
+    Сжатый текст хранится как BLOB в той же колонке: SQLite не
+    приводит BLOB к тексту, поэтому отличить его можно по типу.
+    """
+    threshold = settings.NOTES_TEXT_COMPRESSION_THRESHOLD
+    if text is None or threshold is None:
+        return text
+    encoded = text.encode()
+    if len(encoded) < threshold:
+        return text
+    compressed = zlib.compress(encoded)
+    return compressed if len(compressed) < len(encoded) else text
+
+
+def plain_text(value):
+    if isinstance(value, bytes):
+        return zlib.decompress(value).decode()
+    return value
+
+
+class CompressedTextField(models.TextField):
+    """
+    Текстовое поле, длинные значения которого хранятся сжатыми.
+
+    Фильтры по полю сравнивают исходный текст через функцию
+    notes_plain_text, поиск по словам идёт через индекс FTS5.
+    Остальные фильтры, например in и gt, сравнивали бы сжатые
+    данные, поэтому не поддерживаются.
+    """
+
+    def get_lookup(self, lookup_name):
+        if lookup_name not in SUPPORTED_LOOKUPS:
+            return None
+        return super().get_lookup(lookup_name)
+
+    def from_db_value(self, value, expression, connection):
+        return plain_text(value)
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        value = super().get_db_prep_value(value, connection, prepared)
+        # Значения для фильтров приходят с prepared=True и не сжимаются.
+        if not prepared:
+            value = compress_text(value)
+        return value
+
+
+class PlainTextLookupMixin:
+
+    def process_lhs(self, compiler, connection, lhs=None):
+        sql, params = super().process_lhs(compiler, connection, lhs)
+        return f'{PLAIN_TEXT_FUNCTION}({sql})', params
+
+
+PLAIN_TEXT_LOOKUPS = (
+    lookups.Exact, lookups.IExact,
+    lookups.Contains, lookups.IContains,
+    lookups.StartsWith, lookups.IStartsWith,
+    lookups.EndsWith, lookups.IEndsWith,
+    lookups.Regex, lookups.IRegex,
+)
+SUPPORTED_LOOKUPS = {
+    lookups.IsNull.lookup_name,
+    *(lookup.lookup_name for lookup in PLAIN_TEXT_LOOKUPS),
+}
+
+for lookup in PLAIN_TEXT_LOOKUPS:
+    CompressedTextField.register_lookup(
+        type(lookup.__name__, (PlainTextLookupMixin, lookup), {})
+    )
@@ -1,13 +1,28 @@
-from pytils.translit import slugify
-
 from django import forms
+from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connections, router, transaction
 
+from .importing import FORMATS
 from .models import Note
+from .slugs import SlugAllocator, make_slug, slug_prefix
 
 WARNING = ' - такой slug уже существует, придумайте уникальное значение!'
 
 
+def begin_immediate(execute, sql, params, many, context):
+    """
+    Начинает транзакцию SQLite сразу с блокировкой на запись.
+
+    Отложенная транзакция, уже читавшая базу, при попытке записи
+    во время чужой записи получает «database is locked» без ожидания.
+    Немедленная ждёт свою очередь в пределах таймаута соединения.
+    """
+    if sql == 'BEGIN':
+        sql = 'BEGIN IMMEDIATE'
+    return execute(sql, params, many, context)
+
+
 class NoteForm(forms.ModelForm):
     """Форма для создания или обновления заметки."""
 
@@ -16,14 +31,68 @@ class NoteForm(forms.ModelForm):
         fields = ('title', 'text', 'slug')
 
     def clean_slug(self):
-        """Обрабатывает случай, если slug не уникален."""
-        cleaned_data = super().clean()
-        slug = cleaned_data.get('slug')
+        """
+        Берёт slug из заголовка, если он не указан.
+
+        Уникальность здесь не проверяется: заметку сразу пытаются
+        сохранить, а занятый slug обрабатывает save_note.
+        """
+        slug = self.cleaned_data.get('slug')
+        self.slug_is_generated = not slug
         if not slug:
-            title = cleaned_data.get('title')
-            slug = slugify(title)[:100]
-        if Note.objects.filter(
-                slug=slug
-        ).exclude(id=self.instance.pk).exists():
-            raise ValidationError(slug + WARNING)
+            slug = make_slug(self.cleaned_data.get('title') or '')
         return slug
+
+    def validate_unique(self):
+        """Уникальность slug проверяет база при сохранении."""
+
+    def save_note(self, note):
+        """
+        Сохраняет заметку, возвращает False, если slug так и не нашёлся.
+
+        Каждая попытка идёт в своей транзакции, которая в SQLite
+        начинается сразу с блокировкой на запись, или в точке
+        сохранения внутри внешней транзакции. Если занят slug,
+        указанный пользователем, в форму добавляется ошибка. Занятый
+        slug из заголовка заменяется первым свободным с суффиксом
+        -2, -3, и попытка повторяется не больше NOTES_SLUG_RETRIES раз.
+        """
+        base = note.slug
+        using = router.db_for_write(Note, instance=note)
+        for _ in range(settings.NOTES_SLUG_RETRIES + 1):
+            try:
+                with connections[using].execute_wrapper(begin_immediate):
+                    with transaction.atomic(using=using):
+                        note.save(using=using)
+                return True
+            except IntegrityError:
+                if not Note.objects.using(using).filter(
+                    slug=note.slug
+                ).exists():
+                    raise
+                if not self.slug_is_generated:
+                    break
+            note.slug = SlugAllocator(Note.objects.using(using).filter(
+                slug__startswith=slug_prefix(base)
+            ).values_list('slug', flat=True)).allocate(base)
+        self.add_error('slug', note.slug + WARNING)
+        return False
+
+
+class NoteImportForm(forms.Form):
+    """Файл с заметками для импорта."""
+    file = forms.FileField()
+    format = forms.ChoiceField(
+        choices=[(format, format) for format in FORMATS], required=False
+    )
+
+    def clean(self):
+        """Определяет формат по расширению файла, если он не указан."""
+        cleaned_data = super().clean()
+        file = cleaned_data.get('file')
+        if file and not cleaned_data.get('format'):
+            extension = file.name.rpartition('.')[2].lower()
+            if extension not in FORMATS:
+                raise ValidationError('Укажите формат файла: jsonl или csv.')
+            cleaned_data['format'] = extension
+        return cleaned_data
@@ -0,0 +1,127 @@
+import csv
+import json
+from itertools import islice
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_slug
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Note
+from .search import index_notes
+from .signals import invalidate_author
+from .slugs import SlugAllocator, make_slug, slug_prefix
+
+FORMATS = ('jsonl', 'csv')
+DEFAULT_SLUG = 'note'
+IMPORT_FIELDS = ('title', 'text', 'slug')
+# Условия LIKE в одном запросе: SQLite ограничивает глубину выражения.
+PREFIXES_PER_QUERY = 500
+
+
+def read_rows(file, format):
+    """Читает заметки из текстового файла JSONL или CSV в виде словарей."""
+    try:
+        if format == 'csv':
+            yield from csv.DictReader(file)
+            return
+        for number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                raise ValidationError(f'Строка {number}: некорректный JSON.')
+    except UnicodeDecodeError:
+        raise ValidationError('Файл должен быть в кодировке UTF-8.')
+
+
+def clean_row(number, row):
+    """
+    Проверяет строку файла и возвращает заголовок, текст и slug.
+
+    Значения должны быть строками не длиннее, чем допускают поля
+    модели заметки.
+    """
+    if not isinstance(row, dict):
+        raise ValidationError(f'Строка {number}: ожидается объект.')
+    values = {}
+    for name in IMPORT_FIELDS:
+        field = Note._meta.get_field(name)
+        value = row.get(name)
+        if value is not None and not isinstance(value, str):
+            raise ValidationError(
+                f'Строка {number}: поле {name} должно быть строкой.'
+            )
+        if value and field.max_length and len(value) > field.max_length:
+            raise ValidationError(
+                f'Строка {number}: поле {name} длиннее '
+                f'{field.max_length} символов.'
+            )
+        values[name] = value or field.get_default()
+    if not values['text']:
+        raise ValidationError(f'Строка {number}: нужен текст.')
+    return values
+
+
+def build_notes(author, rows):
+    """Заметки из строк файла, slug в них — ещё не проверенная основа."""
+    for number, row in enumerate(rows, 1):
+        values = clean_row(number, row)
+        values['slug'] = (
+            values['slug'] or make_slug(values['title']) or DEFAULT_SLUG
+        )
+        try:
+            validate_slug(values['slug'])
+        except ValidationError:
+            raise ValidationError(f'Строка {number}: некорректный slug.')
+        yield Note(author=author, **values)
+
+
+def load_taken_slugs(allocator, notes, loaded):
+    """
+    Добавляет в allocator занятые slug, с которыми могут совпасть
+    заметки пачки.
+
+    Загружаются только slug с тем же началом, что у основ пачки;
+    уже загруженные начала запоминаются в loaded.
+    """
+    prefixes = list({slug_prefix(note.slug) for note in notes} - loaded)
+    for start in range(0, len(prefixes), PREFIXES_PER_QUERY):
+        condition = Q()
+        for prefix in prefixes[start:start + PREFIXES_PER_QUERY]:
+            condition |= Q(slug__startswith=prefix)
+        allocator.taken.update(
+            Note.objects.filter(condition).values_list('slug', flat=True)
+        )
+    loaded.update(prefixes)
+
+
+@transaction.atomic
+def import_notes(author, rows, batch_size=None):
+    """
+    Добавляет заметки автора пачками и возвращает их количество.
+
+    Перед вставкой пачки загружаются занятые slug, которые могут
+    совпасть с её slug, совпадения получают суффиксы -2, -3 в порядке
+    строк файла. Ошибка в любой строке отменяет весь импорт.
+    """
+    batch_size = batch_size or settings.NOTES_IMPORT_BATCH_SIZE
+    allocator = SlugAllocator()
+    loaded = set()
+    notes = build_notes(author, rows)
+    imported = 0
+    while batch := list(islice(notes, batch_size)):
+        load_taken_slugs(allocator, batch, loaded)
+        for note in batch:
+            note.slug = allocator.allocate(note.slug)
+        Note.objects.bulk_create(batch)
+        index_notes(Note.objects.filter(
+            slug__in=[note.slug for note in batch]
+        ))
+        imported += len(batch)
+    # bulk_create не отправляет сигналы, кеш автора и индекс поиска
+    # обновляются здесь.
+    invalidate_author(author.pk)
+    return imported
@@ -0,0 +1,28 @@
+from django.core.management.base import CommandError
+from django.test import Client
+from django.urls import reverse
+
+from notes.models import Note
+from ya_common.benchmark import ServerBenchmarkCommand
+
+
+class Command(ServerBenchmarkCommand):
+    help = (
+        'Нагрузочное сравнение страниц заметок под WSGI с пулом '
+        'синхронных воркеров и под ASGI, где Django 3.2 выполняет '
+        'синхронные представления в одном общем потоке. '
+        'Запросы автора подаются в приложения напрямую, без сети.'
+    )
+
+    def get_requests(self):
+        note = Note.objects.select_related('author').first()
+        if note is None:
+            raise CommandError('В базе нет заметок, заполните её.')
+        client = Client()
+        client.force_login(note.author)
+        paths = (
+            reverse('notes:list'),
+            reverse('notes:detail', args=(note.slug,)),
+            reverse('notes:edit', args=(note.slug,)),
+        )
+        return paths, f'sessionid={client.cookies["sessionid"].value}'
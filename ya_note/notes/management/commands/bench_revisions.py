@@ -0,0 +1,140 @@
+import random
+import statistics
+import tempfile
+import time
+import zlib
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.models import Max, Sum
+from django.db.models.functions import Length
+
+from notes.models import Note, NoteRevision
+from notes.revisions import get_revision_text, make_delta
+
+ALIAS = 'benchmark'
+LINE_LENGTH = 64
+
+User = get_user_model()
+
+
+def random_line():
+    return ''.join(random.choices(
+        'абвгдежзийклмнопрстуфхцчшщэюя ', k=LINE_LENGTH - 1
+    )) + '\n'
+
+
+def longest_chain(revisions):
+    """
+    Номера полной копии и последней ревизии самой длинной цепочки.
+
+    Цепочка идёт от полной копии до ревизии перед следующей копией,
+    а у последней копии — до последней ревизии.
+    """
+    snapshots = list(revisions.filter(is_snapshot=True).order_by(
+        'number'
+    ).values_list('number', flat=True))
+    ends = [number - 1 for number in snapshots[1:]]
+    ends.append(revisions.aggregate(last=Max('number'))['last'])
+    return max(zip(snapshots, ends), key=lambda chain: chain[1] - chain[0])
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет объём истории и время восстановления ревизий '
+        'для большой заметки, которую много раз правили.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=str(
+                Path(tempfile.gettempdir()) / 'yanote_revisions.sqlite3'
+            ),
+            help='Файл базы для замеров, будет перезаписан.',
+        )
+        parser.add_argument('--size', type=int, default=1_000_000)
+        parser.add_argument('--edits', type=int, default=1000)
+        parser.add_argument('--restores', type=int, default=50)
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        path.unlink(missing_ok=True)
+        connections.databases[ALIAS] = {
+            **settings.DATABASES['default'], 'NAME': str(path)
+        }
+        try:
+            call_command('migrate', database=ALIAS, verbosity=0)
+            note = self.edit(options['size'], options['edits'])
+            self.report_restores(
+                NoteRevision.objects.using(ALIAS).filter(note=note),
+                options['restores'],
+            )
+        finally:
+            connections[ALIAS].close()
+            del connections[ALIAS]
+            del connections.databases[ALIAS]
+            path.unlink(missing_ok=True)
+
+    def edit(self, size, edits):
+        """Создаёт заметку, правит её edits раз и печатает объём истории."""
+        author = User.objects.using(ALIAS).create(username='author')
+        # Кириллица занимает два байта в UTF-8.
+        lines = [random_line() for _ in range(size // 2 // LINE_LENGTH)]
+        note = Note(title='Большая заметка', text=''.join(lines))
+        note.author = author
+        note.save(using=ALIAS)
+        text_size = len(note.text.encode())
+        save_timings = []
+        delta_timings = []
+        for _ in range(edits):
+            note = Note.objects.using(ALIAS).get(pk=note.pk)
+            lines[random.randrange(len(lines))] = random_line()
+            note.text = ''.join(lines)
+            started = time.perf_counter()
+            make_delta(note.loaded_text, note.text)
+            delta_timings.append(time.perf_counter() - started)
+            started = time.perf_counter()
+            note.save()
+            save_timings.append(time.perf_counter() - started)
+        revisions = NoteRevision.objects.using(ALIAS).filter(note=note)
+        stored = revisions.aggregate(total=Sum(Length('data')))['total']
+        compressed = len(zlib.compress(note.text.encode()))
+        count = revisions.count()
+        self.stdout.write(
+            f'Текст {text_size / 2 ** 20:.2f} МБ, ревизий {count}: '
+            f'история {stored / 2 ** 20:.2f} МБ, полные копии заняли бы '
+            f'{text_size * count / 2 ** 20:.0f} МБ, '
+            f'сжатые копии {compressed * count / 2 ** 20:.0f} МБ.'
+        )
+        if save_timings:
+            self.stdout.write(
+                f'Сохранение с ревизией: медиана '
+                f'{statistics.median(save_timings) * 1000:.1f} мс, из них '
+                f'разница {statistics.median(delta_timings) * 1000:.1f} мс.'
+            )
+        return note
+
+    def report_restores(self, revisions, restores):
+        count = revisions.count()
+        numbers = random.sample(range(1, count + 1), min(restores, count))
+        restore_timings = []
+        for number in numbers:
+            revision = revisions.get(number=number)
+            started = time.perf_counter()
+            get_revision_text(revision)
+            restore_timings.append(time.perf_counter() - started)
+        snapshot, last = longest_chain(revisions)
+        worst = revisions.get(number=last)
+        started = time.perf_counter()
+        get_revision_text(worst)
+        self.stdout.write(
+            f'Восстановление: медиана '
+            f'{statistics.median(restore_timings) * 1000:.1f} мс, '
+            f'самая длинная цепочка ({last - snapshot} разниц) '
+            f'{(time.perf_counter() - started) * 1000:.1f} мс.'
+        )
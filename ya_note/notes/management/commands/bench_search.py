@@ -0,0 +1,137 @@
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Count, Q
+from django.test.utils import override_settings
+
+from notes.models import Note
+from notes.search import (
+    SEARCH_SQL, build_match_query, rebuild_search_index
+)
+from ya_common.benchmark import use_database
+from ya_common.seeding import (
+    BATCH_SIZE, insert_users, next_id, zipf_cum_weights
+)
+
+VOCABULARY_SIZE = 50_000
+ALPHABET = 'абвгдеёжзийклмнопрстуфхцчшщэюя'
+
+User = get_user_model()
+
+
+def random_word():
+    return ''.join(random.choices(ALPHABET, k=random.randint(4, 10)))
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает поиск по заметкам автора через icontains и через '
+        'индекс FTS5 на отдельной базе SQLite.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=str(Path(tempfile.gettempdir()) / 'yanote_search.sqlite3'),
+            help='Файл базы для замеров, будет перезаписан.',
+        )
+        parser.add_argument('--authors', type=int, default=10_000)
+        parser.add_argument('--notes', type=int, default=1_000_000)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        path.unlink(missing_ok=True)
+        vocabulary = [random_word() for _ in range(VOCABULARY_SIZE)]
+        with use_database(path), override_settings(DEBUG=False):
+            call_command('migrate', verbosity=0)
+            self.seed(vocabulary, options['authors'], options['notes'])
+            self.report(vocabulary, options['repeat'])
+
+    def seed(self, vocabulary, authors_count, notes_count):
+        started = time.perf_counter()
+        # Частые слова встречаются чаще, а заметки распределены
+        # по авторам неравномерно.
+        word_weights = zipf_cum_weights(VOCABULARY_SIZE, 1.0)
+        author_weights = zipf_cum_weights(authors_count, 1.0)
+        with transaction.atomic():
+            users_start = next_id(User)
+            insert_users(users_start, authors_count, make_password(None))
+            authors = range(users_start, users_start + authors_count)
+            for start in range(0, notes_count, BATCH_SIZE):
+                indexes = range(start, min(start + BATCH_SIZE, notes_count))
+                Note.objects.bulk_create(
+                    Note(
+                        title=' '.join(random.choices(
+                            vocabulary, cum_weights=word_weights, k=4
+                        )),
+                        text=' '.join(random.choices(
+                            vocabulary, cum_weights=word_weights, k=40
+                        )),
+                        slug=f'note-{index}',
+                        author_id=author_id,
+                    )
+                    for index, author_id in zip(indexes, random.choices(
+                        authors, cum_weights=author_weights, k=len(indexes)
+                    ))
+                )
+            rebuild_search_index()
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        self.stdout.write(
+            f'Заполнено за {time.perf_counter() - started:.1f} с: '
+            f'{authors_count} авторов, {notes_count} заметок.'
+        )
+
+    def measure(self, run, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - started)
+        return statistics.median(timings) * 1000
+
+    def report(self, vocabulary, repeat):
+        authors = Note.objects.order_by().values(
+            'author'
+        ).annotate(total=Count('pk')).order_by('-total')
+        heaviest = authors[0]
+        typical = authors[authors.count() // 2]
+        limit = settings.NOTES_SEARCH_RESULTS_COUNT
+        for author in (heaviest, typical):
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'Автор с {author["total"]} заметками'
+            ))
+            for name, query in (
+                ('частое слово', vocabulary[0]),
+                ('редкое слово', vocabulary[-1]),
+                ('начало слова', vocabulary[1][:3]),
+            ):
+                contains = self.measure(lambda: list(
+                    Note.objects.filter(
+                        Q(title__icontains=query) | Q(text__icontains=query),
+                        author_id=author['author'],
+                    ).only('id', 'slug', 'title').order_by('id')[:limit]
+                ), repeat)
+
+                def full_text():
+                    with connection.cursor() as cursor:
+                        cursor.execute(SEARCH_SQL, (
+                            build_match_query(author['author'], query), limit
+                        ))
+                        cursor.fetchall()
+
+                fts = self.measure(full_text, repeat)
+                self.stdout.write(
+                    f'{name}: icontains {contains:8.2f} мс, '
+                    f'FTS5 {fts:8.2f} мс'
+                )
@@ -0,0 +1,67 @@
+from django.contrib.auth import get_user_model
+from django.test import Client
+from django.urls import reverse
+
+from notes.models import Note
+from notes.seeding import seed_notes
+from ya_common.benchmark import SqliteBenchmarkCommand
+from yanote import settings_production
+
+# Сколько заметок автора открывает читатель.
+READER_NOTES_COUNT = 100
+
+User = get_user_model()
+
+
+class Command(SqliteBenchmarkCommand):
+    help = (
+        'Сравнивает пропускную способность SQLite с настройками по '
+        'умолчанию и с боевыми: несколько потоков от имени разных '
+        'авторов читают списки и страницы заметок, один поток добавляет '
+        'заметки. Каждый профиль запускается на свежей копии набора.'
+    )
+    size_option = 'notes'
+    dataset_prefix = 'yanote_sqlite'
+    pragmas_setting = 'NOTES_SQLITE_PRAGMAS'
+    production_settings = settings_production
+
+    def seed_data(self, notes_count):
+        seed_notes(
+            max(notes_count // 100, 10), notes_count, skew=1.0, words=20
+        )
+
+    def get_readers(self, readers_count):
+        """Сессии авторов, читающих свой список и свои заметки."""
+        readers = []
+        for author in User.objects.order_by('pk')[:readers_count]:
+            client = Client()
+            client.force_login(author)
+            slugs = list(
+                Note.objects.filter(author=author).values_list(
+                    'slug', flat=True
+                )[:READER_NOTES_COUNT]
+            )
+            if not slugs:
+                continue
+            readers.append((
+                f'sessionid={client.cookies["sessionid"].value}',
+                lambda rng, slugs=slugs: rng.choice((
+                    reverse('notes:list'),
+                    reverse('notes:detail', args=(rng.choice(slugs),)),
+                )),
+            ))
+        return readers
+
+    def get_writer(self):
+        """Заметки случайных авторов."""
+        authors = list(User.objects.values_list('pk', flat=True))
+
+        def write(rng, number):
+            Note.objects.create(
+                title=f'Заметка замера {number}',
+                text='Текст заметки замера',
+                slug=f'bench-sqlite-{number}',
+                author_id=rng.choice(authors),
+            )
+
+        return write
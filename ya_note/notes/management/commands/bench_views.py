@@ -0,0 +1,220 @@
+import json
+import tempfile
+import time
+from functools import partial
+from itertools import count
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from notes.cache import bump_generation, get_notes_cache
+from notes.models import Note
+from notes.seeding import seed_notes
+from ya_common.benchmark import (
+    DEFAULT_THRESHOLD, find_regressions, measure, save_results, use_database
+)
+
+DATASET_SIZES = (1_000, 100_000, 1_000_000)
+AUTHORS_COUNT = 100
+IMPORT_SIZE = 100
+EDITS_COUNT = 5
+BENCH_TITLE = 'Заметка замера'
+
+User = get_user_model()
+
+
+def import_file():
+    return SimpleUploadedFile('notes.jsonl', '\n'.join(
+        json.dumps({'title': BENCH_TITLE, 'text': f'Импорт {index}'})
+        for index in range(IMPORT_SIZE)
+    ).encode())
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет все страницы заметок тестовым клиентом на наборах данных '
+        'разного размера: время, число запросов, время в SQL и пиковую '
+        'память. Страницы из кеша автора замеряются и со сброшенным '
+        'кешем (_cold). Размер набора — число заметок, они распределены '
+        f'между {AUTHORS_COUNT} авторами по закону Ципфа.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=DATASET_SIZES,
+        )
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument(
+            '--datasets',
+            default=tempfile.gettempdir(),
+            help='Каталог с базами наборов данных, они переиспользуются.',
+        )
+        parser.add_argument(
+            '--reseed', action='store_true',
+            help='Заполнить базы наборов данных заново.',
+        )
+        parser.add_argument('--output', help='Файл для результатов в JSON.')
+        parser.add_argument(
+            '--baseline',
+            help='Результаты прошлого замера в JSON для сравнения.',
+        )
+        parser.add_argument(
+            '--threshold', type=float, default=DEFAULT_THRESHOLD,
+            help='Допустимый относительный рост медианного времени.',
+        )
+
+    def handle(self, *args, **options):
+        results = {}
+        for size in options['sizes']:
+            path = Path(options['datasets']) / f'yanote_views_{size}.sqlite3'
+            if options['reseed']:
+                path.unlink(missing_ok=True)
+            seeded = path.exists()
+            # Без DEBUG соединение не копит запросы в connection.queries,
+            # как и на боевом сервере.
+            with use_database(path), override_settings(DEBUG=False):
+                call_command('migrate', verbosity=0)
+                if not seeded:
+                    self.seed(size)
+                get_notes_cache().clear()
+                results[str(size)] = self.run_views(options['repeat'])
+            self.report(size, results[str(size)])
+        if options['output']:
+            save_results(options['output'], results)
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as file:
+                baseline = json.load(file)
+            regressions = find_regressions(
+                results, baseline, options['threshold']
+            )
+            if regressions:
+                raise CommandError(
+                    'Регрессии относительно базового замера:\n'
+                    + '\n'.join(regressions)
+                )
+            self.stdout.write(self.style.SUCCESS('Регрессий нет.'))
+
+    def seed(self, notes_count):
+        started = time.perf_counter()
+        seed_notes(AUTHORS_COUNT, notes_count, skew=1.0, words=20)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        self.stdout.write(
+            f'Набор {notes_count} заполнен за '
+            f'{time.perf_counter() - started:.1f} с.'
+        )
+
+    def run_views(self, repeat):
+        # Автор с наибольшим числом заметок: худший случай для списка.
+        # Счётчики кеша доступны только персоналу.
+        author = User.objects.annotate(
+            notes_count=Count('note')
+        ).order_by('-notes_count').first()
+        User.objects.filter(pk=author.pk).update(is_staff=True)
+        # Своя заметка на каждый прогон: история правок не копится
+        # между прогонами на одном наборе. Ревизии появляются только
+        # при сохранении через модель.
+        note = Note(title=BENCH_TITLE, text='', slug='bench-note')
+        note.author = author
+        note.save()
+        for number in range(EDITS_COUNT):
+            note.text = f'Текст заметки, правка {number}.'
+            note.save()
+        client = Client()
+        client.force_login(author)
+        anonymous = Client()
+        slug = note.slug
+        # Заголовки добавляемых заметок различаются, как у живых
+        # пользователей, иначе замер мерил бы подбор суффиксов slug.
+        numbers = count()
+        deleted = Note(title=BENCH_TITLE, text='Удаляемая', author=author)
+        edit_data = {'title': note.title, 'text': note.text, 'slug': slug}
+
+        def create_deleted():
+            Note.objects.filter(slug='bench-delete').delete()
+            deleted.pk = None
+            deleted.slug = 'bench-delete'
+            deleted.save()
+
+        bump = partial(bump_generation, author.pk)
+        # Холодный замер сбрасывает кеш автора перед каждым запросом.
+        pages = {
+            'list': lambda: client.get(reverse('notes:list')),
+            'list_json': lambda: client.get(
+                reverse('notes:list'), {'format': 'json'}
+            ),
+            'detail': lambda: client.get(
+                reverse('notes:detail', args=(slug,))
+            ),
+            'edit_form': lambda: client.get(
+                reverse('notes:edit', args=(slug,))
+            ),
+            'delete_form': lambda: client.get(
+                reverse('notes:delete', args=(slug,))
+            ),
+        }
+        views = {
+            'home': (lambda: anonymous.get(reverse('notes:home')), None),
+        }
+        for name, request in pages.items():
+            views[f'{name}_cold'] = (request, bump)
+            views[name] = (request, None)
+        views.update({
+            'revisions': (lambda: client.get(
+                reverse('notes:revisions', args=(slug,))
+            ), None),
+            'restore': (lambda: client.post(
+                reverse('notes:restore', args=(slug, 1))
+            ), None),
+            'add_form': (lambda: client.get(reverse('notes:add')), None),
+            'add': (lambda: client.post(
+                reverse('notes:add'),
+                {'title': f'{BENCH_TITLE} {next(numbers)}', 'text': 'Текст'}
+            ), None),
+            'edit': (lambda: client.post(
+                reverse('notes:edit', args=(slug,)), edit_data
+            ), None),
+            'delete': (lambda: client.post(
+                reverse('notes:delete', args=('bench-delete',))
+            ), create_deleted),
+            'search': (lambda: client.get(
+                reverse('notes:search'), {'q': 'купить список'}
+            ), None),
+            'import': (lambda: client.post(
+                reverse('notes:import'), {'file': import_file()}
+            ), None),
+            'export_zip': (lambda: client.get(reverse('notes:export')), None),
+            'export_jsonl': (lambda: client.get(
+                reverse('notes:export'), {'format': 'jsonl'}
+            ), None),
+            'cache_stats': (
+                lambda: client.get(reverse('notes:cache_stats')), None
+            ),
+            'success': (lambda: client.get(reverse('notes:success')), None),
+        })
+        results = {
+            name: measure(request, repeat, prepare)
+            for name, (request, prepare) in views.items()
+        }
+        Note.objects.filter(title__startswith=BENCH_TITLE).delete()
+        return results
+
+    def report(self, size, results):
+        self.stdout.write(self.style.MIGRATE_HEADING(f'Набор {size}'))
+        for name, result in results.items():
+            self.stdout.write(
+                f'{name:<16} {result["status"]} '
+                f'первый {result["first_ms"]:8.2f} мс, '
+                f'медиана {result["wall_ms"]:8.2f} мс, '
+                f'SQL {result["sql_ms"]:7.2f} мс '
+                f'в {result["queries"]} запр., '
+                f'память {result["peak_kb"]:8.1f} КБ'
+            )
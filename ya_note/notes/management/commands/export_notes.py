@@ -0,0 +1,84 @@
+import sys
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.export import (
+    EXPORT_FORMATS, get_export_chunks, get_next_zip_cursor
+)
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает заметки автора в формате JSONL или архивами ZIP. '
+        'Архив вмещает NOTES_EXPORT_ZIP_MAX_NOTES заметок: в файл '
+        'пишутся все архивы с номерами, в stdout — один, а курсор '
+        'следующего печатается в stderr.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument(
+            '--format', choices=EXPORT_FORMATS, default='jsonl'
+        )
+        parser.add_argument(
+            '--output', help='Файл для выгрузки, по умолчанию stdout.'
+        )
+        parser.add_argument(
+            '--after', type=int, help='Выгрузить заметки после этого id.'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            author = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError('Пользователь не найден.')
+        format, after = options['format'], options['after']
+        if not options['output']:
+            sys.stdout.buffer.writelines(
+                get_export_chunks(author, format, after)
+            )
+            next_cursor = (
+                get_next_zip_cursor(author, after) if format == 'zip'
+                else None
+            )
+            if next_cursor is not None:
+                self.stderr.write(
+                    f'Следующий архив: --after {next_cursor}'
+                )
+            return
+        if format == 'jsonl':
+            self.write(options['output'], author, format, after)
+            return
+        self.write_archives(Path(options['output']), author, after)
+
+    def write(self, path, author, format, after):
+        with open(path, 'wb') as output:
+            output.writelines(get_export_chunks(author, format, after))
+
+    def write_archives(self, path, author, after):
+        """
+        Пишет архивы по курсору get_next_zip_cursor.
+
+        Если заметки не помещаются в один архив, к имени файла
+        добавляется номер архива: notes-1.zip, notes-2.zip и так далее.
+        """
+        next_cursor = get_next_zip_cursor(author, after)
+        if next_cursor is None:
+            self.write(path, author, 'zip', after)
+            return
+        number = 1
+        while True:
+            self.write(
+                path.with_name(f'{path.stem}-{number}{path.suffix}'),
+                author, 'zip', after,
+            )
+            if next_cursor is None:
+                break
+            after = int(next_cursor)
+            next_cursor = get_next_zip_cursor(author, after)
+            number += 1
+        self.stdout.write(f'Записано архивов: {number}.')
@@ -0,0 +1,44 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.importing import FORMATS, import_notes, read_rows
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Импортирует заметки автора из файла JSONL или CSV.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('path')
+        parser.add_argument(
+            '--format', choices=FORMATS,
+            help='Формат файла, по умолчанию определяется по расширению.',
+        )
+        parser.add_argument('--batch-size', type=int)
+
+    def handle(self, *args, **options):
+        try:
+            author = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError('Пользователь не найден.')
+        format = options['format'] or options['path'].rpartition('.')[2]
+        if format not in FORMATS:
+            raise CommandError('Укажите формат файла: jsonl или csv.')
+        started = time.perf_counter()
+        with open(options['path'], encoding='utf-8', newline='') as file:
+            try:
+                imported = import_notes(
+                    author, read_rows(file, format), options['batch_size']
+                )
+            except ValidationError as error:
+                raise CommandError(' '.join(error.messages))
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Импортировано {imported} заметок за {elapsed:.1f} с '
+            f'({imported / elapsed:.0f} заметок/с).'
+        ))
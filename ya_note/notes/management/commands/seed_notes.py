@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.seeding import seed_notes
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу синтетическими авторами и заметками '
+        'для воспроизведения нагрузки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--authors', type=int, default=10_000)
+        parser.add_argument('--notes', type=int, default=1_000_000)
+        parser.add_argument(
+            '--skew', type=float, default=1.0,
+            help=(
+                'Показатель распределения Ципфа заметок по авторам: '
+                '0 — поровну, больше — сильнее перекос к первым авторам.'
+            ),
+        )
+        parser.add_argument(
+            '--words', type=int, default=20,
+            help='Число слов в тексте заметки.',
+        )
+        parser.add_argument(
+            '--password',
+            help='Пароль всех авторов, по умолчанию вход запрещён.',
+        )
+
+    def handle(self, *args, **options):
+        if options['notes'] and not options['authors']:
+            raise CommandError('Для заметок нужны авторы.')
+        started = time.perf_counter()
+        seed_notes(
+            options['authors'], options['notes'], options['skew'],
+            options['words'], options['password'],
+        )
+        elapsed = time.perf_counter() - started
+        total = options['authors'] + options['notes']
+        self.stdout.write(self.style.SUCCESS(
+            f'Добавлено строк: {total} за {elapsed:.1f} с '
+            f'({total / elapsed:.0f} строк/с).'
+        ))
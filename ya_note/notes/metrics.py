@@ -0,0 +1,11 @@
+import logging
+
+from ya_common import metrics
+
+registry = metrics.Registry('notes')
+
+
+class MetricsMiddleware(metrics.MetricsMiddleware):
+    registry = registry
+    logger = logging.getLogger(__name__)
+    duplicate_queries_setting = 'NOTES_METRICS_DUPLICATE_QUERIES'
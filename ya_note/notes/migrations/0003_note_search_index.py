@@ -0,0 +1,57 @@
+from django.db import migrations
+
+# author_id проиндексирован как отдельная колонка: условие по автору
+# пересекает списки документов внутри FTS5, не читая чужие заметки.
+# prefix='2 3' ускоряет поиск по началу слова.
+CREATE_SEARCH_INDEX = (
+    """
+    CREATE VIRTUAL TABLE notes_note_fts USING fts5(
+        author_id, title, text,
+        content='notes_note', content_rowid='id', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER notes_note_fts_insert AFTER INSERT ON notes_note BEGIN
+        INSERT INTO notes_note_fts(rowid, author_id, title, text)
+        VALUES (new.id, new.author_id, new.title, new.text);
+    END
+    """,
+    """
+    CREATE TRIGGER notes_note_fts_delete AFTER DELETE ON notes_note BEGIN
+        INSERT INTO notes_note_fts(
+            notes_note_fts, rowid, author_id, title, text
+        )
+        VALUES ('delete', old.id, old.author_id, old.title, old.text);
+    END
+    """,
+    """
+    CREATE TRIGGER notes_note_fts_update
+    AFTER UPDATE OF author_id, title, text ON notes_note BEGIN
+        INSERT INTO notes_note_fts(
+            notes_note_fts, rowid, author_id, title, text
+        )
+        VALUES ('delete', old.id, old.author_id, old.title, old.text);
+        INSERT INTO notes_note_fts(rowid, author_id, title, text)
+        VALUES (new.id, new.author_id, new.title, new.text);
+    END
+    """,
+    "INSERT INTO notes_note_fts(notes_note_fts) VALUES ('rebuild')",
+)
+
+DROP_SEARCH_INDEX = (
+    'DROP TRIGGER notes_note_fts_insert',
+    'DROP TRIGGER notes_note_fts_delete',
+    'DROP TRIGGER notes_note_fts_update',
+    'DROP TABLE notes_note_fts',
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0002_note_author_id_idx'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_SEARCH_INDEX, DROP_SEARCH_INDEX),
+    ]
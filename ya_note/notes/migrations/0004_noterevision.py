@@ -0,0 +1,34 @@
+# Generated by Django 3.2.15 on 2026-10-18 06:41
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0003_note_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NoteRevision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField(verbose_name='Номер')),
+                ('title', models.CharField(max_length=100, verbose_name='Заголовок')),
+                ('is_snapshot', models.BooleanField(default=False, verbose_name='Полная копия')),
+                ('data', models.BinaryField(verbose_name='Сжатые данные')),
+                ('checksum', models.PositiveIntegerField(verbose_name='CRC32 текста')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Создана')),
+                ('note', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='revisions', to='notes.note')),
+            ],
+            options={
+                'ordering': ('-number',),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='noterevision',
+            constraint=models.UniqueConstraint(fields=('note', 'number'), name='note_revision_number_unique'),
+        ),
+    ]
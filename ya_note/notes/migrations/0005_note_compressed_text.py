@@ -0,0 +1,143 @@
+import importlib
+import zlib
+
+from django.db import migrations
+
+import notes.fields
+
+search_index = importlib.import_module('notes.migrations.0003_note_search_index')
+
+# Индекс строится по исходному тексту: и триггеры, и представление,
+# из которого FTS5 читает содержимое, разжимают его функцией.
+CREATE_PLAIN_SEARCH_INDEX = (
+    """
+    CREATE VIEW notes_note_plain AS
+    SELECT id, author_id, title, notes_plain_text(text) AS text
+    FROM notes_note
+    """,
+    """
+    CREATE VIRTUAL TABLE notes_note_fts USING fts5(
+        author_id, title, text,
+        content='notes_note_plain', content_rowid='id', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER notes_note_fts_insert AFTER INSERT ON notes_note BEGIN
+        INSERT INTO notes_note_fts(rowid, author_id, title, text)
+        VALUES (
+            new.id, new.author_id, new.title, notes_plain_text(new.text)
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER notes_note_fts_delete AFTER DELETE ON notes_note BEGIN
+        INSERT INTO notes_note_fts(
+            notes_note_fts, rowid, author_id, title, text
+        )
+        VALUES (
+            'delete', old.id, old.author_id, old.title,
+            notes_plain_text(old.text)
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER notes_note_fts_update
+    AFTER UPDATE OF author_id, title, text ON notes_note BEGIN
+        INSERT INTO notes_note_fts(
+            notes_note_fts, rowid, author_id, title, text
+        )
+        VALUES (
+            'delete', old.id, old.author_id, old.title,
+            notes_plain_text(old.text)
+        );
+        INSERT INTO notes_note_fts(rowid, author_id, title, text)
+        VALUES (
+            new.id, new.author_id, new.title, notes_plain_text(new.text)
+        );
+    END
+    """,
+    "INSERT INTO notes_note_fts(notes_note_fts) VALUES ('rebuild')",
+)
+
+DROP_PLAIN_SEARCH_INDEX = search_index.DROP_SEARCH_INDEX + (
+    'DROP VIEW notes_note_plain',
+)
+
+BATCH_SIZE = 1000
+# Порог сжатия на момент миграции: дальнейшие изменения настроек
+# и notes.fields не должны менять её результат.
+COMPRESSION_THRESHOLD = 4096
+
+
+def compress_text(text):
+    if text is None:
+        return text
+    encoded = text.encode()
+    if len(encoded) < COMPRESSION_THRESHOLD:
+        return text
+    compressed = zlib.compress(encoded)
+    return compressed if len(compressed) < len(encoded) else text
+
+
+def plain_text(value):
+    if isinstance(value, bytes):
+        return zlib.decompress(value).decode()
+    return value
+
+
+def convert_texts(apps, schema_editor, convert):
+    """Перезаписывает тексты заметок пачками по id."""
+    connection = schema_editor.connection
+    last_id = 0
+    with connection.cursor() as cursor:
+        while True:
+            cursor.execute(
+                'SELECT id, text FROM notes_note WHERE id > %s '
+                'ORDER BY id LIMIT %s',
+                (last_id, BATCH_SIZE),
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            changed = [
+                (converted, pk) for pk, text in rows
+                if (converted := convert(text)) != text
+            ]
+            if changed:
+                cursor.executemany(
+                    'UPDATE notes_note SET text = %s WHERE id = %s', changed
+                )
+
+
+def compress_texts(apps, schema_editor):
+    convert_texts(apps, schema_editor, compress_text)
+
+
+def decompress_texts(apps, schema_editor):
+    convert_texts(apps, schema_editor, plain_text)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0004_noterevision'),
+    ]
+
+    # Изменение поля пересоздаёт таблицу в SQLite вместе с триггерами,
+    # поэтому индекс удаляется до него и строится заново после.
+    operations = [
+        migrations.RunSQL(
+            search_index.DROP_SEARCH_INDEX,
+            search_index.CREATE_SEARCH_INDEX,
+        ),
+        migrations.AlterField(
+            model_name='note',
+            name='text',
+            field=notes.fields.CompressedTextField(
+                help_text='Добавьте подробностей', verbose_name='Текст'
+            ),
+        ),
+        migrations.RunSQL(CREATE_PLAIN_SEARCH_INDEX, DROP_PLAIN_SEARCH_INDEX),
+        migrations.RunPython(compress_texts, decompress_texts),
+    ]
@@ -0,0 +1,29 @@
+import importlib
+
+from django.db import migrations
+
+plain_search_index = importlib.import_module(
+    'notes.migrations.0005_note_compressed_text'
+)
+
+# Триггеры вызывали функцию разжатия notes_plain_text, которой нет
+# в консоли sqlite3, поэтому там не проходила ни одна запись в заметки.
+# Индекс теперь обновляют сигналы модели заметки.
+DROP_SEARCH_TRIGGERS = (
+    'DROP TRIGGER notes_note_fts_insert',
+    'DROP TRIGGER notes_note_fts_delete',
+    'DROP TRIGGER notes_note_fts_update',
+)
+
+CREATE_SEARCH_TRIGGERS = plain_search_index.CREATE_PLAIN_SEARCH_INDEX[2:]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0005_note_compressed_text'),
+    ]
+
+    operations = [
+        migrations.RunSQL(DROP_SEARCH_TRIGGERS, CREATE_SEARCH_TRIGGERS),
+    ]
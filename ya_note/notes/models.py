@@ -1,7 +1,8 @@
 from django.conf import settings
-from django.db import models
+from django.db import models, router, transaction
 
-from pytils.translit import slugify
+from .fields import CompressedTextField
+from .slugs import make_slug
 
 
 class Note(models.Model):
@@ -11,7 +12,7 @@ class Note(models.Model):
         default='Название заметки',
         help_text='Дайте короткое название заметке'
     )
-    text = models.TextField(
+    text = CompressedTextField(
         'Текст',
         help_text='Добавьте подробностей'
     )
@@ -28,11 +29,59 @@ class Note(models.Model):
         on_delete=models.CASCADE,
     )
 
+    class Meta:
+        indexes = (
+            models.Index(fields=('author', 'id'), name='note_author_id_idx'),
+        )
+
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминает загруженный текст: от него считается разница."""
+        note = super().from_db(db, field_names, values)
+        note.loaded_text = note.__dict__.get('text')
+        return note
+
     def save(self, *args, **kwargs):
         if not self.slug:
-            max_slug_length = self._meta.get_field('slug').max_length
-            self.slug = slugify(self.title)[:max_slug_length]
-        super().save(*args, **kwargs)
+            self.slug = make_slug(self.title)
+        using = kwargs.get('using') or router.db_for_write(
+            Note, instance=self
+        )
+        # Заметка и её ревизия сохраняются вместе.
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+
+
+class NoteRevision(models.Model):
+    """
+    Версия заметки после очередного сохранения.
+
+    Текст хранится сжатым: либо целиком, либо разницей с предыдущей
+    версией. Полные копии делаются через равные промежутки, чтобы
+    восстановление не проходило по всей истории.
+    """
+    note = models.ForeignKey(
+        Note,
+        on_delete=models.CASCADE,
+        related_name='revisions',
+    )
+    number = models.PositiveIntegerField('Номер')
+    title = models.CharField('Заголовок', max_length=100)
+    is_snapshot = models.BooleanField('Полная копия', default=False)
+    data = models.BinaryField('Сжатые данные')
+    checksum = models.PositiveIntegerField('CRC32 текста')
+    created = models.DateTimeField('Создана', auto_now_add=True)
+
+    class Meta:
+        ordering = ('-number',)
+        constraints = (
+            models.UniqueConstraint(
+                fields=('note', 'number'), name='note_revision_number_unique'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.note_id}: {self.number}'
@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.http import Http404
+
+from .models import Note
+
+# Поля, которые нужны списку заметок: текст заметки не загружается.
+LIST_FIELDS = ('id', 'slug', 'title')
+# Наибольшее значение BigAutoField и целого SQLite.
+MAX_ID = 2 ** 63 - 1
+
+
+def decode_cursor(cursor):
+    """Курсор — id последней показанной заметки."""
+    if not cursor:
+        return None
+    try:
+        after = int(cursor)
+    except ValueError:
+        raise Http404('Некорректный курсор заметок.')
+    if not 0 < after <= MAX_ID:
+        raise Http404('Некорректный курсор заметок.')
+    return after
+
+
+def get_notes_page(author, after=None):
+    """
+    Возвращает страницу заметок автора и курсор следующей страницы.
+
+    Заметки идут по возрастанию id, after — id последней показанной
+    заметки. Страница выбирается по индексу (author, id), поэтому
+    стоимость запроса не зависит от номера страницы.
+    """
+    per_page = settings.NOTES_COUNT_ON_LIST_PAGE
+    notes = Note.objects.filter(author=author).only(*LIST_FIELDS).order_by(
+        'id'
+    )
+    if after is not None:
+        notes = notes.filter(id__gt=after)
+    page = list(notes[:per_page + 1])
+    if len(page) > per_page:
+        page = page[:per_page]
+        return page, str(page[-1].id)
+    return page, None
@@ -0,0 +1,132 @@
+import json
+import zlib
+from difflib import SequenceMatcher
+
+from django.conf import settings
+from django.db.models import Subquery
+
+from .models import NoteRevision
+
+
+def checksum(text):
+    return zlib.crc32(text.encode())
+
+
+def make_delta(old, new):
+    """
+    Разница между текстами по строкам.
+
+    Операции — либо пара [начало, конец] строк старого текста,
+    либо вставляемый фрагмент нового. Правки обычно затрагивают
+    немного строк, поэтому общие начало и конец отрезаются до
+    сравнения: SequenceMatcher квадратичен на длинных текстах.
+    """
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    head = 0
+    limit = min(len(old_lines), len(new_lines))
+    while head < limit and old_lines[head] == new_lines[head]:
+        head += 1
+    tail = 0
+    while (
+        tail < limit - head
+        and old_lines[-tail - 1] == new_lines[-tail - 1]
+    ):
+        tail += 1
+    delta = [[0, head]] if head else []
+    opcodes = SequenceMatcher(
+        None,
+        old_lines[head:len(old_lines) - tail],
+        new_lines[head:len(new_lines) - tail],
+        autojunk=False,
+    ).get_opcodes()
+    for tag, old_start, old_end, new_start, new_end in opcodes:
+        if tag == 'equal':
+            delta.append([head + old_start, head + old_end])
+        elif tag != 'delete':
+            delta.append(''.join(
+                new_lines[head + new_start:head + new_end]
+            ))
+    if tail:
+        delta.append([len(old_lines) - tail, len(old_lines)])
+    return delta
+
+
+def apply_delta(old, delta):
+    old_lines = old.splitlines(keepends=True)
+    return ''.join(
+        ''.join(old_lines[slice(*operation)])
+        if isinstance(operation, list) else operation
+        for operation in delta
+    )
+
+
+def record_revision(note, previous_text, using):
+    """
+    Добавляет ревизию после сохранения заметки, если та изменилась.
+
+    Разница считается от текста, с которым заметка была загружена.
+    Если он не совпадает с последней ревизией, например после
+    параллельной правки, сохраняется полная копия.
+    """
+    revisions = NoteRevision.objects.using(using).filter(note=note)
+    last = revisions.annotate(last_snapshot=Subquery(
+        revisions.filter(is_snapshot=True).order_by(
+            '-number'
+        ).values('number')[:1]
+    )).only('number', 'title', 'checksum').order_by('-number').first()
+    text_checksum = checksum(note.text)
+    if last and last.checksum == text_checksum and last.title == note.title:
+        return None
+    number = last.number + 1 if last else 1
+    interval = settings.NOTES_REVISION_SNAPSHOT_INTERVAL
+    is_snapshot = (
+        last is None
+        or previous_text is None
+        or last.checksum != checksum(previous_text)
+        or number - last.last_snapshot >= interval
+    )
+    if is_snapshot:
+        payload = note.text
+    else:
+        payload = json.dumps(make_delta(previous_text, note.text))
+    return NoteRevision.objects.using(using).create(
+        note=note,
+        number=number,
+        title=note.title,
+        is_snapshot=is_snapshot,
+        data=zlib.compress(payload.encode()),
+        checksum=text_checksum,
+    )
+
+
+def get_revision_text(revision):
+    """
+    Восстанавливает текст ревизии.
+
+    Одним запросом читаются ближайшая полная копия не новее ревизии
+    и разницы после неё.
+    """
+    revisions = NoteRevision.objects.using(revision._state.db).filter(
+        note=revision.note_id, number__lte=revision.number
+    )
+    chain = revisions.filter(number__gte=Subquery(
+        revisions.filter(is_snapshot=True).order_by(
+            '-number'
+        ).values('number')[:1]
+    )).order_by('number').values_list('is_snapshot', 'data')
+    text = None
+    for is_snapshot, data in chain:
+        payload = zlib.decompress(data).decode()
+        if is_snapshot:
+            text = payload
+        else:
+            text = apply_delta(text, json.loads(payload))
+    return text
+
+
+def restore_revision(note, revision):
+    """Возвращает заметке текст ревизии, это тоже новая ревизия."""
+    note.title = revision.title
+    note.text = get_revision_text(revision)
+    note.save()
@@ -0,0 +1,85 @@
+import re
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from .models import Note
+
+SEARCH_SQL = """
+    SELECT notes_note.id, notes_note.slug, notes_note.title
+    FROM notes_note_fts
+    JOIN notes_note ON notes_note.id = notes_note_fts.rowid
+    WHERE notes_note_fts MATCH %s
+    ORDER BY bm25(notes_note_fts, 0.0, 10.0, 1.0)
+    LIMIT %s
+"""
+# Индекс заполняется из представления notes_note_plain: в нём текст
+# уже разжат, а удаление из индекса FTS5 с внешним содержимым
+# требует тех же значений, что были проиндексированы.
+INDEX_SQL = """
+    INSERT INTO notes_note_fts(rowid, author_id, title, text)
+    SELECT id, author_id, title, text FROM notes_note_plain
+    WHERE id IN ({ids})
+"""
+UNINDEX_SQL = """
+    INSERT INTO notes_note_fts(notes_note_fts, rowid, author_id, title, text)
+    SELECT 'delete', id, author_id, title, text FROM notes_note_plain
+    WHERE id IN ({ids})
+"""
+
+
+def build_match_query(author_id, query):
+    """
+    Строит запрос FTS5 по заметкам автора.
+
+    Слова берутся в кавычки, чтобы спецсимволы FTS5 не ломали запрос.
+    Последнее слово ищется по началу: пользователь может ещё не
+    дописать его.
+    """
+    words = [f'"{word}"' for word in re.findall(r'\w+', query)]
+    if not words:
+        return None
+    words[-1] += '*'
+    return (
+        f'author_id : "{author_id}" '
+        f'AND {{title text}} : ({" ".join(words)})'
+    )
+
+
+def search_notes(author, query):
+    """Возвращает самые подходящие заметки автора по запросу."""
+    match_query = build_match_query(author.pk, query)
+    if match_query is None:
+        return []
+    return list(Note.objects.raw(
+        SEARCH_SQL, (match_query, settings.NOTES_SEARCH_RESULTS_COUNT)
+    ))
+
+
+def update_search_index(sql, notes):
+    ids, params = notes.values('id').query.get_compiler(notes.db).as_sql()
+    with connections[notes.db].cursor() as cursor:
+        cursor.execute(sql.format(ids=ids), params)
+
+
+def index_notes(notes):
+    """Добавляет заметки выборки в поисковый индекс."""
+    update_search_index(INDEX_SQL, notes)
+
+
+def unindex_notes(notes):
+    """Убирает заметки выборки из индекса, пока они ещё в базе."""
+    update_search_index(UNINDEX_SQL, notes)
+
+
+def rebuild_search_index(using=DEFAULT_DB_ALIAS):
+    """
+    Заново строит поисковый индекс по всем заметкам.
+
+    Нужен после записи в обход приложения, например из консоли
+    sqlite3: триггеров у индекса нет.
+    """
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO notes_note_fts(notes_note_fts) VALUES ('rebuild')"
+        )
@@ -0,0 +1,84 @@
+import random
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+
+from ya_common.seeding import (
+    BATCH_SIZE, deferred_indexes, insert_rows, insert_users, next_id,
+    zipf_cum_weights,
+)
+from .models import Note
+from .search import rebuild_search_index
+from .signals import invalidate_author
+from .slugs import SlugAllocator
+
+# Тексты заметок берутся из заранее подготовленного набора:
+# собирать и сжимать их на каждую строку дороже вставки.
+TEXTS_COUNT = 1000
+SLUG_PREFIX = 'note'
+WORDS = (
+    'купить', 'позвонить', 'встреча', 'список', 'идея', 'книга', 'фильм',
+    'рецепт', 'отпуск', 'подарок', 'проект', 'отчёт', 'врач', 'ремонт',
+    'молоко', 'хлеб', 'письмо', 'пароль', 'адрес', 'план', 'задача',
+    'неделя', 'вторник', 'пятница', 'вечер', 'утро', 'работа', 'дом',
+)
+
+User = get_user_model()
+
+
+def generate_notes(start, count, author_ids, author_weights, words):
+    text_field = Note._meta.get_field('text')
+    texts = [
+        text_field.get_db_prep_save(
+            ' '.join(random.choices(WORDS, k=words)), connection
+        )
+        for _ in range(TEXTS_COUNT)
+    ]
+    allocator = SlugAllocator(Note.objects.filter(
+        slug__startswith=f'{SLUG_PREFIX}-'
+    ).values_list('slug', flat=True).iterator())
+    for batch_start in range(start, start + count, BATCH_SIZE):
+        pks = range(batch_start, min(batch_start + BATCH_SIZE, start + count))
+        authors = random.choices(
+            author_ids, cum_weights=author_weights, k=len(pks)
+        )
+        for pk, author_id in zip(pks, authors):
+            yield (
+                pk,
+                f'Заметка {pk}',
+                texts[pk % len(texts)],
+                allocator.allocate(f'{SLUG_PREFIX}-{pk}'),
+                author_id,
+            )
+
+
+def seed_notes(authors_count, notes_count, skew, words, password=None):
+    """
+    Добавляет авторов и их заметки.
+
+    Заметки распределяются по авторам по закону Ципфа с показателем
+    skew. Уникальные slug выдаются без запросов на каждую строку,
+    индекс поиска перестраивается в конце, а кеш новых авторов
+    сбрасывается: их id могли принадлежать удалённым пользователям.
+    """
+    tables = [User._meta.db_table, Note._meta.db_table]
+    with transaction.atomic():
+        users_start = next_id(User)
+        notes_start = next_id(Note)
+        with deferred_indexes(tables):
+            insert_users(
+                users_start, authors_count, make_password(password)
+            )
+            if notes_count:
+                insert_rows(
+                    Note, ('id', 'title', 'text', 'slug', 'author'),
+                    generate_notes(
+                        notes_start, notes_count,
+                        range(users_start, users_start + authors_count),
+                        zipf_cum_weights(authors_count, skew), words,
+                    ),
+                )
+        rebuild_search_index()
+        for author_id in range(users_start, users_start + authors_count):
+            invalidate_author(author_id)
@@ -0,0 +1,111 @@
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_logged_out
+from django.db import transaction
+from django.core.signals import request_started
+from django.db.backends.signals import connection_created
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+
+from ya_common.db import close_broken_connections
+from .auth import invalidate_user
+from .cache import bump_generation
+from .fields import PLAIN_TEXT_FUNCTION, plain_text
+from .models import Note
+from .revisions import record_revision
+from .search import index_notes, unindex_notes
+
+# Поля заметки, которые попадают в поисковый индекс.
+SEARCH_FIELDS = {'author', 'author_id', 'title', 'text'}
+
+
+def invalidate_author(author_id):
+    """
+    Сбрасывает кеш автора сразу и ещё раз после фиксации транзакции.
+
+    Иначе читатель, успевший до фиксации, положил бы в новое
+    поколение старые данные.
+    """
+    bump_generation(author_id)
+    transaction.on_commit(partial(bump_generation, author_id))
+
+
+@receiver(connection_created)
+def setup_sqlite_connection(sender, connection, **kwargs):
+    """
+    Регистрирует функцию, которую поисковый индекс и фильтры по тексту
+    заметок вызывают в SQL, и прагмы из NOTES_SQLITE_PRAGMAS. Прагмы
+    идут мимо курсора Django, чтобы не попадать в учёт запросов.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    for name, value in settings.NOTES_SQLITE_PRAGMAS.items():
+        connection.connection.execute(f'PRAGMA {name} = {value}')
+    connection.connection.create_function(
+        PLAIN_TEXT_FUNCTION, 1, plain_text, deterministic=True
+    )
+
+
+@receiver(post_save, sender=Note)
+@receiver(post_delete, sender=Note)
+def invalidate_author_notes(sender, instance, **kwargs):
+    invalidate_author(instance.author_id)
+
+
+def changes_search_fields(update_fields):
+    return not update_fields or bool(SEARCH_FIELDS & set(update_fields))
+
+
+@receiver(pre_save, sender=Note)
+def unindex_saved_note(sender, instance, using, update_fields, **kwargs):
+    """
+    Убирает из поискового индекса прежнюю версию заметки.
+
+    Индекс обновляет приложение, а не триггеры: функцию разжатия
+    текста нельзя вызвать из консоли sqlite3, и триггеры ломали бы
+    там любую запись. Изменения через QuerySet.update и bulk_create
+    индексируются вызывающим кодом.
+    """
+    if instance.pk is not None and changes_search_fields(update_fields):
+        unindex_notes(Note.objects.using(using).filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=Note)
+def index_saved_note(sender, instance, using, update_fields, **kwargs):
+    if changes_search_fields(update_fields):
+        index_notes(Note.objects.using(using).filter(pk=instance.pk))
+
+
+@receiver(pre_delete, sender=Note)
+def unindex_deleted_note(sender, instance, using, **kwargs):
+    unindex_notes(Note.objects.using(using).filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=Note)
+def record_note_revision(sender, instance, using, update_fields, **kwargs):
+    if update_fields and not {'title', 'text'} & set(update_fields):
+        return
+    record_revision(instance, getattr(instance, 'loaded_text', None), using)
+    instance.loaded_text = instance.text
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def invalidate_saved_user(sender, instance, **kwargs):
+    """Сбрасывает закешированного для сессий пользователя."""
+    invalidate_user(instance.pk)
+
+
+@receiver(user_logged_out)
+def invalidate_logged_out_user(sender, request, user, **kwargs):
+    if user is not None:
+        invalidate_user(user.pk)
+
+
+@receiver(request_started)
+def check_persistent_connections(sender, **kwargs):
+    close_broken_connections()
@@ -0,0 +1,54 @@
+from functools import lru_cache
+
+from django.apps import apps
+from pytils.translit import slugify
+
+# Сколько символов в конце slug может занять суффикс вида -123.
+SUFFIX_RESERVE = 10
+
+
+def slug_max_length():
+    """Длина slug берётся из поля модели заметки."""
+    return apps.get_model('notes', 'Note')._meta.get_field('slug').max_length
+
+
+@lru_cache(maxsize=65536)
+def make_slug(title):
+    """Транслитерирует заголовок в slug, повторы берутся из кеша."""
+    return slugify(title)[:slug_max_length()]
+
+
+def slug_prefix(base):
+    """
+    Начало, общее у основы и всех slug, которые из неё получаются.
+
+    Длинная основа при добавлении суффикса обрезается, поэтому
+    занятые slug ищутся по началу без запаса под суффикс.
+    """
+    return base[:slug_max_length() - SUFFIX_RESERVE]
+
+
+class SlugAllocator:
+    """
+    Раздаёт уникальные slug без запросов к базе.
+
+    Занятые slug передаются заранее или добавляются в taken,
+    при совпадении к основе добавляется первый свободный суффикс
+    -2, -3 и так далее.
+    """
+
+    def __init__(self, taken=()):
+        self.taken = set(taken)
+        self.next_suffix = {}
+        self.max_length = slug_max_length()
+
+    def allocate(self, base):
+        slug = base
+        suffix = self.next_suffix.get(base, 2)
+        while slug in self.taken:
+            tail = f'-{suffix}'
+            slug = base[:self.max_length - len(tail)] + tail
+            suffix += 1
+        self.next_suffix[base] = suffix
+        self.taken.add(slug)
+        return slug
@@ -0,0 +1,24 @@
+from notes.models import Note
+from notes.search import index_notes
+from ya_common.testing import save_all
+
+
+def make_notes(author, count, **fields):
+    """
+    Заметки автора с уникальными slug вида note-номер.
+
+    save_all не отправляет сигналы, поэтому ревизии не создаются,
+    а индекс поиска заполняется здесь.
+    """
+    notes = save_all([
+        Note(**{
+            'title': f'Заметка {index}',
+            'text': 'Текст',
+            'slug': f'note-{index}',
+            'author': author,
+            **fields,
+        })
+        for index in range(count)
+    ])
+    index_notes(Note.objects.filter(pk__in=[note.pk for note in notes]))
+    return notes
@@ -0,0 +1,33 @@
+import random
+
+from django.test import TransactionTestCase
+
+from notes.seeding import seed_notes
+from ya_common.testing import backup_database, restore_database
+
+REFERENCE_AUTHORS_COUNT = 20
+REFERENCE_NOTES_COUNT = 2000
+
+
+class ReferenceDataTestCase(TransactionTestCase):
+    """
+    Тесты на общем наборе данных.
+
+    Набор строится пачечной вставкой один раз за процесс при первом
+    тесте и сохраняется снимком, остальные тесты восстанавливают базу
+    из снимка. После каждого теста база очищается, как обычно
+    в TransactionTestCase.
+    """
+    snapshot = None
+
+    def _fixture_setup(self):
+        super()._fixture_setup()
+        if ReferenceDataTestCase.snapshot is None:
+            random.seed(REFERENCE_NOTES_COUNT)
+            seed_notes(
+                REFERENCE_AUTHORS_COUNT, REFERENCE_NOTES_COUNT,
+                skew=1, words=10,
+            )
+            ReferenceDataTestCase.snapshot = backup_database()
+        else:
+            restore_database(ReferenceDataTestCase.snapshot)
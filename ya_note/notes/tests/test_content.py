@@ -1,9 +1,24 @@
+import io
+import json
+import tempfile
+import zipfile
+from http import HTTPStatus
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db.models import Count
 from django.test import Client, TestCase
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 
+from notes.auth import get_user_cache, user_cache_key
+from notes.cache import get_notes_cache
+from notes.metrics import registry
 from notes.models import Note
 from notes.forms import NoteForm
+from notes.tests.factories import make_notes
+from notes.tests.snapshot import ReferenceDataTestCase
 
 User = get_user_model()
 
@@ -59,3 +74,382 @@ class TestDetailNotes(TestCase):
         response_another_user = self.another_user_client.get(url)
         object_list_another_user = response_another_user.context['object_list']
         self.assertNotIn(self.note, object_list_another_user)
+
+
+class TestNotesListPage(TestCase):
+    """Класс для проверки постраничного списка заметок."""
+    NOTES_COUNT = 5
+    PER_PAGE = 2
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='username')
+        make_notes(cls.author, cls.NOTES_COUNT)
+        cls.url = reverse('notes:list')
+
+    def setUp(self):
+        self.client.force_login(self.author)
+
+    def test_notes_list_keyset_pagination(self):
+        """Проверка, что страницы по курсору покрывают все заметки."""
+        shown = []
+        params = {}
+        with self.settings(NOTES_COUNT_ON_LIST_PAGE=self.PER_PAGE):
+            while True:
+                response = self.client.get(self.url, params)
+                object_list = response.context['object_list']
+                self.assertLessEqual(len(object_list), self.PER_PAGE)
+                self.assertIn('text', object_list[0].get_deferred_fields())
+                shown += [note.id for note in object_list]
+                if not response.context['next_cursor']:
+                    break
+                params = {'after': response.context['next_cursor']}
+        self.assertEqual(
+            shown,
+            list(Note.objects.order_by('id').values_list('id', flat=True)),
+        )
+
+    def test_bad_cursor_is_not_found(self):
+        """Проверка 404 на некорректный и выходящий за пределы курсор."""
+        for after in ('abc', '0', '-1', str(2 ** 63), '9' * 30):
+            with self.subTest(after=after):
+                response = self.client.get(self.url, {'after': after})
+                self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_notes_list_compact_json(self):
+        """Проверка компактного JSON со списком заметок."""
+        response = self.client.get(self.url, {'format': 'json'})
+        data = response.json()
+        self.assertEqual(data['fields'], ['id', 'slug', 'title'])
+        self.assertEqual(data['notes'], [
+            list(note) for note in Note.objects.order_by('id').values_list(
+                'id', 'slug', 'title'
+            )
+        ])
+        self.assertIsNone(data['next'])
+
+
+class TestNotesCache(TestCase):
+    """Класс для проверки кеша заметок автора."""
+    # Сессия и пользователь тоже берутся из кеша.
+    CACHED_PAGE_QUERIES_COUNT = 0
+    # Пользователь после сброса его кеша.
+    AUTH_QUERIES_COUNT = 1
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='username')
+        cls.staff = User.objects.create(username='staff', is_staff=True)
+        cls.note = Note.objects.create(
+            title='Тестовая заметка',
+            text='текст.',
+            author=cls.author,
+        )
+        cls.url_detail = reverse('notes:detail', args=(cls.note.slug,))
+
+    def setUp(self):
+        self.client.force_login(self.author)
+
+    def test_detail_is_cached_until_notes_change(self):
+        """Проверка кеша страницы заметки и его сброса."""
+        self.client.get(self.url_detail)
+        with self.assertNumQueries(self.CACHED_PAGE_QUERIES_COUNT):
+            self.client.get(self.url_detail)
+        self.note.text = 'Новый текст.'
+        self.note.save()
+        response = self.client.get(self.url_detail)
+        self.assertEqual(response.context['object'].text, self.note.text)
+
+    def test_list_without_queries(self):
+        """Проверка, что сессия и пользователь не стоят запросов к базе."""
+        url = reverse('notes:list')
+        self.client.get(url)
+        with self.assertNumQueries(self.CACHED_PAGE_QUERIES_COUNT):
+            response = self.client.get(url)
+        self.assertEqual(response.context['user'], self.author)
+
+    def test_cached_user_is_invalidated(self):
+        """Проверка сброса кеша пользователя при сохранении и выходе."""
+        url = reverse('notes:list')
+        self.client.get(url)
+        self.author.first_name = 'Имя'
+        self.author.save()
+        with self.assertNumQueries(self.AUTH_QUERIES_COUNT):
+            response = self.client.get(url)
+        self.assertEqual(response.context['user'].first_name, 'Имя')
+        self.client.logout()
+        self.assertIsNone(
+            get_user_cache().get(user_cache_key(self.author.pk))
+        )
+
+    def test_inactive_cached_user_is_anonymous(self):
+        """Закешированный неактивный пользователь считается анонимным."""
+        url = reverse('notes:list')
+        self.client.get(url)
+        User.objects.filter(pk=self.author.pk).update(is_active=False)
+        self.author.is_active = False
+        get_user_cache().set(user_cache_key(self.author.pk), self.author)
+        response = self.client.get(url)
+        self.assertFalse(response.wsgi_request.user.is_authenticated)
+        self.assertIsNone(
+            get_user_cache().get(user_cache_key(self.author.pk))
+        )
+
+    def test_notes_cache_clear_keeps_users_logged_in(self):
+        """Очистка кеша заметок не трогает сессии и пользователей."""
+        url = reverse('notes:list')
+        self.client.get(url)
+        get_notes_cache().clear()
+        self.client.get(url)
+        with self.assertNumQueries(self.CACHED_PAGE_QUERIES_COUNT):
+            response = self.client.get(url)
+        self.assertEqual(response.context['user'], self.author)
+
+    def test_cache_stats_for_staff_only(self):
+        """Проверка счётчиков кеша, доступных только персоналу."""
+        url = reverse('notes:cache_stats')
+        for _ in range(2):
+            self.client.get(self.url_detail)
+        self.assertEqual(
+            self.client.get(url).status_code, HTTPStatus.FORBIDDEN
+        )
+        self.client.force_login(self.staff)
+        self.assertEqual(
+            self.client.get(url).json(), {'hits': 1, 'misses': 1}
+        )
+
+
+class TestNoteSearch(TestCase):
+    """Класс для проверки поиска по заметкам пользователя."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='username')
+        cls.another_user = User.objects.create(username='another user')
+        cls.in_text = Note.objects.create(
+            title='Покупки', text='Купить молоко и хлеб.', author=cls.author
+        )
+        cls.in_title = Note.objects.create(
+            title='Молоко', text='Список.', author=cls.author
+        )
+        Note.objects.create(
+            title='Молоко', text='Чужая заметка.', slug='chuzhaya',
+            author=cls.another_user,
+        )
+        cls.url = reverse('notes:search')
+
+    def setUp(self):
+        self.client.force_login(self.author)
+
+    def test_search_own_notes_by_prefix(self):
+        """Проверка порядка, префиксного поиска и видимости чужих заметок."""
+        response = self.client.get(self.url, {'q': 'мол'})
+        self.assertEqual(
+            list(response.context['object_list']),
+            [self.in_title, self.in_text],
+        )
+        response = self.client.get(self.url, {'q': 'чужая', 'format': 'json'})
+        self.assertEqual(response.json()['notes'], [])
+
+    def test_search_index_follows_note_changes(self):
+        """Проверка, что индекс обновляется при изменении заметки."""
+        self.in_text.text = 'Купить кефир.'
+        self.in_text.save()
+        response = self.client.get(self.url, {'q': 'кефир', 'format': 'json'})
+        self.assertEqual(
+            response.json()['notes'],
+            [[self.in_text.id, self.in_text.slug, self.in_text.title]],
+        )
+
+
+class TestNotesExport(TestCase):
+    """Класс для проверки выгрузки заметок пользователя."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='username')
+        cls.another_user = User.objects.create(username='another user')
+        cls.note = Note.objects.create(
+            title='Тестовая заметка', text='текст.', author=cls.author
+        )
+        Note.objects.create(
+            title='Чужая', text='текст.', author=cls.another_user
+        )
+        cls.url = reverse('notes:export')
+
+    def setUp(self):
+        self.client.force_login(self.author)
+
+    def test_export_zip(self):
+        """Проверка архива с заметкой в Markdown на каждый slug."""
+        response = self.client.get(self.url)
+        self.assertTrue(response.streaming)
+        archive = zipfile.ZipFile(
+            io.BytesIO(b''.join(response.streaming_content))
+        )
+        self.assertEqual(archive.namelist(), [f'{self.note.slug}.md'])
+        self.assertEqual(
+            archive.read(f'{self.note.slug}.md').decode(),
+            f'# {self.note.title}\n\n{self.note.text}\n',
+        )
+
+    def test_export_zip_is_split_into_archives(self):
+        """Проверка, что архивы по ссылке Link покрывают все заметки."""
+        make_notes(self.author, 4)
+        names, url = [], f'{self.url}?format=zip'
+        with self.settings(NOTES_EXPORT_ZIP_MAX_NOTES=2):
+            while url:
+                response = self.client.get(url)
+                archive = zipfile.ZipFile(
+                    io.BytesIO(b''.join(response.streaming_content))
+                )
+                self.assertLessEqual(len(archive.namelist()), 2)
+                names += archive.namelist()
+                url = response.get('Link', '').partition('>')[0][1:]
+        self.assertEqual(names, [
+            f'{slug}.md' for slug in Note.objects.filter(
+                author=self.author
+            ).order_by('id').values_list('slug', flat=True)
+        ])
+
+    def test_export_jsonl(self):
+        """Проверка выгрузки в формате JSONL."""
+        response = self.client.get(self.url, {'format': 'jsonl'})
+        rows = [
+            json.loads(line)
+            for line in b''.join(response.streaming_content).splitlines()
+        ]
+        self.assertEqual(rows, [{
+            'id': self.note.id,
+            'title': self.note.title,
+            'text': self.note.text,
+            'slug': self.note.slug,
+        }])
+
+    def test_export_command_writes_every_archive(self):
+        """Проверка, что команда выгрузки пишет все архивы по курсору."""
+        make_notes(self.author, 6)
+        slugs = [
+            f'{slug}.md' for slug in Note.objects.filter(
+                author=self.author
+            ).order_by('id').values_list('slug', flat=True)
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            output = Path(directory) / 'notes.zip'
+            with self.settings(NOTES_EXPORT_ZIP_MAX_NOTES=3):
+                call_command(
+                    'export_notes', self.author.username,
+                    format='zip', output=str(output), stdout=io.StringIO(),
+                )
+            names = []
+            for number in range(1, 4):
+                with zipfile.ZipFile(
+                    output.with_name(f'notes-{number}.zip')
+                ) as archive:
+                    names += archive.namelist()
+            self.assertFalse(output.with_name('notes-4.zip').exists())
+        self.assertEqual(names, slugs)
+
+    def test_export_command_writes_jsonl_by_default(self):
+        """Проверка, что JSONL без ограничения — формат по умолчанию."""
+        make_notes(self.author, 6)
+        with tempfile.TemporaryDirectory() as directory:
+            output = Path(directory) / 'notes.jsonl'
+            with self.settings(NOTES_EXPORT_ZIP_MAX_NOTES=3):
+                call_command(
+                    'export_notes', self.author.username, output=str(output)
+                )
+            lines = output.read_bytes().splitlines()
+        self.assertEqual(
+            len(lines), Note.objects.filter(author=self.author).count()
+        )
+
+
+class TestMetrics(TestCase):
+    """Класс для проверки метрик запросов."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='username')
+        cls.staff = User.objects.create(username='staff', is_staff=True)
+        cls.note = Note.objects.create(
+            title='Тестовая заметка',
+            text='текст.',
+            author=cls.author,
+        )
+
+    def setUp(self):
+        registry.clear()
+        self.client.force_login(self.author)
+
+    def test_metrics_count_requests_and_queries(self):
+        """Проверка метрик представления в формате Prometheus."""
+        with self.assertNumQueries(2):
+            self.client.get(reverse('notes:detail', args=(self.note.slug,)))
+        staff_client = Client()
+        staff_client.force_login(self.staff)
+        content = staff_client.get(reverse('notes:metrics')).content.decode()
+        self.assertIn('notes_requests_total{view="notes:detail"} 1', content)
+        self.assertIn(
+            'notes_sql_queries_total{view="notes:detail"} 2', content
+        )
+
+    def test_metrics_for_staff_only(self):
+        """Проверка, что метрики закрыты от обычных пользователей."""
+        response = self.client.get(reverse('notes:metrics'))
+        self.assertEqual(response.status_code, HTTPStatus.FORBIDDEN)
+
+    def test_streaming_queries_are_counted(self):
+        """Проверка учёта запросов, сделанных при выдаче тела ответа."""
+        response = self.client.get(
+            reverse('notes:export'), {'format': 'jsonl'}
+        )
+        self.assertEqual(registry.requests['notes:export'], 0)
+        b''.join(response.streaming_content)
+        self.assertEqual(registry.requests['notes:export'], 1)
+        self.assertGreater(registry.queries['notes:export'], 1)
+
+    def test_duplicate_queries_are_logged(self):
+        """Проверка записи в журнал повторяющихся запросов."""
+        with self.settings(NOTES_METRICS_DUPLICATE_QUERIES=1):
+            with self.assertLogs('notes.metrics', 'WARNING') as logs:
+                self.client.get(reverse('notes:list'))
+        self.assertIn('notes:list', logs.output[0])
+
+
+class TestNotesOnReferenceData(ReferenceDataTestCase):
+    """Класс для проверки страниц автора с большим числом заметок."""
+    # Пользователь и страница заметок, сессия берётся из кеша.
+    LIST_QUERIES_COUNT = 2
+    # Поиск с загрузкой найденных заметок: пользователь уже в кеше.
+    SEARCH_QUERIES_COUNT = 1
+
+    def setUp(self):
+        self.author = User.objects.annotate(
+            notes_count=Count('note')
+        ).order_by('-notes_count').first()
+        self.client.force_login(self.author)
+
+    def test_list_and_search_queries_count(self):
+        """Проверка, что число запросов не растёт с числом заметок."""
+        self.assertGreater(
+            self.author.notes_count, settings.NOTES_COUNT_ON_LIST_PAGE
+        )
+        with self.assertNumQueries(self.LIST_QUERIES_COUNT):
+            response = self.client.get(reverse('notes:list'))
+        self.assertEqual(
+            len(response.context['object_list']),
+            settings.NOTES_COUNT_ON_LIST_PAGE,
+        )
+        word = Note.objects.filter(author=self.author).first().text.split()[0]
+        with self.assertNumQueries(self.SEARCH_QUERIES_COUNT):
+            response = self.client.get(reverse('notes:search'), {'q': word})
+        self.assertTrue(response.context['object_list'])
+
+    def test_export_contains_every_note(self):
+        """Проверка выгрузки всех заметок автора."""
+        response = self.client.get(
+            reverse('notes:export'), {'format': 'jsonl'}
+        )
+        lines = b''.join(response.streaming_content).splitlines()
+        self.assertEqual(len(lines), self.author.notes_count)
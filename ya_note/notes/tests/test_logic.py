@@ -1,13 +1,30 @@
+import json
+import sqlite3
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from http import HTTPStatus
+from io import StringIO
+from pathlib import Path
 
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, connections, transaction
+from django.core.exceptions import FieldError
+from django.db.models import Count
+from django.test import Client, TestCase, TransactionTestCase
 from django.urls import reverse
 
 from pytils.translit import slugify
 
+from notes.cache import get_generation
 from notes.forms import WARNING
 from notes.models import Note
+from notes.revisions import get_revision_text
+from notes.search import rebuild_search_index, search_notes
+from notes.seeding import seed_notes
+from ya_common.seeding import next_id
 
 User = get_user_model()
 
@@ -223,3 +240,306 @@ class TestModelSlug(TestCase):
         max_length_slug = self.note._meta.get_field('slug').max_length
         length_slug = len(self.note.slug)
         self.assertEqual(max_length_slug, length_slug)
+
+
+class TestNotesImport(TestCase):
+    """Класс для проверки импорта заметок из файла."""
+    # Сессия, пользователь, занятые slug, вставка пачки, её индекс
+    # поиска и точка сохранения транзакции вокруг них.
+    IMPORT_QUERIES_COUNT = 7
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор заметки')
+        cls.note = Note.objects.create(
+            title='Заголовок',
+            text='Текст',
+            author=cls.author,
+        )
+        cls.url_import = reverse('notes:import')
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.author)
+
+    def test_import_resolves_slug_collisions(self):
+        """Проверка суффиксов у совпадающих slug при импорте."""
+        rows = [
+            {'title': 'Заголовок', 'text': 'Первый'},
+            {'title': 'Заголовок', 'text': 'Второй'},
+            {'title': 'Другой', 'text': 'Третий', 'slug': 'zagolovok-2'},
+        ]
+        file = SimpleUploadedFile('notes.jsonl', '\n'.join(
+            json.dumps(row) for row in rows
+        ).encode())
+        with self.assertNumQueries(self.IMPORT_QUERIES_COUNT):
+            response = self.author_client.post(
+                self.url_import, {'file': file}
+            )
+        self.assertEqual(response.json()['imported'], len(rows))
+        self.assertEqual(
+            list(Note.objects.filter(author=self.author).order_by(
+                'id'
+            ).values_list('slug', flat=True)),
+            ['zagolovok', 'zagolovok-2', 'zagolovok-3', 'zagolovok-2-2'],
+        )
+
+    def test_import_rejects_bad_rows(self):
+        """Проверка ответа 400 на строки с неверными типами и длиной."""
+        init_count = Note.objects.count()
+        rows = (
+            {'title': 1, 'text': 'Текст'},
+            {'title': 'Заголовок', 'text': ['Текст']},
+            {'title': 'Заголовок', 'text': 'Текст', 'slug': 'a' * 300},
+            {'title': 'З' * 300, 'text': 'Текст'},
+        )
+        for row in rows:
+            with self.subTest(row=row):
+                file = SimpleUploadedFile(
+                    'notes.jsonl', json.dumps(row).encode()
+                )
+                response = self.author_client.post(
+                    self.url_import, {'file': file}
+                )
+                self.assertEqual(
+                    response.status_code, HTTPStatus.BAD_REQUEST
+                )
+        self.assertEqual(Note.objects.count(), init_count)
+
+    def test_import_csv_is_atomic(self):
+        """Проверка, что ошибка в строке отменяет весь импорт."""
+        init_count = Note.objects.count()
+        file = SimpleUploadedFile(
+            'notes.csv', 'title,text\nПервая,Текст\nВторая,\n'.encode()
+        )
+        response = self.author_client.post(self.url_import, {'file': file})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertEqual(Note.objects.count(), init_count)
+
+
+class TestNoteRevisions(TestCase):
+    """Класс для проверки истории изменений заметки."""
+    EDITS_COUNT = 7
+    SNAPSHOT_INTERVAL = 3
+    # Сессия, пользователь, заметка и её ревизии.
+    REVISIONS_PAGE_QUERIES_COUNT = 4
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор заметки')
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.author)
+
+    def test_revisions_restore_every_version(self):
+        """Проверка, что из ревизий восстанавливается любая версия."""
+        texts = []
+        with self.settings(
+            NOTES_REVISION_SNAPSHOT_INTERVAL=self.SNAPSHOT_INTERVAL
+        ):
+            note = Note.objects.create(
+                title='Заголовок', text='', author=self.author
+            )
+            for edit in range(self.EDITS_COUNT):
+                note = Note.objects.get(pk=note.pk)
+                note.text = ''.join(
+                    f'Строка {line} правки {edit}\n'
+                    if line == edit else f'Строка {line}\n'
+                    for line in range(self.EDITS_COUNT)
+                )
+                note.save()
+                texts.append(note.text)
+        revisions = note.revisions.order_by('number')[1:]
+        self.assertEqual(
+            [revision.is_snapshot for revision in revisions],
+            [False, False, True, False, False, True, False],
+        )
+        for revision, text in zip(revisions, texts):
+            with self.subTest(number=revision.number):
+                self.assertEqual(get_revision_text(revision), text)
+        url = reverse(
+            'notes:restore', args=(note.slug, revisions[0].number)
+        )
+        response = self.author_client.post(url)
+        self.assertRedirects(
+            response, reverse('notes:detail', args=(note.slug,))
+        )
+        note.refresh_from_db()
+        self.assertEqual(note.text, texts[0])
+        self.assertEqual(note.revisions.count(), self.EDITS_COUNT + 2)
+
+    def test_revisions_page_queries_do_not_grow(self):
+        """Проверка, что история загружается одним запросом."""
+        note = Note.objects.create(
+            title='Заголовок', text='', author=self.author
+        )
+        for edit in range(self.EDITS_COUNT):
+            note.text = f'Правка {edit}'
+            note.save()
+        url = reverse('notes:revisions', args=(note.slug,))
+        with self.assertNumQueries(self.REVISIONS_PAGE_QUERIES_COUNT):
+            response = self.author_client.get(url)
+        self.assertEqual(
+            len(response.context['revisions']), self.EDITS_COUNT + 1
+        )
+
+    def test_bench_revisions_with_fewer_edits_than_interval(self):
+        """Замер истории не должен падать без второй полной копии."""
+        output = StringIO()
+        with tempfile.TemporaryDirectory() as directory:
+            with self.settings(NOTES_REVISION_SNAPSHOT_INTERVAL=20):
+                call_command(
+                    'bench_revisions',
+                    path=str(Path(directory) / 'revisions.sqlite3'),
+                    size=2000, edits=10, restores=3, stdout=output,
+                )
+        self.assertIn('самая длинная цепочка (10 разниц)', output.getvalue())
+        self.assertNotIn('benchmark', connections.databases)
+
+
+class TestCompressedText(TestCase):
+    """Класс для проверки сжатого хранения длинных текстов."""
+    LONG_TEXT = 'строка журнала\n' * 1000 + 'последняя'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор заметки')
+        cls.note = Note.objects.create(
+            title='Журнал', text=cls.LONG_TEXT, author=cls.author
+        )
+
+    def test_long_text_is_compressed_transparently(self):
+        """Проверка сжатия, чтения, фильтров и поиска по длинному тексту."""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT typeof(text) FROM notes_note WHERE id = %s',
+                (self.note.id,)
+            )
+            self.assertEqual(cursor.fetchone(), ('blob',))
+        self.assertEqual(Note.objects.get().text, self.LONG_TEXT)
+        self.assertEqual(
+            Note.objects.filter(text__endswith='последняя').get(), self.note
+        )
+        self.assertEqual(search_notes(self.author, 'последн'), [self.note])
+
+    def test_unsupported_lookups_are_rejected(self):
+        """Проверка, что фильтры по сжатым данным запрещены."""
+        for lookup in ('in', 'gt', 'lt', 'range'):
+            with self.subTest(lookup=lookup):
+                with self.assertRaises(FieldError):
+                    Note.objects.filter(**{f'text__{lookup}': ['a', 'b']})
+
+    def test_deleted_note_leaves_search_index(self):
+        """Проверка, что удалённая заметка не находится поиском."""
+        self.note.delete()
+        self.assertEqual(search_notes(self.author, 'последн'), [])
+
+
+class TestWritesWithoutApplication(TransactionTestCase):
+    """Класс для проверки записи в заметки из консоли sqlite3."""
+
+    def test_plain_sqlite_connection_can_write_notes(self):
+        """Проверка записи без функций приложения и перестройки индекса."""
+        author = User.objects.create(username='Автор заметки')
+        note = Note.objects.create(
+            title='Журнал', text='Старый текст', author=author
+        )
+        console = sqlite3.connect(connection.settings_dict['NAME'])
+        with console:
+            console.execute(
+                "INSERT INTO notes_note (title, text, slug, author_id) "
+                "VALUES ('Консоль', 'Запись из консоли', 'konsol', ?)",
+                (author.id,),
+            )
+            console.execute(
+                "UPDATE notes_note SET text = 'Новый текст' WHERE id = ?",
+                (note.id,),
+            )
+        console.close()
+        rebuild_search_index()
+        self.assertEqual(
+            [found.slug for found in search_notes(author, 'консол')],
+            ['konsol'],
+        )
+        self.assertEqual(search_notes(author, 'новый'), [note])
+
+
+class TestSeedNotes(TestCase):
+    """Класс для проверки заполнения базы синтетическими заметками."""
+    AUTHORS_COUNT = 5
+    NOTES_COUNT = 300
+
+    def test_seed_notes(self):
+        """Проверка slug, распределения по авторам, индекса и кеша."""
+        Note.objects.create(
+            title='Занятый', text='Текст', slug='note-2',
+            author=User.objects.create(username='Автор'),
+        )
+        # Кеш, оставшийся от удалённого пользователя с тем же id.
+        first_author_id = next_id(User)
+        generation = get_generation(first_author_id)
+        seed_notes(self.AUTHORS_COUNT, self.NOTES_COUNT, skew=1, words=5)
+        self.assertNotEqual(get_generation(first_author_id), generation)
+        notes = Note.objects.exclude(slug='note-2').filter(
+            author__username__startswith='user'
+        )
+        self.assertEqual(notes.count(), self.NOTES_COUNT)
+        self.assertEqual(
+            Note.objects.values('slug').distinct().count(),
+            self.NOTES_COUNT + 1,
+        )
+        totals = notes.values('author').annotate(
+            total=Count('pk')
+        ).order_by('author').values_list('total', flat=True)
+        self.assertGreater(totals[0], self.NOTES_COUNT / self.AUTHORS_COUNT)
+        note = notes.first()
+        self.assertIn(
+            note, search_notes(note.author, note.text.split()[0])
+        )
+
+
+class TestConcurrentNoteCreation(TransactionTestCase):
+    """Класс для проверки одновременного создания одноимённых заметок."""
+    THREADS_COUNT = 50
+
+    def setUp(self):
+        self.author = User.objects.create(username='Автор заметки')
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+
+    def create_note(self, barrier):
+        barrier.wait()
+        try:
+            return self.author_client.post(reverse('notes:add'), data={
+                'title': 'Одна и та же заметка', 'text': 'Текст'
+            })
+        finally:
+            connection.close()
+
+    def test_same_title_notes_get_unique_slugs(self):
+        """Проверка, что ни один запрос не падает на занятом slug."""
+        barrier = threading.Barrier(self.THREADS_COUNT)
+        with ThreadPoolExecutor(self.THREADS_COUNT) as executor:
+            responses = list(executor.map(
+                self.create_note, [barrier] * self.THREADS_COUNT
+            ))
+        for response in responses:
+            self.assertRedirects(response, reverse('notes:success'))
+        slugs = set(Note.objects.values_list('slug', flat=True))
+        self.assertEqual(len(slugs), self.THREADS_COUNT)
+        self.assertIn('odna-i-ta-zhe-zametka', slugs)
+
+    def test_only_note_creation_begins_immediately(self):
+        """Проверка, что другие транзакции остаются отложенными."""
+        executed = []
+        connection.ensure_connection()
+        connection.connection.set_trace_callback(executed.append)
+        try:
+            with transaction.atomic():
+                Note.objects.count()
+            self.author_client.post(reverse('notes:add'), data={
+                'title': 'Заметка', 'text': 'Текст'
+            })
+        finally:
+            connection.connection.set_trace_callback(None)
+        self.assertEqual(
+            [sql for sql in executed if sql.startswith('BEGIN')],
+            ['BEGIN', 'BEGIN IMMEDIATE'],
+        )
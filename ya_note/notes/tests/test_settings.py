@@ -0,0 +1,108 @@
+import os
+import tempfile
+from importlib import import_module, reload
+from unittest import mock
+
+from django.core.signals import request_started
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import TestCase, TransactionTestCase, override_settings
+
+HEALTH_ALIAS = 'health'
+
+
+class TestSqliteSettings(TestCase):
+
+    @override_settings(
+        NOTES_SQLITE_PRAGMAS={'cache_size': -1234, 'busy_timeout': 321}
+    )
+    def test_pragmas_apply_to_new_connections(self):
+        new_connection = connections.create_connection(DEFAULT_DB_ALIAS)
+        try:
+            with new_connection.cursor() as cursor:
+                values = [
+                    cursor.execute(f'PRAGMA {name}').fetchone()[0]
+                    for name in ('cache_size', 'busy_timeout')
+                ]
+        finally:
+            new_connection.close()
+        self.assertEqual(values, [-1234, 321])
+
+    def test_production_settings_do_not_change_base_settings(self):
+        base = import_module('yanote.settings')
+        production = import_module('yanote.settings_production')
+        self.assertGreater(production.DATABASES['default']['CONN_MAX_AGE'], 0)
+        self.assertEqual(base.DATABASES['default'].get('CONN_MAX_AGE', 0), 0)
+        self.assertNotIn('loaders', base.TEMPLATES[0]['OPTIONS'])
+        self.assertEqual(
+            production.NOTES_SQLITE_PRAGMAS['journal_mode'], 'wal'
+        )
+
+    def test_production_caches_are_shared_between_processes(self):
+        """Кеш заметок и сессий боевого сервера общий для процессов."""
+        with mock.patch.dict(os.environ, {'DJANGO_CACHE_DIR': '/var/cache/n'}):
+            production = reload(import_module('yanote.settings_production'))
+        caches = {
+            alias: (cache['BACKEND'], str(cache['LOCATION']))
+            for alias, cache in production.CACHES.items()
+        }
+        reload(production)
+        self.assertEqual(
+            caches,
+            {
+                alias: (
+                    'django.core.cache.backends.filebased.FileBasedCache',
+                    f'/var/cache/n/{alias}',
+                )
+                for alias in ('default', 'auth')
+            },
+        )
+
+    def test_production_secrets_come_from_environment(self):
+        """Ключ и хосты боевого сервера берутся из окружения."""
+        environ = {
+            'DJANGO_SECRET_KEY': 'ключ из окружения',
+            'DJANGO_ALLOWED_HOSTS': 'notes.example, www.example',
+        }
+        with mock.patch.dict(os.environ, environ):
+            production = reload(import_module('yanote.settings_production'))
+        self.assertEqual(production.SECRET_KEY, 'ключ из окружения')
+        self.assertEqual(
+            production.ALLOWED_HOSTS, ['notes.example', 'www.example']
+        )
+        with mock.patch.dict(os.environ):
+            for name in environ:
+                os.environ.pop(name, None)
+            production = reload(production)
+        self.assertEqual(production.SECRET_KEY, '')
+        self.assertEqual(production.ALLOWED_HOSTS, [])
+
+
+class TestPersistentConnections(TransactionTestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        connections.databases[HEALTH_ALIAS] = {
+            **connections.databases[DEFAULT_DB_ALIAS],
+            'NAME': os.path.join(directory.name, 'health.sqlite3'),
+            'CONN_MAX_AGE': 600,
+            'CONN_HEALTH_CHECKS': True,
+        }
+        self.addCleanup(self.remove_alias)
+
+    def remove_alias(self):
+        connections[HEALTH_ALIAS].close()
+        del connections[HEALTH_ALIAS]
+        del connections.databases[HEALTH_ALIAS]
+
+    def test_broken_persistent_connection_is_closed(self):
+        """Сломанное постоянное соединение закрывается в начале запроса."""
+        persistent = connections[HEALTH_ALIAS]
+        persistent.ensure_connection()
+        request_started.send(sender=__name__)
+        self.assertIsNotNone(persistent.connection)
+        persistent.connection.close()
+        request_started.send(sender=__name__)
+        self.assertIsNone(persistent.connection)
+        with persistent.cursor() as cursor:
+            cursor.execute('SELECT 1')
@@ -10,6 +10,23 @@ urlpatterns = [
     path('edit/<slug:slug>/', views.NoteUpdate.as_view(), name='edit'),
     path('note/<slug:slug>/', views.NoteDetail.as_view(), name='detail'),
     path('delete/<slug:slug>/', views.NoteDelete.as_view(), name='delete'),
+    path(
+        'note/<slug:slug>/revisions/',
+        views.NoteRevisions.as_view(),
+        name='revisions'
+    ),
+    path(
+        'note/<slug:slug>/revisions/<int:number>/restore/',
+        views.NoteRestore.as_view(),
+        name='restore'
+    ),
     path('notes/', views.NotesList.as_view(), name='list'),
+    path('search/', views.NoteSearch.as_view(), name='search'),
+    path('import/', views.NoteImport.as_view(), name='import'),
+    path('export/', views.NoteExport.as_view(), name='export'),
+    path(
+        'cache-stats/', views.NotesCacheStats.as_view(), name='cache_stats'
+    ),
     path('done/', views.NoteSuccess.as_view(), name='success'),
+    path('metrics/', views.Metrics.as_view(), name='metrics'),
 ]
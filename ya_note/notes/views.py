@@ -1,9 +1,31 @@
-from django.contrib.auth.mixins import LoginRequiredMixin
+import io
+import time
+from functools import partial
+from http import HTTPStatus
+
+from django.contrib.auth.mixins import (
+    LoginRequiredMixin, UserPassesTestMixin
+)
+from django.core.exceptions import ValidationError
+from django.db.models.functions import Length
+from django.http import (
+    HttpResponse, HttpResponseRedirect, JsonResponse, StreamingHttpResponse
+)
+from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse_lazy
 from django.views import generic
 
-from .forms import NoteForm
+from .cache import get_or_compute, get_stats
+from .export import (
+    CONTENT_TYPES, EXPORT_FORMATS, get_export_chunks, get_next_zip_cursor
+)
+from .forms import NoteForm, NoteImportForm
+from .importing import import_notes, read_rows
+from .metrics import registry
 from .models import Note
+from .pagination import LIST_FIELDS, decode_cursor, get_notes_page
+from .revisions import restore_revision
+from .search import search_notes
 
 
 class Home(generic.TemplateView):
@@ -25,23 +47,36 @@ class NoteBase(LoginRequiredMixin):
         """Пользователь может работать только со своими заметками."""
         return self.model.objects.filter(author=self.request.user)
 
+    def get_object(self, queryset=None):
+        """Заметка берётся из кеша автора."""
+        return get_or_compute(
+            self.request.user.pk,
+            f'note:{self.kwargs[self.slug_url_kwarg]}',
+            partial(super().get_object, queryset),
+        )
 
-class NoteCreate(NoteBase, generic.CreateView):
-    """Добавление заметки."""
+
+class NoteFormMixin:
+    """Сохранение заметки из NoteForm без отдельной проверки slug."""
     template_name = 'notes/form.html'
     form_class = NoteForm
 
     def form_valid(self, form):
-        new_note = form.save(commit=False)
-        new_note.author = self.request.user
-        new_note.save()
-        return super().form_valid(form)
+        note = form.save(commit=False)
+        if note.author_id is None:
+            note.author = self.request.user
+        if not form.save_note(note):
+            return self.form_invalid(form)
+        self.object = note
+        return HttpResponseRedirect(self.get_success_url())
 
 
-class NoteUpdate(NoteBase, generic.UpdateView):
+class NoteCreate(NoteBase, NoteFormMixin, generic.CreateView):
+    """Добавление заметки."""
+
+
+class NoteUpdate(NoteBase, NoteFormMixin, generic.UpdateView):
     """Редактирование заметки."""
-    template_name = 'notes/form.html'
-    form_class = NoteForm
 
 
 class NoteDelete(NoteBase, generic.DeleteView):
@@ -50,10 +85,167 @@ class NoteDelete(NoteBase, generic.DeleteView):
 
 
 class NotesList(NoteBase, generic.ListView):
-    """Список всех заметок пользователя."""
+    """
+    Список заметок пользователя постранично.
+
+    С параметром format=json отдаёт ту же страницу компактно:
+    названия полей один раз, заметки — массивами значений.
+    """
     template_name = 'notes/list.html'
 
+    def get_queryset(self):
+        after = decode_cursor(self.request.GET.get('after'))
+        page, self.next_cursor = get_or_compute(
+            self.request.user.pk,
+            f'list:{after}',
+            partial(get_notes_page, self.request.user, after),
+        )
+        return page
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['next_cursor'] = self.next_cursor
+        return context
+
+    def render_to_response(self, context, **response_kwargs):
+        if self.request.GET.get('format') != 'json':
+            return super().render_to_response(context, **response_kwargs)
+        return JsonResponse({
+            'fields': LIST_FIELDS,
+            'notes': [
+                [getattr(note, field) for field in LIST_FIELDS]
+                for note in self.object_list
+            ],
+            'next': self.next_cursor,
+        })
+
+
+class NoteSearch(NotesList):
+    """
+    Поиск по заметкам пользователя.
+
+    Последнее слово запроса ищется по началу, поэтому с format=json
+    поиск подходит для подсказок по мере ввода.
+    """
+    template_name = 'notes/search.html'
+
+    def get_queryset(self):
+        self.next_cursor = None
+        return search_notes(self.request.user, self.request.GET.get('q', ''))
+
 
 class NoteDetail(NoteBase, generic.DetailView):
     """Заметка подробно."""
     template_name = 'notes/detail.html'
+
+
+class NoteRevisions(NoteBase, generic.DetailView):
+    """История изменений заметки."""
+    template_name = 'notes/revisions.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Связанный менеджер проставляет ревизиям заметку, поэтому без
+        # note_id каждая ревизия догружала бы его отдельным запросом.
+        context['revisions'] = self.object.revisions.only(
+            'note', 'number', 'title', 'is_snapshot', 'created'
+        ).annotate(stored_size=Length('data'))
+        return context
+
+
+class NoteRestore(NoteBase, generic.detail.SingleObjectMixin, generic.View):
+    """Восстановление заметки из ревизии."""
+    http_method_names = ['post']
+
+    def post(self, request, *args, **kwargs):
+        note = self.get_object()
+        revision = get_object_or_404(
+            note.revisions, number=self.kwargs['number']
+        )
+        restore_revision(note, revision)
+        return redirect('notes:detail', slug=note.slug)
+
+
+class NoteImport(LoginRequiredMixin, generic.View):
+    """Импорт заметок пользователя из файла JSONL или CSV."""
+    http_method_names = ['post']
+
+    def post(self, request, *args, **kwargs):
+        form = NoteImportForm(request.POST, request.FILES)
+        if not form.is_valid():
+            return JsonResponse(form.errors, status=HTTPStatus.BAD_REQUEST)
+        file = io.TextIOWrapper(
+            form.cleaned_data['file'].file, encoding='utf-8', newline=''
+        )
+        started = time.perf_counter()
+        try:
+            imported = import_notes(
+                request.user, read_rows(file, form.cleaned_data['format'])
+            )
+        except ValidationError as error:
+            return JsonResponse(
+                {'file': error.messages}, status=HTTPStatus.BAD_REQUEST
+            )
+        elapsed = time.perf_counter() - started
+        return JsonResponse({
+            'imported': imported,
+            'notes_per_second': round(imported / elapsed),
+        })
+
+
+class NoteExport(LoginRequiredMixin, generic.View):
+    """
+    Потоковая выгрузка заметок пользователя.
+
+    JSONL содержит все заметки. ZIP-архив ограничен
+    NOTES_EXPORT_ZIP_MAX_NOTES заметками, ссылка на следующий
+    архив передаётся в заголовке Link.
+    """
+
+    def get(self, request, *args, **kwargs):
+        format = request.GET.get('format', EXPORT_FORMATS[0])
+        if format not in EXPORT_FORMATS:
+            return JsonResponse(
+                {'format': [f'Допустимые форматы: {EXPORT_FORMATS}.']},
+                status=HTTPStatus.BAD_REQUEST,
+            )
+        after = decode_cursor(request.GET.get('after'))
+        response = StreamingHttpResponse(
+            get_export_chunks(request.user, format, after),
+            content_type=CONTENT_TYPES[format],
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="notes.{format}"'
+        )
+        next_cursor = format == 'zip' and get_next_zip_cursor(
+            request.user, after
+        )
+        if next_cursor:
+            response['Link'] = (
+                f'<{request.path}?format=zip&after={next_cursor}>; '
+                'rel="next"'
+            )
+        return response
+
+
+class NotesCacheStats(UserPassesTestMixin, generic.View):
+    """Счётчики попаданий и промахов кеша заметок для мониторинга."""
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse(get_stats())
+
+
+class Metrics(UserPassesTestMixin, generic.View):
+    """Метрики запросов для Prometheus, доступные только персоналу."""
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request, *args, **kwargs):
+        return HttpResponse(
+            registry.render(),
+            content_type='text/plain; version=0.0.4; charset=utf-8',
+        )
@@ -1,9 +1,14 @@
+import sys
 from pathlib import Path
 
 from django.urls import reverse_lazy
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Общий код проектов лежит рядом с ними в пакете ya_common.
+if str(BASE_DIR.parent) not in sys.path:
+    sys.path.append(str(BASE_DIR.parent))
+
 SECRET_KEY = 'django-insecure-yipnj$#j!ajarq%k55z4kuf3x79)91h0h42o9!1ho(z=!%mt=#'
 
 DEBUG = False
@@ -22,11 +27,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Первым, чтобы учесть время и запросы остальных middleware.
+    'notes.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'notes.auth.CachedAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -56,10 +63,33 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Тестовая база в файле: в общей памяти SQLite блокирует
+        # таблицы целиком, и тесты с потоками падают на блокировках.
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
     }
 }
 
 
+# Сессии читаются из кеша и пишутся и в кеш, и в базу:
+# в отличие от подписанных cookie, их можно отозвать на сервере.
+# С несколькими процессами кеш должен быть общим для них,
+# иначе выход в одном процессе не виден остальным.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+# Сессии и пользователи лежат отдельно от страниц: очистка кеша
+# страниц не должна разлогинивать пользователей.
+SESSION_CACHE_ALIAS = 'auth'
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'auth': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'auth',
+    },
+}
+
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
@@ -87,3 +117,45 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('notes:home')
+
+# Размер пачки при импорте заметок.
+NOTES_IMPORT_BATCH_SIZE = 1000
+
+NOTES_COUNT_ON_LIST_PAGE = 100
+
+# Кеш заметок: ключи автора сбрасываются сменой поколения.
+NOTES_CACHE = 'default'
+NOTES_CACHE_TIMEOUT = 600
+
+NOTES_SEARCH_RESULTS_COUNT = 20
+
+# Размер порции строк при потоковой выгрузке заметок.
+NOTES_EXPORT_CHUNK_SIZE = 2000
+# Сколько заметок помещается в один ZIP-архив: оглавление архива
+# растёт примерно на 1 КБ памяти с каждой заметкой. JSONL выгружает
+# все заметки в постоянной памяти.
+NOTES_EXPORT_ZIP_MAX_NOTES = 5000
+
+# Через сколько ревизий заметки сохраняется полная копия текста.
+NOTES_REVISION_SNAPSHOT_INTERVAL = 20
+
+# Тексты заметок не короче порога в байтах хранятся сжатыми,
+# None отключает сжатие.
+NOTES_TEXT_COMPRESSION_THRESHOLD = 4096
+
+# Сколько раз пробовать другой slug из заголовка, если он занят.
+NOTES_SLUG_RETRIES = 10
+
+# Сколько одинаковых запросов SQL за один запрос к сайту
+# считать признаком N+1 и писать в журнал.
+NOTES_METRICS_DUPLICATE_QUERIES = 5
+
+# Прагмы SQLite, выполняемые на каждом новом соединении,
+# в порядке словаря. По умолчанию настройки SQLite не меняются.
+NOTES_SQLITE_PRAGMAS = {}
+
+# Кеш пользователей сессий для CachedAuthenticationMiddleware.
+# Изменения пользователей через QuerySet.update кеш не сбрасывают
+# и вступают в силу не позже чем через время жизни записи.
+NOTES_USER_CACHE = 'auth'
+NOTES_USER_CACHE_TIMEOUT = 60
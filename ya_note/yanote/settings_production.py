@@ -0,0 +1,73 @@
+"""
+Настройки боевого сервера на SQLite.
+
+DJANGO_SETTINGS_MODULE=yanote.settings_production
+"""
+import os
+from pathlib import Path
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, DATABASES, TEMPLATES
+
+DEBUG = False
+
+# Без DJANGO_SECRET_KEY Django с этими настройками не запустится.
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY', '')
+# Имена хостов через запятую, без них сайт не отвечает ни на один.
+ALLOWED_HOSTS = [
+    host.strip()
+    for host in os.environ.get('DJANGO_ALLOWED_HOSTS', '').split(',')
+    if host.strip()
+]
+
+# Соединение живёт между запросами потока, а не открывается на каждом.
+# Django 3.2 не знает CONN_HEALTH_CHECKS, ключ проверяет приёмник
+# request_started, который закрывает не отвечающие соединения.
+DATABASES = {
+    'default': {
+        **DATABASES['default'],
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+    },
+}
+
+# Кеш общий для всех процессов сервера: иначе выход, смена пароля
+# и сброс кеша заметок в одном процессе не видны другим.
+# Каталог задаёт DJANGO_CACHE_DIR, у каждого алиаса он свой, чтобы
+# очистка кеша заметок не трогала сессии.
+CACHE_DIR = Path(os.environ.get('DJANGO_CACHE_DIR', BASE_DIR / 'cache'))
+CACHES = {
+    alias: {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': CACHE_DIR / alias,
+        'OPTIONS': {'MAX_ENTRIES': 10_000},
+    }
+    for alias in ('default', 'auth')
+}
+
+# Шаблоны компилируются один раз за жизнь процесса.
+TEMPLATES = [{
+    **TEMPLATES[0],
+    'APP_DIRS': False,
+    'OPTIONS': {
+        **TEMPLATES[0]['OPTIONS'],
+        'loaders': [
+            ('django.template.loaders.cached.Loader', [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ]),
+        ],
+    },
+}]
+
+# WAL пускает чтение параллельно с записью, а synchronous=NORMAL
+# в режиме WAL синхронизирует диск только при контрольных точках.
+# Пишущий ждёт снятия блокировки до busy_timeout миллисекунд.
+NOTES_SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    # Отрицательное значение — размер в КиБ, а не в страницах.
+    'cache_size': -64 * 1024,
+}